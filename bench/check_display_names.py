@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Run update_display_names_from_dbt.py against the local stub OpenMetadata server and check
+the result.
+
+A synthetic dbt manifest (--tables models with --columns columns each, all carrying
+openmetadata displayNames) is synced once per --concurrency value. Each sync starts from
+a fresh stub with --latency-ms delay per request, and every --fail-every-th request gets a
+429/503. The checks:
+  - the first sync delivers every table and column displayName despite the failures
+  - a second sync only lists the service: no per-table lookups and no patches
+  - --full-sync of an up-to-date service patches nothing
+  - changing one node in the manifest patches exactly that table
+  - drift made in OpenMetadata (a displayName reset) is repaired by the next plain sync
+Wall time per concurrency level is printed at the end.
+
+Usage:
+  python bench/check_display_names.py
+  python bench/check_display_names.py --tables 500 --latency-ms 20 --concurrency 1 8 32
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from om_stub_server import StubState, start  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, "update_display_names_from_dbt.py")
+SERVICE = "stub_pg"
+
+
+def write_json(path: str, data: dict) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f)
+
+
+def synthetic_manifest(tables: int, columns: int) -> dict:
+    nodes = {}
+    for t in range(tables):
+        cols = {f"col_{c}": {"name": f"col_{c}", "meta": {"openmetadata": {"displayName": f"Column {c} of {t}"}}}
+                for c in range(columns)}
+        nodes[f"model.stub.table_{t}"] = {
+            "resource_type": "model", "database": "dera", "schema": "analytics", "name": f"table_{t}",
+            "config": {"meta": {"openmetadata": {"displayName": f"Table {t}"}}}, "columns": cols,
+        }
+    return {"nodes": nodes, "sources": {}}
+
+
+def sync(host: str, manifest_path: str, concurrency: int, *extra: str) -> tuple:
+    """(wall seconds, script stdout) for one run of the sync script."""
+    started = time.perf_counter()
+    out = subprocess.run(
+        [sys.executable, SCRIPT, "--host", host, "--service", SERVICE, "--manifest", manifest_path,
+         "--concurrency", str(concurrency), "--backoff", "0.01", "--page-size", "50", *extra],
+        check=True, capture_output=True, text=True,
+    ).stdout
+    return time.perf_counter() - started, out
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Check the displayName sync against a stub OpenMetadata server")
+    ap.add_argument("--tables", type=int, default=200)
+    ap.add_argument("--columns", type=int, default=8)
+    ap.add_argument("--latency-ms", type=float, default=10.0, help="stub delay per request")
+    ap.add_argument("--fail-every", type=int, default=25, help="stub answers every Nth request with 429/503")
+    ap.add_argument("--concurrency", type=int, nargs="+", default=[1, 16])
+    args = ap.parse_args()
+
+    manifest = synthetic_manifest(args.tables, args.columns)
+    timings = []
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest_path = os.path.join(tmp, "manifest.json")
+        state_file = os.path.join(tmp, "state.json")
+
+        def fail(msg: str) -> None:
+            raise SystemExit(f"ERROR: concurrency {concurrency}: {msg}")
+
+        for concurrency in args.concurrency:
+            write_json(manifest_path, manifest)
+            if os.path.exists(state_file):
+                os.remove(state_file)
+            state = StubState(args.latency_ms, args.fail_every)
+            for node in manifest["nodes"].values():
+                state.add_table(f"{SERVICE}.dera.analytics.{node['name']}", list(node["columns"]))
+            server = start(state)
+            host = f"http://127.0.0.1:{server.server_port}/api"
+            seconds, out = sync(host, manifest_path, concurrency, "--state-file", state_file)
+            requests, failures = state.requests, state.failures
+
+            missing = [fqn for fqn, t in state.by_fqn.items()
+                       if not t["displayName"] or any(not c["displayName"] for c in t["columns"])]
+            if missing:
+                fail(f"{len(missing)} table(s) not fully patched, e.g. {missing[0]}")
+
+            patches, lists, lookups = state.patches, state.lists, state.calls["GET tables/name"]
+            _, again = sync(host, manifest_path, concurrency, "--state-file", state_file)
+            if state.patches != patches or state.calls["GET tables/name"] != lookups:
+                fail(f"unchanged second sync made {state.calls['GET tables/name'] - lookups} lookup(s) and "
+                     f"{state.patches - patches} patch(es):\n{again}")
+            if state.lists == lists:
+                fail("second sync did not list the service")
+
+            _, again = sync(host, manifest_path, concurrency, "--state-file", state_file, "--full-sync")
+            if state.patches != patches or "updates applied: 0" not in again:
+                fail(f"--full-sync of an up-to-date service still patched:\n{again}")
+
+            changed = json.loads(json.dumps(manifest))
+            first = next(iter(changed["nodes"].values()))
+            first["config"]["meta"]["openmetadata"]["displayName"] += " (renamed)"
+            write_json(manifest_path, changed)
+            sync(host, manifest_path, concurrency, "--state-file", state_file)
+            if state.patches != patches + 1:
+                fail(f"one changed node caused {state.patches - patches} patch(es)")
+
+            drifted = state.by_fqn[f"{SERVICE}.dera.analytics.{first['name']}"]
+            drifted["displayName"] = None
+            drifted["columns"][0]["displayName"] = "Renamed in the UI"
+            sync(host, manifest_path, concurrency, "--state-file", state_file)
+            if (drifted["displayName"] != first["config"]["meta"]["openmetadata"]["displayName"]
+                    or drifted["columns"][0]["displayName"] != first["columns"]["col_0"]["meta"]["openmetadata"]["displayName"]):
+                fail("a plain sync did not repair display names changed in OpenMetadata")
+            server.shutdown()
+
+            print(f"▶ concurrency {concurrency}: {seconds:.2f}s, {requests} requests "
+                  f"({failures} injected failures retried)")
+            print("\n".join(line for line in out.splitlines() if line.startswith("  ")))
+            timings.append((concurrency, seconds))
+
+    print(f"\n{args.tables} tables x {args.columns} columns, {args.latency_ms:g}ms stub latency:")
+    base = timings[0][1]
+    for concurrency, seconds in timings:
+        print(f"   concurrency {concurrency:<4} {seconds:>7.2f}s  {base / seconds:>5.1f}x")
+    print("✅ All displayNames synced.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Run upsert_glossary_terms.py against the local stub OpenMetadata server, serially and
+with --prefetch, and compare requests and wall time.
+
+Each run starts from an empty stub with --latency-ms delay per request. The checks:
+  - both modes create every term of the source file
+  - a --prefetch re-run of an up-to-date glossary sends no per-term request
+  - a --prefetch run after editing one term sends exactly one term PUT
+
+Needs the OpenMetadata client (openmetadata-ingestion) in the Python that runs it.
+
+Usage:
+  python bench/check_glossary_upsert.py
+  python bench/check_glossary_upsert.py --source glossary.json --latency-ms 20 --workers 16
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from om_stub_server import StubState, start  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, "upsert_glossary_terms.py")
+TERM_CALLS = ("GET glossaryTerms/name", "PUT glossaryTerms")
+
+
+def upsert(host: str, source: str, *extra: str) -> float:
+    env = dict(os.environ, OPENMETADATA_HOST_PORT=host, OPENMETADATA_JWT_TOKEN="stub-token")
+    started = time.perf_counter()
+    out = subprocess.run([sys.executable, SCRIPT, source, *extra], env=env, check=True,
+                         capture_output=True, text=True).stdout
+    if "Failed" in out:
+        raise SystemExit(f"ERROR: upsert failed:\n{out}")
+    return time.perf_counter() - started
+
+
+def run(source: str, latency_ms: float, *extra: str) -> tuple:
+    """(stub state, wall seconds) for one upsert against a fresh stub."""
+    state = StubState(latency_ms)
+    server = start(state)
+    try:
+        return state, upsert(f"http://127.0.0.1:{server.server_port}/api", source, *extra), server
+    except BaseException:
+        server.shutdown()
+        raise
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare serial and --prefetch glossary upserts against a stub")
+    ap.add_argument("--source", default=os.path.join(ROOT, "glossary.json"))
+    ap.add_argument("--latency-ms", type=float, default=10.0, help="stub delay per request")
+    ap.add_argument("--workers", type=int, default=8)
+    args = ap.parse_args()
+
+    with open(args.source, encoding="utf-8") as f:
+        terms = json.load(f)
+    expected = len({(t["glossary"], t["tag"]) for t in terms})
+
+    serial, serial_s, server = run(args.source, args.latency_ms)
+    server.shutdown()
+    prefetch, prefetch_s, server = run(args.source, args.latency_ms, "--prefetch", "--workers", str(args.workers))
+    first_calls = {"serial": serial.calls.copy(), "prefetch": prefetch.calls.copy()}
+    for name, state in (("serial", serial), ("prefetch", prefetch)):
+        if len(state.terms) != expected:
+            raise SystemExit(f"ERROR: {name} upsert created {len(state.terms)} of {expected} terms")
+
+    host = f"http://127.0.0.1:{server.server_port}/api"
+    before = prefetch.calls.copy()
+    rerun_s = upsert(host, args.source, "--prefetch", "--workers", str(args.workers))
+    rerun = prefetch.calls - before
+    if any(rerun[c] for c in TERM_CALLS):
+        raise SystemExit(f"ERROR: re-run of an unchanged glossary made term calls: {dict(rerun)}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        edited = os.path.join(tmp, "glossary.json")
+        terms[0]["label"] += " (edited)"
+        with open(edited, "w", encoding="utf-8") as f:
+            json.dump(terms, f)
+        before = prefetch.calls.copy()
+        upsert(host, edited, "--prefetch", "--workers", str(args.workers))
+        puts = (prefetch.calls - before)["PUT glossaryTerms"]
+        if puts != 1:
+            raise SystemExit(f"ERROR: one edited term caused {puts} term PUT(s)")
+    server.shutdown()
+
+    print(f"{expected} terms, {args.latency_ms:g}ms stub latency:")
+    for name, seconds in (("serial", serial_s), ("prefetch", prefetch_s)):
+        calls = sum(n for c, n in first_calls[name].items() if c != "GET system")
+        print(f"   {name:<22} {seconds:>6.2f}s  {calls:>4} requests")
+    print(f"   {'prefetch, unchanged':<22} {rerun_s:>6.2f}s  {sum(rerun.values()) - rerun['GET system']:>4} requests")
+    print("✅ Glossary upsert checks passed.")
+
+
+if __name__ == "__main__":
+    main()
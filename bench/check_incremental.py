@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Check that the incremental dbt models give the same result as a full rebuild.
+
+Steps (against the database in PG* env vars, which it overwrites -- use a scratch DB):
+  1. load the first --split ZIPs with the loader (--mode replace), dbt run --full-refresh
+  2. load the remaining ZIPs, dbt run (incremental: only the new srcdirs are processed).
+     Unless --superseding 0, then load a generated ZIP for the following quarter and dbt run
+     again: a new 10-K for some companies' latest (cik, fy) with revenue, with a later period
+     so it becomes their canonical filing, but no num facts, so those keys' metrics must go
+  3. fingerprint every incremental model (all columns except loaded_at)
+  4. dbt run --full-refresh, fingerprint again and compare
+
+Exits non-zero if any model differs. Also prints incremental vs. full-refresh run time.
+
+Usage:
+  python bench/check_incremental.py --zips-dir /path/to/fixture_zips
+  python bench/check_incremental.py --zips-dir /path/to/fixture_zips --split 2 --dbt .venv/bin/dbt
+"""
+import os
+import sys
+import json
+import time
+import re
+import shutil
+import zipfile
+import argparse
+import tempfile
+import subprocess
+from datetime import datetime, timedelta
+
+import psycopg2
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOADER = os.path.join(ROOT, "elt", "pg_load_dera.py")
+DBT_PROJECT_DIR = os.path.join(ROOT, "dbt", "dera_dbt")
+
+PG_HOST = os.getenv("PGHOST", "localhost")
+PG_PORT = int(os.getenv("PGPORT", "5432"))
+PG_DB   = os.getenv("PGDATABASE", "dera")
+PG_USER = os.getenv("PGUSER", "dbt")
+PG_PASS = os.getenv("PGPASSWORD", "dbt")
+RAW_SCHEMA = os.getenv("DERA_RAW_SCHEMA", "raw_dera")
+
+
+def run(cmd: list, cwd: str = ROOT) -> float:
+    started = time.perf_counter()
+    print("▶ " + " ".join(cmd))
+    subprocess.run(cmd, cwd=cwd, check=True)
+    return time.perf_counter() - started
+
+
+def load(zip_paths: list, workdir: str) -> None:
+    # The loader takes a directory, so link each batch into its own folder
+    batch = tempfile.mkdtemp(dir=workdir)
+    for path in zip_paths:
+        os.symlink(path, os.path.join(batch, os.path.basename(path)))
+    run([sys.executable, LOADER, "--zips-dir", batch, "--mode", "replace"])
+
+
+def dbt(args: argparse.Namespace, *extra: str) -> float:
+    cmd = [args.dbt, "run", "--select", args.select, *extra]
+    if args.profiles_dir:
+        cmd += ["--profiles-dir", args.profiles_dir]
+    return run(cmd, cwd=args.dbt_project_dir)
+
+
+def dbt_seed(args: argparse.Namespace) -> float:
+    # int_num_metrics reads the metric_tags seed, which `dbt run` does not create
+    cmd = [args.dbt, "seed", "--select", "metric_tags", "--full-refresh"]
+    if args.profiles_dir:
+        cmd += ["--profiles-dir", args.profiles_dir]
+    return run(cmd, cwd=args.dbt_project_dir)
+
+
+def incremental_relations(project_dir: str) -> dict:
+    """model name -> relation name for every incremental model in the last run's manifest."""
+    with open(os.path.join(project_dir, "target", "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    return {
+        node["name"]: node["relation_name"]
+        for node in manifest["nodes"].values()
+        if node["resource_type"] == "model" and node["config"].get("materialized") == "incremental"
+    }
+
+
+def superseding_zip(conn, relations: dict, last_zip: str, workdir: str, n: int) -> str:
+    """
+    Write <quarter after last_zip>.zip with a fact-less 10-K replacing the canonical filing of the
+    latest (cik, fy) key in t_r of n companies. Its period is one day later, which wins dim_filing's ranking.
+    """
+    match = re.fullmatch(r"(\d{4})q([1-4])", os.path.basename(last_zip).split(".")[0])
+    if not match:
+        raise SystemExit(f"ERROR: {last_zip} is not named like 2021q1.zip; use --superseding 0")
+    year, q = int(match.group(1)), int(match.group(2))
+    srcdir = f"{year + 1}q1" if q == 4 else f"{year}q{q + 1}"
+    with conn.cursor() as cur:
+        # each company's latest year, so financials_latest has to fall back to an older one
+        cur.execute(f"select adsh from (select distinct on (cik) cik, adsh from {relations['t_r']} "
+                    f"order by cik, fy desc) t order by cik limit %s", (n,))
+        adshs = [row[0] for row in cur.fetchall()]
+        cur.execute(f'select * from "{RAW_SCHEMA}"."sub" where adsh = any(%s) order by adsh', (adshs,))
+        columns = [d[0] for d in cur.description if d[0] != "srcdir"]
+        subs = [dict(zip([d[0] for d in cur.description], row)) for row in cur.fetchall()]
+    conn.commit()
+    lines = ["\t".join(columns)]
+    for i, sub in enumerate(subs):
+        period = (datetime.strptime(sub["period"], "%Y%m%d") + timedelta(days=1)).strftime("%Y%m%d")
+        sub.update(adsh=f"9999999999-{year % 100:02d}-{i:06d}", form="10-K", period=period)
+        lines.append("\t".join(sub[c] or "" for c in columns))
+    path = os.path.join(workdir, f"{srcdir}.zip")
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        z.writestr("sub.txt", "\n".join(lines) + "\n")
+        z.writestr("num.txt", "adsh\ttag\tversion\tcoreg\tddate\tqtrs\tuom\tvalue\tfootnote\n")
+    print(f"   {srcdir}.zip: fact-less 10-Ks superseding {len(subs)} canonical filings")
+    return path
+
+
+def fingerprint(conn, relation: str) -> tuple:
+    """(row count, md5 over the sorted rows) ignoring loaded_at, which differs by design."""
+    schema, table = [p.strip('"') for p in relation.split(".")[-2:]]
+    with conn.cursor() as cur:
+        cur.execute("""
+          select column_name from information_schema.columns
+          where table_schema = %s and table_name = %s and column_name <> 'loaded_at'
+          order by ordinal_position
+        """, (schema, table))
+        cols = ", ".join(f'"{row[0]}"' for row in cur.fetchall())
+        cur.execute(f"select count(*), md5(coalesce(string_agg(r::text, '|' order by r::text), '')) "
+                    f"from (select {cols} from {relation}) r")
+        return cur.fetchone()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Compare incremental dbt runs against a full rebuild")
+    ap.add_argument("--zips-dir", required=True, help="fixture DERA .zip files (at least two quarters)")
+    ap.add_argument("--split", type=int, default=0,
+                    help="ZIPs loaded before the first run (default: all but the last)")
+    ap.add_argument("--dbt", default=shutil.which("dbt") or "dbt", help="dbt executable")
+    ap.add_argument("--dbt-project-dir", default=DBT_PROJECT_DIR)
+    ap.add_argument("--profiles-dir", help="passed to dbt --profiles-dir")
+    ap.add_argument("--superseding", type=int, default=5,
+                    help="(cik, fy) keys given a fact-less canonical 10-K in the incremental batch (0: none)")
+    ap.add_argument("--select", default="+stg_dera_num+ dim_filing",
+                    help="dbt models to run (default: stg_dera_num, its parents and children, and dim_filing)")
+    args = ap.parse_args()
+
+    zips_dir = os.path.abspath(os.path.expanduser(args.zips_dir))
+    zip_paths = sorted(os.path.join(zips_dir, f) for f in os.listdir(zips_dir) if f.lower().endswith(".zip"))
+    if len(zip_paths) < 2:
+        raise SystemExit("ERROR: need at least two ZIPs to split into an initial and an incremental batch")
+    split = args.split or len(zip_paths) - 1
+    if not 0 < split < len(zip_paths):
+        raise SystemExit(f"ERROR: --split must be between 1 and {len(zip_paths) - 1}")
+
+    conn = psycopg2.connect(host=PG_HOST, port=PG_PORT, dbname=PG_DB, user=PG_USER, password=PG_PASS)
+    with tempfile.TemporaryDirectory() as workdir:
+        load(zip_paths[:split], workdir)
+        dbt_seed(args)
+        dbt(args, "--full-refresh")
+        relations = incremental_relations(args.dbt_project_dir)
+        batch = zip_paths[split:]
+        load(batch, workdir)
+        incremental_seconds = dbt(args)
+        if args.superseding:
+            batch.append(superseding_zip(conn, relations, zip_paths[-1], workdir, args.superseding))
+            load(batch[-1:], workdir)
+            incremental_seconds += dbt(args)
+
+    incremental = {name: fingerprint(conn, rel) for name, rel in relations.items()}
+    conn.commit()
+    full_seconds = dbt(args, "--full-refresh")
+    full = {name: fingerprint(conn, rel) for name, rel in relations.items()}
+    conn.close()
+
+    print(f"\nIncremental vs. full rebuild ({split} + {len(batch)} ZIPs):")
+    mismatches = 0
+    for name in sorted(relations):
+        same = incremental[name] == full[name]
+        mismatches += not same
+        print(f"   {name:<24} {full[name][0]:>10,} rows  {'ok' if same else 'MISMATCH'}"
+              + ("" if same else f" (incremental has {incremental[name][0]:,} rows)"))
+    print(f"   dbt run: {incremental_seconds:.1f}s incremental, {full_seconds:.1f}s full refresh")
+    if mismatches:
+        raise SystemExit(f"ERROR: {mismatches} model(s) differ from a full rebuild")
+    print("✅ Incremental models match a full rebuild.")
+
+
+if __name__ == "__main__":
+    main()
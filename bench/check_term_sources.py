@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Check the streamed glossary term sources of upsert_glossary_terms.py and measure their
+peak memory against json.load.
+
+Writes --terms synthetic terms as a JSON array and as NDJSON, and reads each back. It
+checks that iter_terms() yields exactly what json.load gives, using several chunk sizes
+for the array parser. It reports the peak Python heap (tracemalloc) of both approaches.
+With --raw-tag it also streams raw_dera.tag (PG* env vars) and reports the count and peak
+heap.
+
+Needs the OpenMetadata client (openmetadata-ingestion), which upsert_glossary_terms.py
+imports.
+
+Usage:
+  python bench/check_term_sources.py
+  python bench/check_term_sources.py --terms 200000 --raw-tag
+"""
+import os
+import io
+import sys
+import json
+import argparse
+import tempfile
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+import upsert_glossary_terms as ugt  # noqa: E402
+
+
+def peak_mb(fn) -> tuple:
+    """(result, peak traced heap in MB) of fn()."""
+    tracemalloc.start()
+    try:
+        result = fn()
+        return result, tracemalloc.get_traced_memory()[1] / 1e6
+    finally:
+        tracemalloc.stop()
+
+
+def consume(items) -> tuple:
+    """(count, order-sensitive hash) without keeping the items."""
+    n, h = 0, 0
+    for item in items:
+        n += 1
+        h = hash((h, json.dumps(item, sort_keys=True)))
+    return n, h
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Check streamed glossary term sources")
+    ap.add_argument("--terms", type=int, default=50000)
+    ap.add_argument("--raw-tag", action="store_true", help="also stream raw_dera.tag from Postgres")
+    args = ap.parse_args()
+
+    terms = [{"tag": f"Tag{i}", "label": f"Label {i} \"quoted\" ünïcode",
+              "definition": "Definition with [brackets], {braces} and \\n escapes " * 3,
+              "glossary": f"Glossary {i % 7}", "rank": i * 1.5} for i in range(args.terms)]
+    expected = consume(terms)
+    del terms
+
+    with tempfile.TemporaryDirectory() as tmp:
+        array_path = os.path.join(tmp, "terms.json")
+        ndjson_path = os.path.join(tmp, "terms.ndjson")
+        with open(array_path, "w", encoding="utf-8") as fa, open(ndjson_path, "w", encoding="utf-8") as fn:
+            fa.write("[\n")
+            for i in range(args.terms):
+                item = {"tag": f"Tag{i}", "label": f"Label {i} \"quoted\" ünïcode",
+                        "definition": "Definition with [brackets], {braces} and \\n escapes " * 3,
+                        "glossary": f"Glossary {i % 7}", "rank": i * 1.5}
+                fa.write(("  " if i == 0 else ",\n  ") + json.dumps(item, ensure_ascii=False))
+                fn.write(json.dumps(item) + "\n")
+            fa.write("\n]\n")
+
+        def load_all():
+            with open(array_path, encoding="utf-8") as f:
+                return consume(json.load(f))
+
+        results = {
+            "json.load (array)": peak_mb(load_all),
+            "iter_terms (array)": peak_mb(lambda: consume(ugt.iter_terms(array_path))),
+            "iter_terms (ndjson)": peak_mb(lambda: consume(ugt.iter_terms(ndjson_path))),
+        }
+        for chunk in (1, 7, 4096):
+            with open(array_path, encoding="utf-8") as f:
+                if consume(ugt.iter_json_array(f, chunk_size=chunk)) != expected:
+                    raise SystemExit(f"ERROR: iter_json_array with chunk_size={chunk} differs from json.load")
+        size_mb = os.path.getsize(array_path) / 1e6
+
+    for bad in ("{}", "[1, 2", "[{\"a\": 1} {\"b\": 2}]"):
+        try:
+            consume(ugt.iter_json_array(io.StringIO(bad)))
+        except ValueError:
+            continue
+        raise SystemExit(f"ERROR: malformed input accepted: {bad!r}")
+
+    print(f"{args.terms:,} terms ({size_mb:.1f} MB array file):")
+    for name, (result, mb) in results.items():
+        if result != expected:
+            raise SystemExit(f"ERROR: {name} yielded different terms")
+        print(f"   {name:<22} peak heap {mb:>8.1f} MB")
+
+    if args.raw_tag:
+        (count, _), mb = peak_mb(lambda: consume(ugt.iter_raw_tags("US-GAAP Taxonomy", include_custom=True)))
+        print(f"   {'raw_dera.tag':<22} peak heap {mb:>8.1f} MB  ({count:,} tags)")
+    print("✅ Term sources match json.load.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Per-model dbt build times, for before/after comparisons of model changes.
+
+Runs `dbt run --full-refresh --select <models>` --repeat times and reports, for every
+model, the fastest execution time from target/run_results.json. Save a baseline with
+--json-out on the old code, then pass it to --compare on the new code.
+
+Usage:
+  python bench/dbt_timings.py --json-out before.json
+  python bench/dbt_timings.py --compare before.json
+  python bench/dbt_timings.py --select "fx_rates fx_resolved t_r" --repeat 5
+"""
+import os
+import json
+import shutil
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DBT_PROJECT_DIR = os.path.join(ROOT, "dbt", "dera_dbt")
+
+# FX models and everything that converts through them
+DEFAULT_SELECT = "dim_uom fx_rates fx_resolved t_r t_i t_a t_c t_d t_f"
+
+
+def run_once(args: argparse.Namespace) -> dict:
+    """model name -> execution seconds for one dbt run."""
+    cmd = [args.dbt, "run", "--full-refresh", "--select", *args.select.split()]
+    if args.profiles_dir:
+        cmd += ["--profiles-dir", args.profiles_dir]
+    subprocess.run(cmd, cwd=args.dbt_project_dir, check=True, stdout=subprocess.DEVNULL)
+    with open(os.path.join(args.dbt_project_dir, "target", "run_results.json"), encoding="utf-8") as f:
+        results = json.load(f)["results"]
+    return {r["unique_id"].split(".")[-1]: r["execution_time"] for r in results if r["status"] == "success"}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Time dbt model builds (best of N full refreshes)")
+    ap.add_argument("--select", default=DEFAULT_SELECT, help="space-separated dbt selection")
+    ap.add_argument("--repeat", type=int, default=3, help="dbt runs; the fastest time per model is reported")
+    ap.add_argument("--dbt", default=shutil.which("dbt") or "dbt", help="dbt executable")
+    ap.add_argument("--dbt-project-dir", default=DBT_PROJECT_DIR)
+    ap.add_argument("--profiles-dir", help="passed to dbt --profiles-dir")
+    ap.add_argument("--json-out", help="write {model: seconds} to this file")
+    ap.add_argument("--compare", help="baseline file written by --json-out on the old code")
+    args = ap.parse_args()
+
+    best = {}
+    for i in range(args.repeat):
+        print(f"▶ dbt run {i + 1}/{args.repeat}")
+        for model, seconds in run_once(args).items():
+            best[model] = min(seconds, best.get(model, seconds))
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    print(f"\n{'model':<16} {'before (s)':>11} {'after (s)':>10} {'speedup':>8}")
+    for model in sorted(set(best) | set(baseline)):
+        after, before = best.get(model), baseline.get(model)
+        cols = [f"{before:>11.3f}" if before is not None else f"{'-':>11}",
+                f"{after:>10.3f}" if after is not None else f"{'-':>10}"]
+        speedup = f"{before / after:>7.1f}x" if before and after else f"{'':>8}"
+        print(f"{model:<16} {' '.join(cols)} {speedup}")
+    if baseline:
+        shared = set(best) & set(baseline)
+        print(f"{'total (shared)':<16} {sum(baseline[m] for m in shared):>11.3f} {sum(best[m] for m in shared):>10.3f}")
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(best, f, indent=2, sort_keys=True)
+        print(f"wrote {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+EXPLAIN ANALYZE timings for the hot join/filter paths of the dbt project, with and
+without the indexes declared in the model configs.
+
+"after" runs each query against the models as built. "before" runs it again inside a
+transaction that drops every index on the relations involved, then rolls back, so
+both numbers come from the same data and statistics. Run `dbt run` first; relation
+names are read from the dbt manifest.
+
+Usage:
+  python bench/explain_bench.py
+  python bench/explain_bench.py --repeat 5 --json-out explain_bench.json
+"""
+import os
+import re
+import json
+import argparse
+
+import psycopg2
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DBT_PROJECT_DIR = os.path.join(ROOT, "dbt", "dera_dbt")
+
+PG_HOST = os.getenv("PGHOST", "localhost")
+PG_PORT = int(os.getenv("PGPORT", "5432"))
+PG_DB   = os.getenv("PGDATABASE", "dera")
+PG_USER = os.getenv("PGUSER", "dbt")
+PG_PASS = os.getenv("PGPASSWORD", "dbt")
+
+# {model} placeholders are replaced with the relation dbt built for that model
+QUERIES = {
+    "num tag filter": """
+        select adsh, max(value) from {stg_dera_num}
+        where tag in ('Revenues', 'Revenue', 'SalesRevenueGoodsNet') and qtrs = 4 and coreg is null
+        group by adsh""",
+    "num join sub": """
+        select s.cik, s.fy, max(n.value) from {stg_dera_sub} s
+        join {stg_dera_num} n using (adsh)
+        where n.tag = 'Assets' and n.qtrs = 0 and s.form in ('10-K', '20-F', '40-F')
+        group by s.cik, s.fy""",
+    "fx lookup": """
+        select b.adsh, coalesce(fx0.to_usd, fx1.to_usd, avg0.to_usd) from {fy_revenue_xyz} b
+        left join {closing_fx} fx0 on fx0.base = left(b.uom, 3) and fx0.ddate = b.ddate
+        left join {closing_fx} fx1 on fx1.base = left(b.uom, 3) and fx1.ddate = b.ddate - interval '1 month'
+        left join {average_fx} avg0 on avg0.base = left(b.uom, 3) and avg0.ddate = b.ddate""",
+    "fx resolved lookup": """
+        select b.adsh, fx.to_usd from {fy_revenue_xyz} b
+        left join {fx_resolved} fx on fx.base = left(b.uom, 3) and fx.ddate = b.ddate""",
+    "financials joins": """
+        select count(*) from {t_r} r
+        left join {t_i} i on r.cik = i.cik and r.ddate = i.ddate
+        left join {t_f} f on r.cik = f.cik and r.fy = f.fy
+        left join {t_a} a on r.cik = a.cik and r.ddate = a.ddate""",
+    "financials one cik": """
+        select * from {financials} where cik = (select min(cik) from {t_r})""",
+    "incremental keys": """
+        select cik, fy from {fy_revenue_usd}
+        where loaded_at > (select max(loaded_at) - interval '1 second' from {t_r})""",
+}
+
+
+def load_models(project_dir: str) -> dict:
+    """model name -> manifest node, from the last dbt run."""
+    with open(os.path.join(project_dir, "target", "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    return {node["name"]: node for node in manifest["nodes"].values() if node["resource_type"] == "model"}
+
+
+def tables_behind(models: dict, names: list) -> set:
+    """Relations whose indexes a query can use: views are expanded to the models they read."""
+    by_id = {node["unique_id"]: node for node in models.values()}
+    found, stack = set(), [models[n] for n in names]
+    while stack:
+        node = stack.pop()
+        if node["config"].get("materialized") == "view":
+            stack.extend(by_id[d] for d in node["depends_on"]["nodes"] if d in by_id)
+        else:
+            found.add(node["relation_name"])
+    return found
+
+
+def explain_ms(cur, sql: str, repeat: int) -> float:
+    """Best-of-N execution time reported by EXPLAIN ANALYZE, in milliseconds."""
+    best = None
+    for _ in range(repeat):
+        cur.execute("EXPLAIN (ANALYZE, FORMAT JSON) " + sql)
+        ms = cur.fetchone()[0][0]["Execution Time"]
+        best = ms if best is None else min(best, ms)
+    return best
+
+
+def drop_indexes(cur, rels: list) -> int:
+    """Drop every index on the given tables (caller rolls back); returns how many."""
+    dropped = 0
+    for rel in rels:
+        schema, table = [p.strip('"') for p in rel.split(".")[-2:]]
+        cur.execute("select schemaname, indexname from pg_indexes where schemaname = %s and tablename = %s",
+                    (schema, table))
+        for idx_schema, idx in cur.fetchall():
+            cur.execute(f'DROP INDEX "{idx_schema}"."{idx}"')
+            dropped += 1
+    return dropped
+
+
+def main():
+    ap = argparse.ArgumentParser(description="EXPLAIN ANALYZE hot dbt queries with and without indexes")
+    ap.add_argument("--dbt-project-dir", default=DBT_PROJECT_DIR)
+    ap.add_argument("--repeat", type=int, default=3, help="runs per query; the fastest is reported")
+    ap.add_argument("--json-out", help="also write results to this JSON file")
+    args = ap.parse_args()
+
+    models = load_models(args.dbt_project_dir)
+    rels = {name: node["relation_name"] for name, node in models.items()}
+    conn = psycopg2.connect(host=PG_HOST, port=PG_PORT, dbname=PG_DB, user=PG_USER, password=PG_PASS)
+    results = []
+    print(f"{'query':<20} {'before (ms)':>12} {'after (ms)':>12} {'speedup':>8}")
+    for name, template in QUERIES.items():
+        used = re.findall(r"\{(\w+)\}", template)
+        missing = [m for m in used if m not in rels]
+        if missing:
+            print(f"{name:<20} skipped: models not in manifest: {', '.join(missing)}")
+            continue
+        sql = template.format(**rels)
+        with conn.cursor() as cur:
+            after = explain_ms(cur, sql, args.repeat)
+            dropped = drop_indexes(cur, sorted(tables_behind(models, used)))
+            before = explain_ms(cur, sql, args.repeat)
+        conn.rollback()  # restores the dropped indexes
+        speedup = before / after if after > 0 else 0.0
+        print(f"{name:<20} {before:>12.2f} {after:>12.2f} {speedup:>7.1f}x  ({dropped} indexes)")
+        results.append({"query": name, "before_ms": before, "after_ms": after, "indexes": dropped})
+    conn.close()
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"wrote {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Load test of financials_api.py: p50/p99 latency and QPS of its lookups, without and with
+the result cache, against the local database.
+
+Each phase starts the API as a subprocess (--cache-size 0, then the default cache) and runs
+--clients keep-alive HTTP clients for --duration seconds. Every request picks a lookup at
+random (company, latest, industry, industry year, fiscal year page, float) and a key from
+a hot set of --keys companies / industries taken from financials, so the cached phase
+shows hit rates a dashboard would see. After the cached phase a NOTIFY on the load channel
+checks that the API drops its cache. Run `dbt run` first.
+
+Usage:
+  python bench/financials_api_load.py
+  python bench/financials_api_load.py --clients 16 --duration 20 --json-out api_load.json
+  python bench/financials_api_load.py --url http://127.0.0.1:8600   # an API already running
+"""
+import os
+import sys
+import json
+import time
+import random
+import socket
+import argparse
+import threading
+import subprocess
+import http.client
+from urllib.parse import urlsplit
+
+import psycopg2
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from financials_api import MARTS_SCHEMA, LOAD_CHANNEL, dsn  # noqa: E402
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def hot_keys(schema: str, n: int, seed: int) -> dict:
+    conn = psycopg2.connect(dsn())
+    with conn.cursor() as cur:
+        cur.execute(f'select distinct cik from "{schema}"."financials"')
+        ciks = [r[0] for r in cur.fetchall()]
+        cur.execute(f'select distinct sic, extract(year from fy)::int from "{schema}"."financials" '
+                    f'where sic is not null')
+        sic_fys = cur.fetchall()
+    conn.close()
+    if not ciks:
+        raise SystemExit("ERROR: financials is empty; run dbt first")
+    rnd = random.Random(seed)
+    return {"cik": rnd.sample(ciks, min(n, len(ciks))), "sic_fy": rnd.sample(sic_fys, min(n, len(sic_fys)))}
+
+
+# (name, path builder from the hot keys)
+LOOKUPS = [
+    ("company", lambda k, r: f"/financials/cik/{r.choice(k['cik'])}"),
+    ("latest", lambda k, r: f"/financials/cik/{r.choice(k['cik'])}/latest"),
+    ("industry", lambda k, r: f"/financials/sic/{r.choice(k['sic_fy'])[0]}"),
+    ("industry_year", lambda k, r: "/financials/sic/{}/{}".format(*r.choice(k["sic_fy"]))),
+    ("fiscal_year", lambda k, r: f"/financials/fy/{r.choice(k['sic_fy'])[1]}?limit=100"),
+    ("float", lambda k, r: f"/float/cik/{r.choice(k['cik'])}"),
+]
+
+
+def get_json(host: str, port: int, path: str):
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    conn.request("GET", path)
+    resp = conn.getresponse()
+    body = json.loads(resp.read())
+    conn.close()
+    return resp.status, body
+
+
+def client(host: str, port: int, keys: dict, seed: int, deadline: float, timings: dict, errors: list) -> None:
+    rnd = random.Random(seed)
+    conn = http.client.HTTPConnection(host, port, timeout=10)
+    while time.perf_counter() < deadline:
+        name, path = rnd.choice(LOOKUPS)
+        path = path(keys, rnd)
+        started = time.perf_counter()
+        conn.request("GET", path)
+        resp = conn.getresponse()
+        resp.read()
+        timings[name].append((time.perf_counter() - started) * 1000)
+        if resp.status != 200:
+            errors.append(f"{path}: HTTP {resp.status}")
+    conn.close()
+
+
+def start_api(args, cache_size: int) -> tuple:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    proc = subprocess.Popen([sys.executable, os.path.join(ROOT, "financials_api.py"), "--port", str(port),
+                             "--pool-size", str(args.pool_size), "--cache-size", str(cache_size),
+                             "--schema", args.schema], stdout=subprocess.DEVNULL)
+    for _ in range(100):
+        try:
+            get_json("127.0.0.1", port, "/health")
+            return proc, "127.0.0.1", port
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise SystemExit("ERROR: financials_api.py did not start")
+
+
+def run_phase(name: str, host: str, port: int, keys: dict, args) -> dict:
+    timings = {lookup: [] for lookup, _ in LOOKUPS}
+    errors = []
+    # warm the pool's prepared statements before timing
+    for lookup, path in LOOKUPS:
+        get_json(host, port, path(keys, random.Random(0)))
+    deadline = time.perf_counter() + args.duration
+    threads = [threading.Thread(target=client, args=(host, port, keys, args.seed + i, deadline, timings, errors))
+               for i in range(args.clients)]
+    started = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.perf_counter() - started
+    if errors:
+        raise SystemExit(f"ERROR: {len(errors)} failed request(s), e.g. {errors[0]}")
+    everything = [ms for values in timings.values() for ms in values]
+    _status, health = get_json(host, port, "/health")
+    cache = health["cache"]
+    lookups = cache["hits"] + cache["misses"]
+    row = {"phase": name, "requests": len(everything), "qps": len(everything) / wall,
+           "p50_ms": percentile(everything, 50), "p99_ms": percentile(everything, 99),
+           "cache_hit_rate": cache["hits"] / lookups if lookups else 0.0,
+           "lookups": {lookup: {"requests": len(v), "p50_ms": percentile(v, 50), "p99_ms": percentile(v, 99)}
+                       for lookup, v in timings.items() if v}}
+    print(f"\n{name}: {row['requests']:,} requests in {wall:.1f}s, {row['qps']:,.0f} QPS, "
+          f"p50 {row['p50_ms']:.2f} ms, p99 {row['p99_ms']:.2f} ms, cache hit rate {row['cache_hit_rate']:.0%}")
+    print(f"   {'lookup':<14} {'requests':>9} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+    for lookup, stats in row["lookups"].items():
+        print(f"   {lookup:<14} {stats['requests']:>9,} {stats['p50_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+    return row
+
+
+def check_invalidation(host: str, port: int) -> None:
+    """NOTIFY the load channel as the loader does and wait for the API to drop its cache."""
+    _status, before = get_json(host, port, "/health")
+    conn = psycopg2.connect(dsn())
+    conn.autocommit = True
+    with conn.cursor() as cur:
+        cur.execute("select pg_notify(%s, %s)", (LOAD_CHANNEL, "bench"))
+    conn.close()
+    for _ in range(50):
+        _status, after = get_json(host, port, "/health")
+        if after["cache"]["invalidations"] > before["cache"]["invalidations"]:
+            print(f"✔ cache dropped on a {LOAD_CHANNEL} event ({before['cache']['entries']:,} entries)")
+            return
+        time.sleep(0.1)
+    raise SystemExit(f"ERROR: the API did not drop its cache after NOTIFY {LOAD_CHANNEL}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Latency and QPS of financials_api.py, uncached vs. cached")
+    ap.add_argument("--url", help="test an API that is already running (one phase, its own cache settings)")
+    ap.add_argument("--clients", type=int, default=8, help="concurrent keep-alive HTTP clients")
+    ap.add_argument("--duration", type=float, default=10.0, help="seconds per phase")
+    ap.add_argument("--keys", type=int, default=500, help="hot companies / (sic, fy) groups requested")
+    ap.add_argument("--pool-size", type=int, default=8, help="API connection pool size")
+    ap.add_argument("--cache-size", type=int, default=10000, help="API cache size in the cached phase")
+    ap.add_argument("--schema", default=MARTS_SCHEMA)
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--json-out", help="also write results to this JSON file")
+    args = ap.parse_args()
+
+    keys = hot_keys(args.schema, args.keys, args.seed)
+    print(f"{len(keys['cik']):,} hot companies, {len(keys['sic_fy']):,} hot (sic, fy) groups, "
+          f"{args.clients} clients x {args.duration:.0f}s per phase")
+    results = []
+    if args.url:
+        url = urlsplit(args.url)
+        results.append(run_phase("api", url.hostname, url.port or 80, keys, args))
+        check_invalidation(url.hostname, url.port or 80)
+    else:
+        for name, cache_size in (("uncached", 0), ("cached", args.cache_size)):
+            proc, host, port = start_api(args, cache_size)
+            try:
+                results.append(run_phase(name, host, port, keys, args))
+                if cache_size:
+                    check_invalidation(host, port)
+            finally:
+                proc.terminate()
+                proc.wait()
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"wrote {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
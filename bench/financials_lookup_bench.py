@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Query latency of single-company and single-industry lookups on the financials marts.
+
+Each lookup runs for --samples random keys taken from financials and reports client-side
+latency percentiles. The "view chain" rows run the previous view definition of financials
+(t_r joined to stg_dera_sub and the other t_* tables) as a subquery. That is what every
+dashboard query evaluated before financials became a table, so both sides run on the same
+data. Run `dbt run` first; relation names are read from the dbt manifest.
+
+Usage:
+  python bench/financials_lookup_bench.py
+  python bench/financials_lookup_bench.py --samples 500 --json-out lookups.json
+"""
+import os
+import json
+import time
+import random
+import argparse
+
+import psycopg2
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DBT_PROJECT_DIR = os.path.join(ROOT, "dbt", "dera_dbt")
+
+PG_HOST = os.getenv("PGHOST", "localhost")
+PG_PORT = int(os.getenv("PGPORT", "5432"))
+PG_DB   = os.getenv("PGDATABASE", "dera")
+PG_USER = os.getenv("PGUSER", "dbt")
+PG_PASS = os.getenv("PGPASSWORD", "dbt")
+
+# financials as it was defined when it was a view
+VIEW_CHAIN = """
+    select r.name, r.cik, r.fy, r.ddate, r.sic, r.revenue_usd, i.income_usd,
+           f.float_usd as market_cap_usd, d.debt_usd, c.cash_usd, a.assets_usd
+    from {t_r} r
+    join {stg_dera_sub} s on r.cik = s.cik and r.fy = s.fy and s.form in ('10-K','20-F','40-F')
+    left join {t_i} i on r.cik = i.cik and r.ddate = i.ddate
+    left join {t_f} f on r.cik = f.cik and r.fy   = f.fy
+    left join {t_d} d on r.cik = d.cik and r.ddate = d.ddate
+    left join {t_c} c on r.cik = c.cik and r.ddate = c.ddate
+    left join {t_a} a on r.cik = a.cik and r.ddate = a.ddate"""
+
+SIC_AGGREGATE = """
+    select count(distinct cik), sum(revenue_usd), sum(income_usd), sum(assets_usd),
+           percentile_cont(0.5) within group (order by revenue_usd)
+    from {source} f where sic = %(sic)s and fy = %(fy)s"""
+
+# (name, key kind, query template); {model} placeholders become relation names
+LOOKUPS = [
+    ("cik: view chain", "cik", "select * from (" + VIEW_CHAIN + ") v where cik = %(cik)s"),
+    ("cik: financials", "cik", "select * from {financials} where cik = %(cik)s"),
+    ("cik latest: view chain", "cik",
+     "select * from (" + VIEW_CHAIN + ") v where cik = %(cik)s order by fy desc, ddate desc limit 1"),
+    ("cik latest: snapshot", "cik", "select * from {financials_latest} where cik = %(cik)s"),
+    ("sic: view chain", "sic", SIC_AGGREGATE.replace("{source}", "(" + VIEW_CHAIN + ")")),
+    ("sic: financials", "sic", SIC_AGGREGATE.replace("{source}", "{financials}")),
+    ("sic: summary", "sic", "select * from {financials_sic_summary} where sic = %(sic)s and fy = %(fy)s"),
+]
+
+
+def relations(project_dir: str) -> dict:
+    """model name -> relation name, from the last dbt run's manifest."""
+    with open(os.path.join(project_dir, "target", "manifest.json"), encoding="utf-8") as f:
+        manifest = json.load(f)
+    return {node["name"]: node["relation_name"] for node in manifest["nodes"].values()
+            if node["resource_type"] == "model"}
+
+
+def percentile(values: list, p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Latency of CIK and SIC lookups on the financials marts")
+    ap.add_argument("--dbt-project-dir", default=DBT_PROJECT_DIR)
+    ap.add_argument("--samples", type=int, default=200, help="random keys per lookup")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--json-out", help="also write results to this JSON file")
+    args = ap.parse_args()
+
+    rels = relations(args.dbt_project_dir)
+    conn = psycopg2.connect(host=PG_HOST, port=PG_PORT, dbname=PG_DB, user=PG_USER, password=PG_PASS)
+    conn.autocommit = True
+    rnd = random.Random(args.seed)
+    with conn.cursor() as cur:
+        cur.execute(f"select distinct cik from {rels['financials']}")
+        ciks = [r[0] for r in cur.fetchall()]
+        cur.execute(f"select distinct sic, fy from {rels['financials']} where sic is not null")
+        sic_fys = cur.fetchall()
+    if not ciks:
+        raise SystemExit("ERROR: financials is empty; run dbt first")
+    keys = {"cik": [{"cik": rnd.choice(ciks)} for _ in range(args.samples)],
+            "sic": [dict(zip(("sic", "fy"), rnd.choice(sic_fys))) for _ in range(args.samples)]}
+
+    results = []
+    print(f"{len(ciks):,} companies, {len(sic_fys):,} (sic, fy) groups, {args.samples} lookups each\n")
+    print(f"{'lookup':<24} {'p50 (ms)':>9} {'p95 (ms)':>9} {'p99 (ms)':>9} {'mean (ms)':>10}")
+    for name, kind, template in LOOKUPS:
+        sql = template.format(**rels)
+        timings = []
+        with conn.cursor() as cur:
+            cur.execute(sql, keys[kind][0])  # warm the plan and cache once
+            cur.fetchall()
+            for params in keys[kind]:
+                started = time.perf_counter()
+                cur.execute(sql, params)
+                cur.fetchall()
+                timings.append((time.perf_counter() - started) * 1000)
+        row = {"lookup": name, "p50_ms": percentile(timings, 50), "p95_ms": percentile(timings, 95),
+               "p99_ms": percentile(timings, 99), "mean_ms": sum(timings) / len(timings)}
+        results.append(row)
+        print(f"{name:<24} {row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f} {row['mean_ms']:>10.2f}")
+    conn.close()
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"wrote {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Generate synthetic DERA Financial Statement quarterly ZIPs (sub.txt, num.txt, tag.txt) for
+benchmarks and checks, without downloading SEC data.
+
+The shape follows the real files:
+  - a fixed population of registrants files every quarter. Forms are mostly 10-Q/10-K,
+    with some 20-F/40-F/8-K and ~5% amendments (prevrpt=1).
+  - num facts mix the tags the dbt project reads (taken from the project itself, like
+    pg_load_dera.py --tag-filter dbt) with a Zipf-distributed tail of other us-gaap tags
+    and filer-specific custom tags.
+  - most facts are USD. A --fx-share of registrants report in EUR/GBP/JPY/CAD/CHF/...
+    and file closing and average FX rates with pair UOMs like 'EURUSD', 'USD/JPY' or
+    'GBP-USD'. There are also shares/pure/USD-per-share facts and coregistrant and
+    footnoted rows.
+  - instants (qtrs=0) and durations (qtrs=1/4) are for the current and prior period.
+  - tag.txt lists every tag used.
+
+Output is deterministic for a given --seed and size (fixed ZIP timestamps), so runs on
+different commits load byte-identical files.
+
+Usage:
+  python bench/gen_dera_zips.py --out /tmp/dera_zips
+  python bench/gen_dera_zips.py --out /tmp/dera_zips --quarters 8 --filings 5000 --facts 120
+"""
+import os
+import sys
+import math
+import random
+import zipfile
+import argparse
+import calendar
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "elt"))
+from pg_load_dera import dbt_referenced_tags  # noqa: E402
+
+SUB_COLUMNS = ["adsh", "cik", "name", "sic", "countryba", "stprba", "cityba", "zipba", "bas1", "bas2", "baph",
+               "countryma", "stprma", "cityma", "zipma", "mas1", "mas2", "countryinc", "stprinc", "ein", "former",
+               "changed", "afs", "wksi", "fye", "form", "period", "fy", "fp", "filed", "accepted", "prevrpt",
+               "detail", "instance", "nciks", "aciks"]
+NUM_COLUMNS = ["adsh", "tag", "version", "coreg", "ddate", "qtrs", "uom", "value", "footnote"]
+TAG_COLUMNS = ["tag", "version", "custom", "abstract", "datatype", "iord", "crdr", "tlabel", "doc"]
+
+FORMS = [("10-Q", 0.55), ("10-K", 0.30), ("20-F", 0.06), ("40-F", 0.03), ("8-K", 0.06)]
+SICS = [1311, 2834, 3674, 3711, 4911, 5812, 6021, 6022, 6798, 7372, 7389, 8731]
+# non-USD reporting currencies, USD per unit, and how filers write the FX pair UOM
+CURRENCIES = {"EUR": 1.10, "GBP": 1.27, "JPY": 0.0072, "CAD": 0.74, "CHF": 1.12, "AUD": 0.66, "CNY": 0.14}
+PAIR_STYLES = ["{c}USD", "USD{c}", "{c}/USD", "USD/{c}", "{c}-USD"]
+FX_TAGS = {"ClosingForeignExchangeRate", "ForeignCurrencyExchangeRateTranslation1", "AverageForeignExchangeRate"}
+DURATION_HINTS = ("Revenue", "Income", "Loss", "Sales", "WeightedAverage", "Comprehensive")
+SHARE_HINTS = ("Shares", "Stock")
+PRICE_HINTS = ("Price", "PerShare")
+ZIP_TIME = (2024, 1, 1, 0, 0, 0)
+
+
+def month_end(year: int, month: int) -> str:
+    return f"{year}{month:02d}{calendar.monthrange(year, month)[1]:02d}"
+
+
+def quarters(start: str, count: int) -> list:
+    """['2021q1', '2021q2', ...] starting at `start`."""
+    year, q = int(start[:4]), int(start[-1])
+    out = []
+    for _ in range(count):
+        out.append(f"{year}q{q}")
+        year, q = (year + 1, 1) if q == 4 else (year, q + 1)
+    return out
+
+
+def tag_kind(tag: str) -> tuple:
+    """(qtrs for a full-year fact, uom family) guessed from the tag name, like real filers' usage."""
+    if tag in FX_TAGS:
+        return (4 if tag.startswith("Average") else 0), "pair"
+    if any(h in tag for h in PRICE_HINTS):
+        return 0, "per_share"
+    if any(h in tag for h in SHARE_HINTS) and "Value" not in tag:
+        return 0, "shares"
+    return (4 if any(h in tag for h in DURATION_HINTS) else 0), "money"
+
+
+def write_member(z: zipfile.ZipFile, name: str, header: list, rows: list) -> None:
+    info = zipfile.ZipInfo(name, ZIP_TIME)
+    info.compress_type = zipfile.ZIP_DEFLATED
+    z.writestr(info, "\t".join(header) + "\n" + "".join("\t".join(r) + "\n" for r in rows))
+
+
+def generate(out_dir: str, n_quarters: int = 4, start: str = "2021q1", filings: int = 2000,
+             facts: int = 60, fx_share: float = 0.2, other_tags: int = 3000, seed: int = 42) -> list:
+    """Write the ZIPs; returns [(path, {member: rows})]."""
+    rnd = random.Random(seed)
+    os.makedirs(out_dir, exist_ok=True)
+
+    key_tags = sorted(dbt_referenced_tags() - FX_TAGS)
+    tail_tags = [f"SyntheticUsGaapElement{i:05d}" for i in range(other_tags)]
+    # Zipf weights over the tail: a few tags are everywhere, most are rare
+    tail_weights = [1.0 / (i + 1) for i in range(other_tags)]
+
+    registrants = []
+    for i in range(filings):
+        ccy = rnd.choice(list(CURRENCIES)) if rnd.random() < fx_share else "USD"
+        registrants.append({
+            "cik": str(1_000_000 + i * 7), "name": f"SYNTHETIC CORP {i}", "sic": str(rnd.choice(SICS)),
+            "ccy": ccy, "pair": rnd.choice(PAIR_STYLES), "scale": math.exp(rnd.gauss(19, 2.2)),
+            "country": "US" if ccy == "USD" else ccy[:2], "ein": str(rnd.randint(10**8, 10**9 - 1)),
+        })
+
+    written = []
+    for qi, srcdir in enumerate(quarters(start, n_quarters)):
+        year, q = int(srcdir[:4]), int(srcdir[-1])
+        sub, num, tags_used = [], [], {}
+        for ri, reg in enumerate(registrants):
+            form = rnd.choices([f for f, _ in FORMS], [w for _, w in FORMS])[0]
+            fp = "FY" if form in ("10-K", "20-F", "40-F") else ("Q%d" % rnd.randint(1, 3) if form == "10-Q" else "")
+            period_month = ((q - 2) % 4) * 3 + 3 if q > 1 else 12
+            period_year = year - 1 if q == 1 else year
+            period = month_end(period_year, period_month)
+            adsh = f"{int(reg['cik']) % 10**10:010d}-{year % 100:02d}-{qi * filings + ri:06d}"
+            sub.append([adsh, reg["cik"], reg["name"], reg["sic"], reg["country"], "", "CITY", "00000",
+                        "1 MAIN ST", "", "555-0100", reg["country"], "", "CITY", "00000", "1 MAIN ST", "",
+                        reg["country"], "", reg["ein"], "", "", "1-LAF", "0", "1231", form, period,
+                        str(period_year), fp, f"{year}{q * 3 - 1:02d}15", f"{year}-{q * 3 - 1:02d}-15 16:30:00.0",
+                        "1" if rnd.random() < 0.05 else "0", "1", f"synthetic-{adsh}.htm", "1", ""])
+
+            prior = month_end(period_year - 1, period_month)
+            picks = rnd.sample(key_tags, min(len(key_tags), max(4, facts // 4)))
+            picks += rnd.choices(tail_tags, tail_weights, k=max(0, facts - len(picks) - 4))
+            if reg["ccy"] != "USD":
+                picks += ["ClosingForeignExchangeRate", "AverageForeignExchangeRate"]
+            picks += [f"Custom{reg['cik']}Element{k}" for k in range(2)]
+            for tag in picks:
+                qtrs, family = tag_kind(tag)
+                custom = tag.startswith("Custom")
+                version = adsh if custom else "us-gaap/2023"
+                tags_used[(tag, version)] = custom
+                for ddate in (period, prior):
+                    value, uom = reg["scale"] * rnd.uniform(0.2, 1.5), reg["ccy"]
+                    if family == "pair":
+                        c = reg["ccy"]
+                        uom = reg["pair"].format(c=c)
+                        rate = CURRENCIES[c] * rnd.uniform(0.95, 1.05)
+                        value = 1 / rate if uom.startswith("USD") else rate
+                    elif family == "shares":
+                        value, uom = value / 40, "shares"
+                    elif family == "per_share":
+                        value, uom = rnd.uniform(1, 400), f"{reg['ccy']}/shares"
+                    dq = qtrs if fp == "FY" or qtrs == 0 else 1
+                    coreg = f"SubsidiaryMember{rnd.randint(1, 3)}" if rnd.random() < 0.03 else ""
+                    footnote = "Restated. See note 2." if rnd.random() < 0.01 else ""
+                    num.append([adsh, tag, version, coreg, ddate, str(dq), uom,
+                                f"{value:.4f}" if family == "pair" else f"{value:.0f}", footnote])
+
+        tag_rows = []
+        for (tag, version), custom in sorted(tags_used.items()):
+            qtrs, family = tag_kind(tag)
+            label = " ".join(w for w in tag.replace("Element", " Element ").split())
+            tag_rows.append([tag, version, "1" if custom else "0", "0",
+                             "shares" if family == "shares" else "monetary", "I" if qtrs == 0 else "D",
+                             "D" if rnd.random() < 0.5 else "C", label, f"Synthetic definition of {label}."])
+
+        path = os.path.join(out_dir, f"{srcdir}.zip")
+        with zipfile.ZipFile(path, "w") as z:
+            write_member(z, "sub.txt", SUB_COLUMNS, sub)
+            write_member(z, "num.txt", NUM_COLUMNS, num)
+            write_member(z, "tag.txt", TAG_COLUMNS, tag_rows)
+        written.append((path, {"sub": len(sub), "num": len(num), "tag": len(tag_rows)}))
+    return written
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Generate synthetic DERA quarterly ZIPs")
+    ap.add_argument("--out", required=True, help="directory for the ZIPs")
+    ap.add_argument("--quarters", type=int, default=4)
+    ap.add_argument("--start", default="2021q1", help="first quarter, e.g. 2021q1")
+    ap.add_argument("--filings", type=int, default=2000, help="filings (registrants) per quarter")
+    ap.add_argument("--facts", type=int, default=60, help="distinct tags per filing (two periods each)")
+    ap.add_argument("--fx-share", type=float, default=0.2, help="share of registrants reporting in non-USD")
+    ap.add_argument("--other-tags", type=int, default=3000, help="size of the long tail of non-dbt tags")
+    ap.add_argument("--seed", type=int, default=42)
+    args = ap.parse_args()
+
+    for path, rows in generate(args.out, args.quarters, args.start, args.filings, args.facts,
+                               args.fx_share, args.other_tags, args.seed):
+        print(f"{path}: " + ", ".join(f"{m} {n:,}" for m, n in rows.items())
+              + f" ({os.path.getsize(path) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Minimal local stand-in for the OpenMetadata table API, for exercising the sync scripts
+without a real server.
+
+Serves, under /api:
+  GET   /v1/tables?service=&limit=&after=   paged listing ({"data": [...], "paging": {"after": ...}})
+  GET   /v1/tables/name/<fqn>   table with id, name, displayName, columns
+  PATCH /v1/tables/<id>         JSON-patch "add" ops on /displayName and /columns/<i>/displayName
+  GET   /v1/system/version      what the OpenMetadata Python client checks on connect
+  GET   /v1/glossaries/name/<fqn>, PUT /v1/glossaries
+  GET   /v1/glossaryTerms?glossary=<id>&limit=&after=, GET /v1/glossaryTerms/name/<fqn>,
+        PUT /v1/glossaryTerms
+
+Tables are created from a dbt manifest (every model/seed/source, as FQN
+<service>.<database>.<schema>.<name>) or added with StubState.add_table(). --latency-ms adds
+a per-request delay. --fail-every N answers every Nth request with 429 or 503 so that
+client retries get exercised. StubState.calls counts requests per "METHOD route".
+
+Usage:
+  python bench/om_stub_server.py --manifest dbt/dera_dbt/target/manifest.json --service dera_pg
+  python bench/om_stub_server.py --port 8585 --latency-ms 20 --fail-every 10
+"""
+import json
+import time
+import uuid
+import argparse
+import threading
+from collections import Counter
+from urllib.parse import unquote, urlparse, parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubState:
+    """Tables keyed by FQN and id, plus request counters; shared by all handler threads."""
+
+    def __init__(self, latency_ms: float = 0.0, fail_every: int = 0):
+        self.lock = threading.Lock()
+        self.by_fqn = {}
+        self.by_id = {}
+        self.latency = latency_ms / 1000.0
+        self.fail_every = fail_every
+        self.requests = 0
+        self.failures = 0
+        self.patches = 0
+        self.lists = 0
+        self.glossaries = {}
+        self.terms = {}
+        self.calls = Counter()
+        self.version = "1.5.0"
+
+    def add_table(self, fqn: str, columns: list) -> dict:
+        table = {
+            "id": str(uuid.uuid4()),
+            "name": fqn.rsplit(".", 1)[-1],
+            "fullyQualifiedName": fqn,
+            "displayName": None,
+            "columns": [{"name": c, "displayName": None} for c in columns],
+        }
+        self.by_fqn[fqn] = table
+        self.by_id[table["id"]] = table
+        return table
+
+    def load_manifest(self, path: str, service: str) -> int:
+        with open(path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        nodes = list(manifest.get("nodes", {}).values()) + list(manifest.get("sources", {}).values())
+        for node in nodes:
+            if node.get("resource_type") in ("model", "seed", "source"):
+                name = node.get("alias") or node.get("name")
+                self.add_table(f"{service}.{node['database']}.{node['schema']}.{name}", list(node.get("columns", {})))
+        return len(self.by_fqn)
+
+    def put_glossary(self, req: dict) -> dict:
+        with self.lock:
+            glossary = self.glossaries.setdefault(req["name"], {"id": str(uuid.uuid4())})
+            glossary.update(name=req["name"], fullyQualifiedName=req["name"],
+                            displayName=req.get("displayName"), description=req.get("description", ""))
+            return dict(glossary)
+
+    def put_term(self, req: dict) -> dict:
+        with self.lock:
+            glossary = self.glossaries[req["glossary"]]
+            fqn = f"{glossary['fullyQualifiedName']}.{req['name']}"
+            term = self.terms.setdefault(fqn, {"id": str(uuid.uuid4())})
+            term.update(name=req["name"], fullyQualifiedName=fqn, displayName=req.get("displayName"),
+                        description=req.get("description", ""),
+                        glossary={"id": glossary["id"], "type": "glossary", "name": glossary["name"],
+                                  "fullyQualifiedName": glossary["fullyQualifiedName"]})
+            return json.loads(json.dumps(term))
+
+    def next_failure(self) -> int:
+        """Status to inject for this request, or 0."""
+        with self.lock:
+            self.requests += 1
+            if self.fail_every and self.requests % self.fail_every == 0:
+                self.failures += 1
+                return 429 if self.failures % 2 else 503
+        return 0
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real server
+    disable_nagle_algorithm = True  # headers and body go out as separate writes
+    state: StubState = None
+
+    def log_message(self, fmt, *args):  # quiet
+        pass
+
+    def reply(self, status: int, body=None, extra_headers: dict = None) -> None:
+        if status >= 400:
+            body = {"code": status, **(body or {})}  # error shape of the real server
+        data = json.dumps(body if body is not None else {}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for k, v in (extra_headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def pre(self) -> bool:
+        """Simulated latency and injected failures; False if the request was answered."""
+        if self.state.latency:
+            time.sleep(self.state.latency)
+        status = self.state.next_failure()
+        if status:
+            self.reply(status, {"message": "injected failure"}, {"Retry-After": "0"} if status == 429 else None)
+            return False
+        return True
+
+    def count(self, path: str) -> None:
+        route = path[len("/api/v1/"):].split("/")
+        with self.state.lock:
+            self.state.calls[f"{self.command} {'/'.join(route[:2]) if route[1:2] == ['name'] else route[0]}"] += 1
+
+    def do_GET(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        if not self.pre():
+            return
+        url = urlparse(self.path)
+        path = url.path
+        self.count(path)
+        prefix = "/api/v1/tables/name/"
+        if path == "/api/v1/system/version":
+            return self.reply(200, {"version": self.state.version})
+        if path == "/api/v1/tables":
+            return self.list_tables(parse_qs(url.query))
+        if path == "/api/v1/glossaryTerms":
+            return self.list_terms(parse_qs(url.query))
+        for route, entities in (("glossaries", self.state.glossaries), ("glossaryTerms", self.state.terms)):
+            if path.startswith(f"/api/v1/{route}/name/"):
+                entity = entities.get(unquote(path.rsplit("/", 1)[-1]))
+                if entity is None:
+                    return self.reply(404, {"message": "entity not found"})
+                return self.reply(200, entity)
+        if not path.startswith(prefix):
+            return self.reply(404, {"message": "not found"})
+        table = self.state.by_fqn.get(unquote(path[len(prefix):]))
+        if table is None:
+            return self.reply(404, {"message": "entity not found"})
+        with self.state.lock:
+            body = json.loads(json.dumps(table))
+        self.reply(200, body)
+
+    def list_tables(self, query: dict) -> None:
+        service = query.get("service", [""])[0]
+        limit = int(query.get("limit", ["10"])[0])
+        offset = int(query.get("after", ["0"])[0])  # the real server's cursor is opaque too
+        with self.state.lock:
+            self.state.lists += 1
+            fqns = sorted(f for f in self.state.by_fqn if not service or f.startswith(service + "."))
+            page = json.loads(json.dumps([self.state.by_fqn[f] for f in fqns[offset:offset + limit]]))
+        paging = {"total": len(fqns)}
+        if offset + limit < len(fqns):
+            paging["after"] = str(offset + limit)
+        self.reply(200, {"data": page, "paging": paging})
+
+    def list_terms(self, query: dict) -> None:
+        glossary_id = query.get("glossary", [""])[0]
+        limit = int(query.get("limit", ["10"])[0])
+        offset = int(query.get("after", ["0"])[0])
+        with self.state.lock:
+            terms = sorted((t for t in self.state.terms.values() if t["glossary"]["id"] == glossary_id),
+                           key=lambda t: t["fullyQualifiedName"])
+            page = json.loads(json.dumps(terms[offset:offset + limit]))
+        paging = {"total": len(terms)}
+        if offset + limit < len(terms):
+            paging["after"] = str(offset + limit)
+        self.reply(200, {"data": page, "paging": paging})
+
+    def do_PUT(self):
+        req = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+        if not self.pre():
+            return
+        path = urlparse(self.path).path
+        self.count(path)
+        if path == "/api/v1/glossaries":
+            return self.reply(200, self.state.put_glossary(req))
+        if path == "/api/v1/glossaryTerms":
+            if req.get("glossary") not in self.state.glossaries:
+                return self.reply(404, {"message": f"glossary {req.get('glossary')} not found"})
+            return self.reply(200, self.state.put_term(req))
+        self.reply(404, {"message": "not found"})
+
+    def do_PATCH(self):
+        ops = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"[]")
+        if not self.pre():
+            return
+        path = urlparse(self.path).path
+        self.count(path)
+        table = self.state.by_id.get(path.rsplit("/", 1)[-1]) if path.startswith("/api/v1/tables/") else None
+        if table is None:
+            return self.reply(404, {"message": "entity not found"})
+        with self.state.lock:
+            for op in ops:
+                parts = op["path"].strip("/").split("/")
+                if parts == ["displayName"]:
+                    table["displayName"] = op["value"]
+                elif len(parts) == 3 and parts[0] == "columns" and parts[2] == "displayName":
+                    table["columns"][int(parts[1])]["displayName"] = op["value"]
+                else:
+                    return self.reply(400, {"message": f"unsupported patch path {op['path']}"})
+            self.state.patches += 1
+            body = json.loads(json.dumps(table))
+        self.reply(200, body)
+
+
+def start(state: StubState, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+    """Serve in a daemon thread; the API base is http://<host>:<server.server_port>/api."""
+    handler = type("StubHandler", (Handler,), {"state": state})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Local stub of the OpenMetadata table API")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8585)
+    ap.add_argument("--manifest", help="create a table for every model/seed/source in this dbt manifest")
+    ap.add_argument("--service", default="dera_pg", help="service name used in table FQNs")
+    ap.add_argument("--latency-ms", type=float, default=0.0, help="delay added to every request")
+    ap.add_argument("--fail-every", type=int, default=0, help="answer every Nth request with 429/503")
+    args = ap.parse_args()
+
+    state = StubState(args.latency_ms, args.fail_every)
+    if args.manifest:
+        print(f"loaded {state.load_manifest(args.manifest, args.service)} table(s) from {args.manifest}")
+    server = start(state, args.host, args.port)
+    print(f"stub OpenMetadata API on http://{args.host}:{server.server_port}/api (Ctrl-C to stop)")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
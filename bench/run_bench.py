@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+End-to-end pipeline benchmark: synthetic DERA ZIPs -> pg_load_dera.py -> dbt.
+
+Stages (against the database in PG* env vars, which it overwrites -- use a scratch DB; the
+RAW schema is dropped first so every run starts from the same state):
+  generate          write --quarters synthetic ZIPs with gen_dera_zips.py (skipped with --zips-dir)
+  load_initial      load all but the last ZIP (--mode replace)
+  dbt_full          dbt run --full-refresh
+  load_incremental  load the last ZIP
+  dbt_incremental   dbt run (only the new quarter is processed)
+
+For every stage it records wall seconds, rows (the loader's _load_manifest member rows,
+or rows_affected from dbt's run_results.json) and rows/sec. It also records the peak RSS
+of the largest process in the stage (from wait4, so loader workers count) and the
+database and per-schema sizes afterwards. Results go to a JSON file with the git commit,
+so runs on different commits can be compared with --compare.
+
+Usage:
+  python bench/run_bench.py
+  python bench/run_bench.py --filings 5000 --quarters 6 --out before.json
+  python bench/run_bench.py --compare before.json
+  python bench/run_bench.py --zips-dir /path/to/real_zips --loader-args "--workers 4"
+"""
+import os
+import sys
+import json
+import time
+import shlex
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+from datetime import datetime, timezone
+
+import psycopg2
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LOADER = os.path.join(ROOT, "elt", "pg_load_dera.py")
+GENERATOR = os.path.join(ROOT, "bench", "gen_dera_zips.py")
+DBT_PROJECT_DIR = os.path.join(ROOT, "dbt", "dera_dbt")
+RESULTS_DIR = os.path.join(ROOT, "bench", "results")
+
+PG_HOST = os.getenv("PGHOST", "localhost")
+PG_PORT = int(os.getenv("PGPORT", "5432"))
+PG_DB   = os.getenv("PGDATABASE", "dera")
+PG_USER = os.getenv("PGUSER", "dbt")
+PG_PASS = os.getenv("PGPASSWORD", "dbt")
+RAW_SCHEMA = os.getenv("DERA_RAW_SCHEMA", "raw_dera")
+
+
+def connect():
+    conn = psycopg2.connect(host=PG_HOST, port=PG_PORT, dbname=PG_DB, user=PG_USER, password=PG_PASS)
+    conn.autocommit = True
+    return conn
+
+
+def run(cmd: list, cwd: str = ROOT) -> dict:
+    """Run cmd; returns wall seconds and peak RSS (MB) of the largest process in its tree."""
+    print("▶ " + " ".join(cmd), flush=True)
+    started = time.perf_counter()
+    proc = subprocess.Popen(cmd, cwd=cwd)
+    # wait4 reports the child's rusage including its reaped descendants (loader workers)
+    _, status, usage = os.wait4(proc.pid, 0)
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    seconds = time.perf_counter() - started
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+    # ru_maxrss is KB on Linux, bytes on macOS
+    rss = usage.ru_maxrss / (1 << 20 if sys.platform == "darwin" else 1 << 10)
+    return {"seconds": round(seconds, 3), "peak_rss_mb": round(rss, 1)}
+
+
+def last_load_id(conn) -> int:
+    with conn.cursor() as cur:
+        cur.execute("select to_regclass(%s)", (f'"{RAW_SCHEMA}"."_load_manifest"',))
+        if cur.fetchone()[0] is None:
+            return 0
+        cur.execute(f'select coalesce(max(load_id), 0) from "{RAW_SCHEMA}"."_load_manifest"')
+        return cur.fetchone()[0]
+
+
+def loaded_rows(conn, after_load_id: int) -> dict:
+    """member -> rows loaded by the manifest entries after `after_load_id`."""
+    with conn.cursor() as cur:
+        cur.execute(f'select member_rows from "{RAW_SCHEMA}"."_load_manifest" '
+                    f"where load_id > %s and status = 'complete'", (after_load_id,))
+        totals = {}
+        for (member_rows,) in cur.fetchall():
+            for member, rows in (member_rows or {}).items():
+                totals[member] = totals.get(member, 0) + int(rows or 0)
+    return totals
+
+
+def db_sizes(conn) -> dict:
+    with conn.cursor() as cur:
+        cur.execute("select pg_database_size(current_database())")
+        total = cur.fetchone()[0]
+        cur.execute("""
+          select n.nspname, sum(pg_total_relation_size(c.oid))::bigint
+          from pg_class c join pg_namespace n on n.oid = c.relnamespace
+          where c.relkind in ('r', 'm') and n.nspname not in ('pg_catalog', 'information_schema')
+            and n.nspname not like 'pg_toast%%'
+          group by 1 order by 1
+        """)
+        schemas = {name: round(size / 1e6, 1) for name, size in cur.fetchall()}
+    return {"db_size_mb": round(total / 1e6, 1), "schema_size_mb": schemas}
+
+
+def dbt_rows(project_dir: str) -> dict:
+    """model -> rows_affected from the last run's run_results.json."""
+    with open(os.path.join(project_dir, "target", "run_results.json"), encoding="utf-8") as f:
+        results = json.load(f)["results"]
+    return {r["unique_id"].split(".")[-1]: (r.get("adapter_response") or {}).get("rows_affected") or 0
+            for r in results if r["status"] == "success"}
+
+
+def git_info() -> dict:
+    def git(*a):
+        out = subprocess.run(["git", *a], cwd=ROOT, capture_output=True, text=True)
+        return out.stdout.strip() if out.returncode == 0 else None
+    return {"commit": git("rev-parse", "--short", "HEAD"), "subject": git("log", "-1", "--format=%s"),
+            "dirty": bool(git("status", "--porcelain", "--untracked-files=no"))}
+
+
+def reset_raw(conn) -> None:
+    # cascade also drops the dbt staging views on top; the full-refresh run recreates them
+    with conn.cursor() as cur:
+        cur.execute(f'drop schema if exists "{RAW_SCHEMA}" cascade')
+
+
+def stage_load(conn, zip_paths: list, workdir: str, loader_args: list) -> dict:
+    # The loader takes a directory, so link each batch into its own folder
+    batch = tempfile.mkdtemp(dir=workdir)
+    for path in zip_paths:
+        os.symlink(path, os.path.join(batch, os.path.basename(path)))
+    before = last_load_id(conn)
+    stats = run([sys.executable, LOADER, "--zips-dir", batch, "--mode", "replace", *loader_args])
+    members = loaded_rows(conn, before)
+    return dict(stats, rows=sum(members.values()), members=members)
+
+
+def stage_dbt(args: argparse.Namespace, *extra: str) -> dict:
+    cmd = [args.dbt, "run", "--select", args.select, *extra]
+    if args.profiles_dir:
+        cmd += ["--profiles-dir", args.profiles_dir]
+    stats = run(cmd, cwd=args.dbt_project_dir)
+    models = dbt_rows(args.dbt_project_dir)
+    return dict(stats, rows=sum(models.values()), models=models)
+
+
+def seed_dbt(args: argparse.Namespace) -> None:
+    # int_num_metrics reads the metric_tags seed, which `dbt run` does not create
+    cmd = [args.dbt, "seed", "--select", "metric_tags", "--full-refresh"]
+    if args.profiles_dir:
+        cmd += ["--profiles-dir", args.profiles_dir]
+    subprocess.run(cmd, cwd=args.dbt_project_dir, check=True, stdout=subprocess.DEVNULL)
+
+
+def print_stages(stages: dict, baseline: dict) -> None:
+    print(f"\n{'stage':<18} {'seconds':>9} {'rows':>12} {'rows/s':>10} {'peak MB':>8} {'db MB':>8}"
+          + (f" {'vs before':>10}" if baseline else ""))
+    for name, s in stages.items():
+        line = (f"{name:<18} {s['seconds']:>9.2f} {s.get('rows', 0):>12,} {s.get('rows_per_sec') or 0:>10,.0f} "
+                f"{s['peak_rss_mb']:>8.1f} {s['db_size_mb']:>8.1f}")
+        before = baseline.get(name)
+        if before and s["seconds"]:
+            line += f" {before['seconds'] / s['seconds']:>9.2f}x"
+        print(line)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Benchmark the load + dbt pipeline on synthetic DERA ZIPs")
+    ap.add_argument("--zips-dir", help="benchmark these ZIPs instead of generating synthetic ones")
+    ap.add_argument("--quarters", type=int, default=4, help="synthetic quarters (the last one is the increment)")
+    ap.add_argument("--filings", type=int, default=2000, help="synthetic filings per quarter")
+    ap.add_argument("--facts", type=int, default=60, help="synthetic tags per filing")
+    ap.add_argument("--fx-share", type=float, default=0.2, help="share of registrants reporting in non-USD")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--loader-args", default="", help="extra pg_load_dera.py options, e.g. \"--workers 4\"")
+    ap.add_argument("--dbt", default=shutil.which("dbt") or "dbt", help="dbt executable")
+    ap.add_argument("--dbt-project-dir", default=DBT_PROJECT_DIR)
+    ap.add_argument("--profiles-dir", help="passed to dbt --profiles-dir")
+    ap.add_argument("--select", default="+stg_dera_num+ dim_filing",
+                    help="dbt models to run (default: stg_dera_num, its parents and children, and dim_filing)")
+    ap.add_argument("--out", help="results file (default: bench/results/bench-<commit>.json)")
+    ap.add_argument("--compare", help="results file of an earlier run to compare stage times against")
+    args = ap.parse_args()
+
+    conn = connect()
+    with conn.cursor() as cur:
+        cur.execute("show server_version")
+        pg_version = cur.fetchone()[0]
+    loader_args = shlex.split(args.loader_args)
+    stages = {}
+
+    with tempfile.TemporaryDirectory() as workdir:
+        if args.zips_dir:
+            zips_dir = os.path.abspath(os.path.expanduser(args.zips_dir))
+        else:
+            zips_dir = os.path.join(workdir, "zips")
+            stages["generate"] = run([sys.executable, GENERATOR, "--out", zips_dir, "--quarters", str(args.quarters),
+                                      "--filings", str(args.filings), "--facts", str(args.facts),
+                                      "--fx-share", str(args.fx_share), "--seed", str(args.seed)])
+            stages["generate"].update(db_sizes(conn))
+        zip_paths = sorted(os.path.join(zips_dir, f) for f in os.listdir(zips_dir) if f.lower().endswith(".zip"))
+        if len(zip_paths) < 2:
+            raise SystemExit("ERROR: need at least two ZIPs (an initial batch and an incremental quarter)")
+        zip_mb = sum(os.path.getsize(p) for p in zip_paths) / 1e6
+        reset_raw(conn)
+        seed_dbt(args)
+
+        steps = [
+            ("load_initial", lambda: stage_load(conn, zip_paths[:-1], workdir, loader_args)),
+            ("dbt_full", lambda: stage_dbt(args, "--full-refresh")),
+            ("load_incremental", lambda: stage_load(conn, zip_paths[-1:], workdir, loader_args)),
+            ("dbt_incremental", lambda: stage_dbt(args)),
+        ]
+        for name, step in steps:
+            stats = step()
+            stats["rows_per_sec"] = round(stats["rows"] / stats["seconds"], 1) if stats["seconds"] else None
+            stats.update(db_sizes(conn))
+            stages[name] = stats
+    conn.close()
+
+    info = git_info()
+    results = {
+        "git": info,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "host": {"python": platform.python_version(), "platform": platform.platform(),
+                 "cpus": os.cpu_count(), "postgres": pg_version},
+        "params": {"zips_dir": args.zips_dir, "zips": [os.path.basename(p) for p in zip_paths],
+                   "zip_mb": round(zip_mb, 1), "quarters": args.quarters, "filings": args.filings,
+                   "facts": args.facts, "fx_share": args.fx_share, "seed": args.seed,
+                   "loader_args": loader_args, "select": args.select},
+        "stages": stages,
+        "total_seconds": round(sum(s["seconds"] for s in stages.values()), 3),
+    }
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            before = json.load(f)
+        baseline = before["stages"]
+        if before["params"] != results["params"]:
+            print(f"⚠ {args.compare} was run with different parameters; stage times are not comparable")
+        print(f"\nComparing against {args.compare} (commit {before['git']['commit']})")
+    print_stages(stages, baseline)
+    print(f"{'total':<18} {results['total_seconds']:>9.2f}")
+
+    out = args.out or os.path.join(RESULTS_DIR, f"bench-{info['commit'] or 'nogit'}{'-dirty' if info['dirty'] else ''}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print(f"wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+{# Post-hook: refresh planner statistics after a table/incremental build (views have none) #}
+{% macro analyze_relation() -%}
+  {%- if model.config.materialized in ('table', 'incremental') -%}
+    analyze {{ this }}
+  {%- endif -%}
+{%- endmacro %}
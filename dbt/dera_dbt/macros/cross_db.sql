@@ -0,0 +1,73 @@
+{# Postgres-only SQL behind adapter.dispatch, so the project also builds on the duckdb target
+   (DuckDB over the loader's --sink parquet files). default__ is the Postgres version. #}
+
+{# Date from a DERA text field; fmt is a Postgres to_date() pattern ('YYYYMMDD' or 'YYYY') #}
+{% macro dera_to_date(text_sql, fmt) -%}
+  {{ return(adapter.dispatch('dera_to_date', 'dera_dbt')(text_sql, fmt)) }}
+{%- endmacro %}
+
+{% macro default__dera_to_date(text_sql, fmt) -%}
+  to_date({{ text_sql }}, '{{ fmt }}')
+{%- endmacro %}
+
+{% macro duckdb__dera_to_date(text_sql, fmt) -%}
+  {%- set strptime_formats = {'YYYYMMDD': '%Y%m%d', 'YYYY': '%Y'} -%}
+  strptime({{ text_sql }}, '{{ strptime_formats[fmt] }}')::date
+{%- endmacro %}
+
+{# Type for exact DERA values. DuckDB's bare NUMERIC is DECIMAL(18,3), which would round
+   FX rates and per-share prices, so it gets DOUBLE #}
+{% macro dera_numeric() -%}
+  {{ return(adapter.dispatch('dera_numeric', 'dera_dbt')()) }}
+{%- endmacro %}
+
+{% macro default__dera_numeric() -%}
+  numeric
+{%- endmacro %}
+
+{% macro duckdb__dera_numeric() -%}
+  double
+{%- endmacro %}
+
+{# Capture groups of the first match of `pattern` in `string_sql` as a 1-based array;
+   NULL when it does not match. `groups` is the number of capture groups #}
+{% macro dera_regexp_match(string_sql, pattern, groups) -%}
+  {{ return(adapter.dispatch('dera_regexp_match', 'dera_dbt')(string_sql, pattern, groups)) }}
+{%- endmacro %}
+
+{% macro default__dera_regexp_match(string_sql, pattern, groups) -%}
+  regexp_match({{ string_sql }}, '{{ pattern }}')
+{%- endmacro %}
+
+{% macro duckdb__dera_regexp_match(string_sql, pattern, groups) -%}
+  case when regexp_matches({{ string_sql }}, '{{ pattern }}') then [
+    {%- for i in range(1, groups + 1) -%}
+      regexp_extract({{ string_sql }}, '{{ pattern }}', {{ i }}){% if not loop.last %}, {% endif %}
+    {%- endfor -%}
+  ] end
+{%- endmacro %}
+
+{# Lateral FROM item with one row per day from start_sql to stop_sql (inclusive), in a
+   DATE column named `day` #}
+{% macro dera_day_series(start_sql, stop_sql, alias) -%}
+  {{ return(adapter.dispatch('dera_day_series', 'dera_dbt')(start_sql, stop_sql, alias)) }}
+{%- endmacro %}
+
+{% macro default__dera_day_series(start_sql, stop_sql, alias) -%}
+  lateral (
+    select g::date as day
+    from generate_series({{ start_sql }}, {{ stop_sql }}, interval '1 day') as g
+  ) as {{ alias }}
+{%- endmacro %}
+
+{% macro duckdb__dera_day_series(start_sql, stop_sql, alias) -%}
+  lateral (
+    select unnest(generate_series({{ start_sql }}::timestamp, {{ stop_sql }}::timestamp, interval 1 day))::date as day
+  ) as {{ alias }}
+{%- endmacro %}
+
+{# DuckDB skips the models' `indexes`: its row-group min/max statistics serve the scans, and a
+   unique ART index rejects the delete+insert of an incremental run (DuckDB checks uniqueness
+   before the transaction's deletes apply). Overrides the adapter's dbt.create_indexes #}
+{% macro duckdb__create_indexes(relation) -%}
+{%- endmacro %}
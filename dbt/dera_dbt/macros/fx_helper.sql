@@ -1,7 +1,8 @@
-{# Extract the two 3-letter currency codes from a UOM string (e.g. 'GBPUSD', 'USD/JPY', 'EUR-USD') #}
-{% macro fx_parse_currencies(uom_sql) %}
-  (regexp_matches({{ uom_sql }}, '([A-Z]{3}).*?([A-Z]{3})'))[1] as c1,
-  (regexp_matches({{ uom_sql }}, '([A-Z]{3}).*?([A-Z]{3})'))[2] as c2
+{# Currency pair of a UOM string (e.g. 'GBPUSD', 'USD/JPY', 'EUR-USD') from the precomputed
+   dim_uom dimension. Exposes <alias>.c1, <alias>.c2, <alias>.base_ccy and <alias>.usd_first;
+   all NULL when the UOM does not name two currencies #}
+{% macro fx_uom_join(uom_sql, alias='u') %}
+  left join {{ ref('dim_uom') }} {{ alias }} on {{ alias }}.uom = {{ uom_sql }}
 {% endmacro %}
 
 {# Base currency is the non-USD currency #}
@@ -9,13 +10,19 @@
   case when {{ c1_sql }} = 'USD' then {{ c2_sql }} else {{ c1_sql }} end
 {% endmacro %}
 
-{# Convert a numeric FX value to USD-per-base:
+{# Convert a numeric FX value to USD-per-base using the dim_uom direction flag:
    if UOM is USD/XXX then rate_to_usd = 1/value; else (XXX/USD) rate_to_usd = value #}
-{% macro fx_to_usd(c1_sql, value_sql) %}
-  case when {{ c1_sql }} = 'USD' then 1.0/{{ value_sql }} else {{ value_sql }} end
+{% macro fx_to_usd(value_sql, alias='u') %}
+  case when {{ alias }}.usd_first then 1.0/{{ value_sql }} else {{ value_sql }} end
 {% endmacro %}
 
 {# Convenience: absolute year-end date for previous calendar year #}
 {% macro prev_year_1231(ddate_sql) %}
   make_date(extract(year from {{ ddate_sql }})::int - 1, 12, 31)
-{% endmacro %}
\ No newline at end of file
+{% endmacro %}
+{# Best available USD rate for (base, ddate): one exact-match join on the dense fx_resolved
+   calendar. Exposes <alias>.to_usd, <alias>.fx_source and <alias>.fx_staleness_days #}
+{% macro fx_resolve_join(base_sql, ddate_sql, alias='fx') %}
+  left join {{ ref('fx_resolved') }} {{ alias }}
+         on {{ alias }}.base = {{ base_sql }} and {{ alias }}.ddate = {{ ddate_sql }}
+{% endmacro %}
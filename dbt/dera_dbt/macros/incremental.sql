@@ -0,0 +1,55 @@
+{# Latest completed load per srcdir, from the loader's manifest (raw_dera._load_manifest) #}
+{% macro dera_srcdir_loads() %}
+  select srcdir, max(finished_at) as loaded_at
+  from {{ source('dera', '_load_manifest') }}
+  where status = 'complete'
+  group by srcdir
+{% endmacro %}
+
+{# Newest loaded_at already in this incremental model #}
+{% macro dera_watermark() -%}
+  (select coalesce(max(loaded_at), '-infinity'::timestamptz) from {{ this }})
+{%- endmacro %}
+
+{# srcdirs (re)loaded since this model last ran #}
+{% macro dera_new_srcdirs() %}
+  select l.srcdir from ({{ dera_srcdir_loads() }}) l
+  where l.loaded_at > {{ dera_watermark() }}
+{% endmacro %}
+
+{# Keys (default (cik, fy)) touched by rows of the given upstream relations since this model
+   last ran; t_* models recompute the whole ranking for these keys only #}
+{% macro dera_changed_keys(relations, keys=['cik', 'fy']) %}
+  {%- for rel in relations %}
+  select {{ keys | join(', ') }} from {{ rel }} where loaded_at > {{ dera_watermark() }}
+  {%- if not loop.last %}
+  union{% endif %}
+  {%- endfor %}
+{% endmacro %}
+
+{# (cik, fy) pairs of non-USD rows in `relation` whose FX resolution saw new rates since this
+   model last ran: a new quarter can supply the rate for an older filing #}
+{% macro dera_fx_changed_keys(relation) %}
+  select x.cik, x.fy
+  from {{ relation }} x
+  join {{ ref('dim_uom') }} u on u.uom = x.uom
+  join {{ ref('fx_resolved') }} fx on fx.base = u.base_ccy and fx.ddate = x.ddate
+  where fx.loaded_at > {{ dera_watermark() }}
+{% endmacro %}
+
+{# (cik, fy) keys a t_* model re-ranks: new rows in its USD or non-USD input, a new canonical
+   filing in dim_filing, or new FX rates for its non-USD rows #}
+{% macro dera_metric_changed_keys(usd_relation, xyz_relation) %}
+  {{ dera_changed_keys([usd_relation, xyz_relation, ref('dim_filing')]) }}
+  union
+  {{ dera_fx_changed_keys(xyz_relation) }}
+{% endmacro %}
+
+{# pre_hook of a delete+insert model: delete the keys it is about to recompute. delete+insert
+   only deletes keys present in the new rows, so a key that now yields none (say the new
+   canonical filing lacks the tag) would otherwise keep its old row #}
+{% macro dera_delete_keys(keys_sql, keys=['cik', 'fy']) -%}
+  {%- if is_incremental() -%}
+  delete from {{ this }} where ({{ keys | join(', ') }}) in ({{ keys_sql }})
+  {%- endif -%}
+{%- endmacro %}
@@ -0,0 +1,14 @@
+{# on-run-end: announce on the loader's NOTIFY channel (dera_load) that dbt rebuilt the marts,
+   so readers such as financials_api.py drop cached results. Postgres only #}
+{% macro notify_marts_changed() -%}
+  {{ return(adapter.dispatch('notify_marts_changed', 'dera_dbt')()) }}
+{%- endmacro %}
+
+{% macro default__notify_marts_changed() -%}
+  {%- if flags.WHICH in ('run', 'build') -%}
+    select pg_notify('{{ env_var('DERA_LOAD_CHANNEL', 'dera_load') }}', 'dbt')
+  {%- endif -%}
+{%- endmacro %}
+
+{% macro duckdb__notify_marts_changed() -%}
+{%- endmacro %}
@@ -1,4 +1,5 @@
-{{ config(materialized='view') }}
+{{ config(materialized='incremental', incremental_strategy='delete+insert', unique_key='adsh',
+          indexes=[{'columns': ['adsh']}, {'columns': ['cik', 'fy']}]) }}
 
 with s as (
   select * from {{ ref('stg_dera_sub') }}
@@ -8,17 +9,19 @@ usd as (
   select * from {{ ref('fy_income_usd') }}
 ),
 n as (
-  select * from {{ ref('stg_dera_num') }}
+  select * from {{ ref('int_num_metrics') }}
   where qtrs = 4 and coreg is null
-    and tag in ('ProfitLoss','NetIncomeLoss','ComprehensiveIncome')
+    and metric = 'income'
+  {% if is_incremental() %}and loaded_at > {{ dera_watermark() }}{% endif %}
 )
 select
   s.adsh, s.cik, s.name, s.sic, s.fy,
   n.ddate, n.uom,
-  max(n.value) as income
+  max(n.value) as income,
+  max(n.loaded_at) as loaded_at
 from s
 left join usd x using (adsh)
 join n on s.adsh = n.adsh and (x.adsh is null or x.ddate = n.ddate)
 where x.ddate is null
-  and n.uom <> 'USD'
+  and not n.usd
 group by s.adsh, s.cik, s.name, s.sic, s.fy, n.ddate, n.uom
\ No newline at end of file
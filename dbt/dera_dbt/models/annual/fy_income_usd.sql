@@ -1,4 +1,5 @@
-{{ config(materialized='view') }}
+{{ config(materialized='incremental', incremental_strategy='delete+insert', unique_key='adsh',
+          indexes=[{'columns': ['adsh']}, {'columns': ['cik', 'fy']}]) }}
 
 with s as (
     select *
@@ -8,10 +9,11 @@ with s as (
 ),
 n as (
     select *
-    from {{ ref('stg_dera_num') }}
+    from {{ ref('int_num_metrics') }}
     where qtrs = 4
       and coreg is null
-      and tag in ('ProfitLoss','NetIncomeLoss','ComprehensiveIncome')
+      and metric = 'income'
+    {% if is_incremental() %}and loaded_at > {{ dera_watermark() }}{% endif %}
 )
 select
     s.adsh,
@@ -21,10 +23,11 @@ select
     s.fy,
     n.ddate,
     n.uom,
-    max(n.value) as income
+    max(n.value) as income,
+    max(n.loaded_at) as loaded_at
 from s
 join n on s.adsh = n.adsh
-where n.uom = 'USD'
+where n.usd
 group by
     s.adsh,
     s.cik,
@@ -1,4 +1,5 @@
-{{ config(materialized='view') }}
+{{ config(materialized='incremental', incremental_strategy='delete+insert', unique_key='adsh',
+          indexes=[{'columns': ['adsh']}, {'columns': ['cik', 'fy']}]) }}
 
 with s as (
   select * from {{ ref('stg_dera_sub') }}
@@ -8,23 +9,19 @@ usd as (
   select * from {{ ref('fy_revenue_usd') }}
 ),
 n as (
-  select * from {{ ref('stg_dera_num') }}
+  select * from {{ ref('int_num_metrics') }}
   where qtrs = 4 and coreg is null
-    and tag in (
-      'Revenue','Revenues','RevenueFromContractsWithCustomers',
-      'RevenueFromContractWithCustomerIncludingAssessedTax',
-      'RevenueFromContractWithCustomerExcludingAssessedTax',
-      'RevenuesNetOfInterestExpense','RegulatedAndUnregulatedOperatingRevenue',
-      'RegulatedOperatingRevenuePipelines','SalesRevenueGoodsNet'
-    )
+    and metric = 'revenue'
+  {% if is_incremental() %}and loaded_at > {{ dera_watermark() }}{% endif %}
 )
 select
   s.adsh, s.cik, s.name, s.sic, s.fy,
   n.ddate, n.uom,
-  max(n.value) as revenue
+  max(n.value) as revenue,
+  max(n.loaded_at) as loaded_at
 from s
 left join usd x using (adsh)                      -- exclude cases already captured in USD
 join n on s.adsh = n.adsh and (x.adsh is null or x.ddate = n.ddate)
 where x.ddate is null
-  and n.uom <> 'USD'
+  and not n.usd
 group by s.adsh, s.cik, s.name, s.sic, s.fy, n.ddate, n.uom
\ No newline at end of file
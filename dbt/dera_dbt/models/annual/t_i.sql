@@ -1,64 +1,49 @@
-{{ config(materialized='table') }}
+{{ config(materialized='incremental', incremental_strategy='delete+insert', unique_key=['cik', 'fy'],
+          indexes=[{'columns': ['cik', 'fy']}, {'columns': ['cik', 'ddate']}],
+          pre_hook="{{ dera_delete_keys(dera_metric_changed_keys(ref('fy_income_usd'), ref('fy_income_fx'))) }}") }}
 
 -- FY Income converted to USD
-with v_usd as (
-    select *,
-           row_number() over (partition by cik, fy order by ddate desc) as rn
-    from {{ ref('fy_income_usd') }}
+with
+{% if is_incremental() %}
+-- only (cik, fy) keys with new upstream rows, a new canonical filing or new FX rates are re-ranked
+changed as (
+    {{ dera_metric_changed_keys(ref('fy_income_usd'), ref('fy_income_fx')) }}
+),
+{% endif %}
+v_usd as (
+    select v.*,
+           row_number() over (partition by v.cik, v.fy order by v.ddate desc, v.uom) as rn
+    from {{ ref('fy_income_usd') }} v
+    join {{ ref('dim_filing') }} f on f.adsh = v.adsh
+    {% if is_incremental() %}where (v.cik, v.fy) in (select cik, fy from changed){% endif %}
 ),
 best_usd as (
-    select adsh, cik, name, sic, fy, ddate, income as income_usd
+    select adsh, cik, name, sic, fy, ddate, income as income_usd, loaded_at
     from v_usd
     where rn = 1
 ),
-v_xyz as (
-    select *,
-           (regexp_match(uom, '([A-Z]{3}).*?([A-Z]{3})'))[1] as c1,
-           (regexp_match(uom, '([A-Z]{3}).*?([A-Z]{3})'))[2] as c2
-    from (
-        select *,
-               row_number() over (partition by cik, fy order by ddate desc) as rn
-        from {{ ref('fy_income_fx') }}
-    ) sub
-    where rn = 1
-),
 v_xyz_base as (
-    select *,
-           {{ fx_base_currency('c1', 'c2') }} as base_ccy
-    from v_xyz
-),
-fx as (
-    select b.*,
-           fx0.to_usd      as fx0,
-           fx1.to_usd      as fx1,
-           fx2.to_usd      as fx2,
-           fx3.to_usd      as fx3,
-           avg0.to_usd     as fx_avg0,
-           avgpy.to_usd    as fx_avg_py,
-           avg1231.to_usd  as fx_avg_1231
-    from v_xyz_base b
-    left join {{ ref('closing_fx') }} fx0
-           on fx0.base = b.base_ccy and fx0.ddate = b.ddate
-    left join {{ ref('closing_fx') }} fx1
-           on fx1.base = b.base_ccy and fx1.ddate = (b.ddate - interval '1 month')
-    left join {{ ref('closing_fx') }} fx2
-           on fx2.base = b.base_ccy and fx2.ddate = (b.ddate - interval '2 month')
-    left join {{ ref('closing_fx') }} fx3
-           on fx3.base = b.base_ccy and fx3.ddate = (b.ddate - interval '3 month')
-    left join {{ ref('average_fx') }} avg0
-           on avg0.base = b.base_ccy and avg0.ddate = b.ddate
-    left join {{ ref('average_fx') }} avgpy
-           on avgpy.base = b.base_ccy and avgpy.ddate = (b.ddate - interval '1 year')
-    left join {{ ref('average_fx') }} avg1231
-           on avg1231.base = b.base_ccy and avg1231.ddate = {{ prev_year_1231('b.ddate') }}
+    select x.*, u.base_ccy
+    from (
+        select v.*,
+               row_number() over (partition by v.cik, v.fy order by v.ddate desc, v.uom) as rn
+        from {{ ref('fy_income_fx') }} v
+        join {{ ref('dim_filing') }} f on f.adsh = v.adsh
+        {% if is_incremental() %}where (v.cik, v.fy) in (select cik, fy from changed){% endif %}
+    ) x
+    {{ fx_uom_join('x.uom') }}
+    where x.rn = 1
 ),
 converted as (
-    select adsh, cik, name, sic, fy, ddate,
-           coalesce(fx0, fx1, fx2, fx3, fx_avg0, fx_avg_py, fx_avg_1231) * income as income_usd
-    from fx
+    select b.adsh, b.cik, b.name, b.sic, b.fy, b.ddate,
+           fx.to_usd * b.income as income_usd,
+           greatest(b.loaded_at, fx.loaded_at) as loaded_at,
+           fx.fx_staleness_days
+    from v_xyz_base b
+    {{ fx_resolve_join('b.base_ccy', 'b.ddate') }}
 )
-select adsh, cik, name, sic, fy, ddate, income_usd
+select adsh, cik, name, sic, fy, ddate, income_usd, loaded_at, null::int as fx_staleness_days
 from best_usd
 union all
-select adsh, cik, name, sic, fy, ddate, income_usd
+select adsh, cik, name, sic, fy, ddate, income_usd, loaded_at, fx_staleness_days
 from converted
@@ -1,69 +1,57 @@
-{{ config(materialized='table') }}
+{{ config(materialized='incremental', incremental_strategy='delete+insert', unique_key=['cik', 'fy'],
+          indexes=[{'columns': ['cik', 'fy']}, {'columns': ['cik', 'ddate']}],
+          pre_hook="{{ dera_delete_keys(dera_metric_changed_keys(ref('fy_revenue_usd'), ref('fy_revenue_xyz'))) }}") }}
 
 -- 1) choose best USD per (cik, fy)
-with v_usd as (
-    select *,
-           row_number() over (partition by cik, fy order by ddate desc) as rn
-    from {{ ref('fy_revenue_usd') }}
+with
+{% if is_incremental() %}
+-- only (cik, fy) keys with new upstream rows, a new canonical filing or new FX rates are re-ranked
+changed as (
+    {{ dera_metric_changed_keys(ref('fy_revenue_usd'), ref('fy_revenue_xyz')) }}
+),
+{% endif %}
+v_usd as (
+    select v.*,
+           row_number() over (partition by v.cik, v.fy order by v.ddate desc, v.uom) as rn
+    from {{ ref('fy_revenue_usd') }} v
+    join {{ ref('dim_filing') }} f on f.adsh = v.adsh
+    {% if is_incremental() %}where (v.cik, v.fy) in (select cik, fy from changed){% endif %}
 ),
 best_usd as (
     select adsh, cik, name, sic, fy, ddate,
-           revenue as revenue_usd
+           revenue as revenue_usd, loaded_at
     from v_usd
     where rn = 1
 ),
 
 -- 2) parse non-USD revenue and determine base currency
 v_xyz as (
-    select *,
-           (regexp_match(uom, '([A-Z]{3}).*?([A-Z]{3})'))[1] as c1,
-           (regexp_match(uom, '([A-Z]{3}).*?([A-Z]{3})'))[2] as c2,
-           row_number() over (partition by cik, fy order by ddate desc) as rn
-    from {{ ref('fy_revenue_xyz') }}
+    select v.*,
+           row_number() over (partition by v.cik, v.fy order by v.ddate desc, v.uom) as rn
+    from {{ ref('fy_revenue_xyz') }} v
+    join {{ ref('dim_filing') }} f on f.adsh = v.adsh
+    {% if is_incremental() %}where (v.cik, v.fy) in (select cik, fy from changed){% endif %}
 ),
 v_xyz_base as (
-    select *,
-           {{ fx_base_currency('c1','c2') }} as base_ccy
-    from v_xyz
-    where rn = 1
+    select v.*, u.base_ccy
+    from v_xyz v
+    {{ fx_uom_join('v.uom') }}
+    where v.rn = 1
 ),
 
 -- 3) apply FX conversions
-fx as (
-    select b.*,
-           fx0.to_usd      as fx0,
-           fx1.to_usd      as fx1,
-           fx2.to_usd      as fx2,
-           fx3.to_usd      as fx3,
-           avg0.to_usd     as fx_avg0,
-           avgpy.to_usd    as fx_avg_py,
-           avg1231.to_usd  as fx_avg_1231
-    from v_xyz_base b
-    left join {{ ref('closing_fx') }} fx0
-           on fx0.base = b.base_ccy and fx0.ddate = b.ddate
-    left join {{ ref('closing_fx') }} fx1
-           on fx1.base = b.base_ccy and fx1.ddate = (b.ddate - interval '1 month')
-    left join {{ ref('closing_fx') }} fx2
-           on fx2.base = b.base_ccy and fx2.ddate = (b.ddate - interval '2 month')
-    left join {{ ref('closing_fx') }} fx3
-           on fx3.base = b.base_ccy and fx3.ddate = (b.ddate - interval '3 month')
-    left join {{ ref('average_fx') }} avg0
-           on avg0.base = b.base_ccy and avg0.ddate = b.ddate
-    left join {{ ref('average_fx') }} avgpy
-           on avgpy.base = b.base_ccy and avgpy.ddate = (b.ddate - interval '1 year')
-    left join {{ ref('average_fx') }} avg1231
-           on avg1231.base = b.base_ccy and avg1231.ddate = {{ prev_year_1231('b.ddate') }}
-),
-
 converted as (
-    select adsh, cik, name, sic, fy, ddate,
-           coalesce(fx0, fx1, fx2, fx3, fx_avg0, fx_avg_py, fx_avg_1231) * revenue as revenue_usd
-    from fx
+    select b.adsh, b.cik, b.name, b.sic, b.fy, b.ddate,
+           fx.to_usd * b.revenue as revenue_usd,
+           greatest(b.loaded_at, fx.loaded_at) as loaded_at,
+           fx.fx_staleness_days
+    from v_xyz_base b
+    {{ fx_resolve_join('b.base_ccy', 'b.ddate') }}
 )
 
 -- 4) union USD + converted
-select adsh, cik, name, sic, fy, ddate, revenue_usd
+select adsh, cik, name, sic, fy, ddate, revenue_usd, loaded_at, null::int as fx_staleness_days
 from best_usd
 union all
-select adsh, cik, name, sic, fy, ddate, revenue_usd
+select adsh, cik, name, sic, fy, ddate, revenue_usd, loaded_at, fx_staleness_days
 from converted
@@ -1,18 +1,34 @@
+-- Asset-weighted physical climate-change exposure per SIC industry. Materialized with a unique
+-- index on industry_code; incremental runs only recompute industries of companies with new
+-- assets_usd rows. Rebuild with --full-refresh after reseeding esg_risk_factors or isin_cik.
+{{ config(materialized='incremental', incremental_strategy='delete+insert', unique_key='industry_code',
+          indexes=[{'columns': ['industry_code'], 'unique': True}]) }}
 
-
-{{config(materialized='view')}}
-WITH exposure_data AS (
+WITH
+{% if is_incremental() %}
+changed AS (
+    SELECT DISTINCT a.sic
+    FROM {{ ref('assets_usd') }} a
+    WHERE a.cik IN (SELECT cik FROM {{ ref('assets_usd') }} WHERE loaded_at > {{ dera_watermark() }})
+),
+{% endif %}
+exposure_data AS (
     SELECT e.cik,
            e.ph_expo_ew,
            f.sic,
-           f.assets
-    FROM dera.analytics_stg.stg_esg_risk_factors e
-    JOIN dera.analytics.assets_usd f ON e.cik = f.cik
+           f.assets,
+           f.loaded_at
+    FROM {{ ref('stg_esg_risk_factors') }} e
+    JOIN {{ ref('assets_usd') }} f ON e.cik = f.cik
     WHERE e.ph_expo_ew IS NOT NULL
       AND f.assets > 0
+      AND f.sic IS NOT NULL  -- delete+insert cannot replace a NULL industry_code
+    {% if is_incremental() %}AND f.sic IN (SELECT sic FROM changed){% endif %}
 )
 SELECT sic AS industry_code,
-       SUM(ph_expo_ew * assets) / NULLIF(SUM(assets), 0) AS asset_weighted_physical_climate_change_exposure,
-       COUNT(DISTINCT cik) AS firm_count
+       -- exact numeric on Postgres, so the weighted average does not depend on summation order
+       SUM(ph_expo_ew::{{ dera_numeric() }} * assets) / NULLIF(SUM(assets), 0) AS asset_weighted_physical_climate_change_exposure,
+       COUNT(DISTINCT cik) AS firm_count,
+       MAX(loaded_at) AS loaded_at
 FROM exposure_data
 GROUP BY sic
@@ -0,0 +1,30 @@
+{{ config(materialized='incremental', incremental_strategy='delete+insert', unique_key='uom',
+          indexes=[{'columns': ['uom'], 'unique': true}]) }}
+
+-- Every distinct UOM string parsed once into its currency pair, so FX and t_* models join
+-- by equality instead of running the regex per num row. UOMs without two currency codes
+-- (USD, shares, pure, ...) are kept with NULL c1/c2/base_ccy.
+with uoms as (
+    select uom, max(loaded_at) as loaded_at
+    from {{ ref('stg_dera_num') }}
+    where uom is not null
+    {% if is_incremental() %}and loaded_at > {{ dera_watermark() }}{% endif %}
+    group by uom
+),
+matched as (
+    select uom, {{ dera_regexp_match('uom', '([A-Z]{3}).*?([A-Z]{3})', 2) }} as parts, loaded_at
+    from uoms
+),
+parsed as (
+    select uom, parts[1] as c1, parts[2] as c2, loaded_at
+    from matched
+)
+select
+    uom,
+    c1,
+    c2,
+    {{ fx_base_currency('c1', 'c2') }} as base_ccy,
+    -- USD/XXX quotes units of base per USD: to_usd = 1 / value
+    c1 = 'USD' as usd_first,
+    loaded_at
+from parsed
@@ -0,0 +1,29 @@
+{{ config(materialized='table', indexes=[{'columns': ['base', 'ddate', 'kind'], 'unique': true}]) }}
+
+-- All FX observations in a single scan of stg_dera_num:
+-- closing rates at points-in-time (qtrs = 0) and four-quarter averages (qtrs = 4)
+with fx_base as (
+    select
+        case when n.qtrs = 0 then 'closing' else 'average' end as kind,
+        n.ddate,
+        u.base_ccy as base,
+        {{ fx_to_usd('n.value') }} as rate_to_usd,
+        n.loaded_at
+    from {{ ref('stg_dera_num') }} n
+    -- Currencies come from the parsed UOM dimension; rows without two currency codes are dropped
+    join {{ ref('dim_uom') }} u on u.uom = n.uom and u.c1 is not null
+    where n.ddate >= date '2017-01-01'
+      and n.value is not null
+      and n.uom <> 'USD'
+      and (n.uom like '%USD%' or length(n.uom) = 3)
+      and ((n.qtrs = 0 and n.tag in ('ClosingForeignExchangeRate', 'ForeignCurrencyExchangeRateTranslation1'))
+        or (n.qtrs = 4 and n.tag = 'AverageForeignExchangeRate'))
+)
+select
+    kind,
+    base,
+    ddate,
+    avg(rate_to_usd) as to_usd,
+    max(loaded_at) as loaded_at
+from fx_base
+group by kind, base, ddate
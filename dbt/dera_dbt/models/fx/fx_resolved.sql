@@ -0,0 +1,74 @@
+{{ config(materialized='table', indexes=[{'columns': ['base', 'ddate'], 'unique': true}]) }}
+
+{%- set max_closing_age = var('fx_max_staleness_days', 92) %}
+{%- set max_average_age = var('fx_max_average_staleness_days', 731) %}
+
+-- Dense daily FX calendar per base currency, so any (base, ddate) lookup is an exact match.
+-- Each day carries the latest closing rate on or before it (as-of forward fill) if that rate
+-- is at most fx_max_staleness_days old, else the latest average rate within
+-- fx_max_average_staleness_days. fx_staleness_days says how old the rate is.
+with rates as (
+    select * from {{ ref('fx_rates') }}
+),
+bounds as (
+    -- Nothing before a base's first rate can resolve, nor anything past the staleness limits
+    select base,
+           min(ddate) as first_date,
+           max(ddate) + greatest({{ max_closing_age }}, {{ max_average_age }}) as last_date
+    from rates
+    group by base
+),
+calendar as (
+    select b.base, d.day as ddate
+    from bounds b
+    cross join {{ dera_day_series('b.first_date', 'b.last_date', 'd') }}
+),
+observed as (
+    select c.base, c.ddate,
+           cl.to_usd as closing_rate, cl.ddate as closing_date, cl.loaded_at as closing_loaded_at,
+           av.to_usd as average_rate, av.ddate as average_date, av.loaded_at as average_loaded_at
+    from calendar c
+    left join rates cl on cl.kind = 'closing' and cl.base = c.base and cl.ddate = c.ddate
+    left join rates av on av.kind = 'average' and av.base = c.base and av.ddate = c.ddate
+),
+grouped as (
+    -- Each observation starts a group running until the next one of the same kind
+    select *,
+           count(closing_date) over w as closing_grp,
+           count(average_date) over w as average_grp
+    from observed
+    window w as (partition by base order by ddate)
+),
+filled as (
+    select base, ddate,
+           first_value(closing_rate)      over wc as closing_rate,
+           first_value(closing_date)      over wc as closing_date,
+           first_value(closing_loaded_at) over wc as closing_loaded_at,
+           first_value(average_rate)      over wa as average_rate,
+           first_value(average_date)      over wa as average_date,
+           first_value(average_loaded_at) over wa as average_loaded_at
+    from grouped
+    window wc as (partition by base, closing_grp order by ddate),
+           wa as (partition by base, average_grp order by ddate)
+),
+resolved as (
+    select base, ddate,
+           case
+               when ddate - closing_date <= {{ max_closing_age }} then 'closing'
+               when ddate - average_date <= {{ max_average_age }} then 'average'
+           end as fx_source,
+           closing_rate, closing_date, closing_loaded_at,
+           average_rate, average_date, average_loaded_at
+    from filled
+)
+select
+    base,
+    ddate,
+    case fx_source when 'closing' then closing_rate else average_rate end as to_usd,
+    fx_source,
+    case fx_source when 'closing' then closing_date else average_date end as rate_date,
+    ddate - case fx_source when 'closing' then closing_date else average_date end as fx_staleness_days,
+    -- load of the chosen rate: lets incremental t_* models find conversions a new rate changed
+    case fx_source when 'closing' then closing_loaded_at else average_loaded_at end as loaded_at
+from resolved
+where fx_source is not null
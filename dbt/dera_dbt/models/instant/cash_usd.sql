@@ -1,13 +1,12 @@
-{{ config(materialized='view') }}
+{{ config(materialized='incremental', incremental_strategy='delete+insert', unique_key='adsh',
+          indexes=[{'columns': ['adsh']}, {'columns': ['cik', 'fy']}]) }}
 with s as (select * from {{ ref('stg_dera_sub') }} where form in ('10-K','20-F','40-F') and fy >= date '2014-01-01'),
 n as (
-  select * from {{ ref('stg_dera_num') }}
+  select * from {{ ref('int_num_metrics') }}
   where qtrs = 0 and coreg is null and value > 0
-    and tag in ('Cash','CashAndDueFromBanks','CashAndCashEquivalents',
-                'CashAndCashEquivalentsUnrestricted','CashEquivalentsAtCarryingValue',
-                'CashAndCashEquivalentsAtCarryingValue',
-                'CashAndCashEquivalentsAtCarryingValueExcludingVariableInterestEntities')
+    and metric = 'cash'
+  {% if is_incremental() %}and loaded_at > {{ dera_watermark() }}{% endif %}
 )
-select s.adsh,s.cik,s.name,s.sic,s.fy,n.ddate,n.uom,max(n.value) as cash
-from s join n using (adsh) where n.uom='USD'
+select s.adsh,s.cik,s.name,s.sic,s.fy,n.ddate,n.uom,max(n.value) as cash, max(n.loaded_at) as loaded_at
+from s join n using (adsh) where n.usd
 group by s.adsh,s.cik,s.name,s.sic,s.fy,n.ddate,n.uom
\ No newline at end of file
@@ -0,0 +1,31 @@
+-- The canonical annual report per (cik, fy), resolved once per run. The t_* models, financials
+-- and int_float_candidates join to it instead of each ranking every filing of a fiscal year.
+{{ config(
+    materialized='table',
+    indexes=[
+      {'columns': ['adsh'], 'unique': True},
+      {'columns': ['cik', 'fy'], 'unique': True}
+    ]
+) }}
+
+with filings as (
+  select s.adsh, s.cik, s.name, s.sic, s.form, s.fy, s.period, s.filed, s.prevrpt, s.srcdir,
+         l.loaded_at
+  from {{ ref('stg_dera_sub') }} s
+  left join ({{ dera_srcdir_loads() }}) l on l.srcdir = s.srcdir
+  -- amendments (10-K/A, ...) are not candidates: the fact models only read full annual reports
+  where s.form in ('10-K','20-F','40-F') and s.fy >= date '2014-01-01'
+),
+ranked as (
+  select f.*,
+         -- prevrpt marks a report amended later: any report not superseded wins, then the one
+         -- covering the latest period (e.g. after a fiscal-year change), the latest filed
+         row_number() over (partition by cik, fy
+                            order by prevrpt, period desc, filed desc, adsh desc) as rn,
+         -- newest load of any candidate, so replacing the canonical filing marks the key changed
+         max(loaded_at) over (partition by cik, fy) as key_loaded_at
+  from filings f
+)
+select adsh, cik, name, sic, form, fy, period, filed, srcdir, key_loaded_at as loaded_at
+from ranked
+where rn = 1
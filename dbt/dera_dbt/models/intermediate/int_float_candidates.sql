@@ -1,13 +1,15 @@
 {{ config(materialized='view') }}
 with shares as (
   select adsh, ddate, value as shares_out, uom, coreg
-  from {{ ref('stg_dera_num') }}
-  where tag in {{ float_share_tags() }} and value > 0
+  from {{ ref('int_num_metrics') }}
+  -- canonical annual reports only; prices are matched to these shares by adsh
+  where metric = 'float_shares' and value > 0
+    and adsh in (select adsh from {{ ref('dim_filing') }})
 ),
 prices as (
   select adsh, ddate, value as price_per_share, uom, coreg
-  from {{ ref('stg_dera_num') }}
-  where tag in {{ float_price_tags() }} and value > 0
+  from {{ ref('int_num_metrics') }}
+  where metric = 'float_price' and value > 0
 ),
 sv as (
   select s.adsh, s.ddate, s.shares_out, p.price_per_share,
@@ -26,7 +28,7 @@ ranked as (
 select
   adsh, ddate, uom, coreg,
   'ComputedMarketFloat' as tag,
-  (shares_out * price_per_share)::numeric as value,
+  (shares_out * price_per_share)::{{ dera_numeric() }} as value,
   0 as qtrs,
   'computed' as srcdir
 from ranked
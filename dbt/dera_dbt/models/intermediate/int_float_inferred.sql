@@ -1,8 +1,7 @@
 {{ config(materialized='view') }}
 select
   adsh, ddate, uom, coreg, tag, value, qtrs, srcdir
-from {{ ref('stg_dera_num') }}
-where tag in ('EntityPublicFloat','StockholdersEquityIncludingPortionAttributableToNoncontrollingInterest',
-              'FreeFloat','PublicFloat','PublicFloatValue')
+from {{ ref('int_num_metrics') }}
+where metric = 'float_reported'
 union all
 select * from {{ ref('int_float_candidates') }}
\ No newline at end of file
@@ -0,0 +1,16 @@
+{{ config(materialized='incremental', incremental_strategy='delete+insert', unique_key='srcdir',
+          indexes=[{'columns': ['metric', 'adsh']}, {'columns': ['loaded_at']}]) }}
+-- The one scan of stg_dera_num behind the instant, annual and float models: every fact whose tag
+-- is mapped to a metric in the metric_tags seed, collapsed to its max value per key. Per-metric
+-- filters (qtrs, coreg, value > 0) stay in the models reading it, so their results are unchanged.
+-- Incremental by quarter like stg_dera_num; run with --full-refresh after editing the seed.
+select
+  n.srcdir, n.adsh, m.metric, n.tag, n.ddate, n.qtrs, n.uom,
+  n.uom = 'USD' as usd,
+  n.coreg,
+  max(n.value) as value,
+  max(n.loaded_at) as loaded_at
+from {{ ref('stg_dera_num') }} n
+join {{ ref('metric_tags') }} m on m.tag = n.tag
+{% if is_incremental() %}where n.loaded_at > {{ dera_watermark() }}{% endif %}
+group by n.srcdir, n.adsh, m.metric, n.tag, n.ddate, n.qtrs, n.uom, n.coreg
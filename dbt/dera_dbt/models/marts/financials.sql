@@ -1,4 +1,24 @@
-{{ config(materialized='view') }}
+-- Materialized so dashboards read an indexed table instead of re-joining six t_* tables per
+-- query. Incremental by company: every row of a CIK whose t_* rows or canonical filings changed
+-- is rebuilt, since the instant metrics join on ddate rather than fy. dim_filing is read too:
+-- a t_* key dropped for a new canonical filing leaves no newer t_* row behind.
+{{ config(materialized='incremental', incremental_strategy='delete+insert', unique_key='cik',
+          indexes=[{'columns': ['cik', 'fy']}, {'columns': ['sic', 'fy']}, {'columns': ['fy', 'cik']}],
+          pre_hook="{{ dera_delete_keys(dera_changed_keys([ref('t_r'), ref('t_i'), ref('t_f'), ref('t_d'),
+                                                           ref('t_c'), ref('t_a'), ref('dim_filing')], ['cik']),
+                                        ['cik']) }}") }}
+
+with
+{% if is_incremental() %}
+changed as (
+    {{ dera_changed_keys([ref('t_r'), ref('t_i'), ref('t_f'), ref('t_d'), ref('t_c'), ref('t_a'),
+                          ref('dim_filing')], ['cik']) }}
+),
+{% endif %}
+r as (
+    select * from {{ ref('t_r') }}
+    {% if is_incremental() %}where cik in (select cik from changed){% endif %}
+)
 
 -- Choose revenue & income from t_r / t_i; for instant metrics match on ddate
 select
@@ -12,10 +32,14 @@ select
   f.float_usd   as market_cap_usd,
   d.debt_usd,
   c.cash_usd,
-  a.assets_usd
-from {{ ref('t_r') }} r
-join {{ ref('stg_dera_sub') }} s
-  on r.cik = s.cik and r.fy = s.fy and s.form in ('10-K','20-F','40-F')
+  a.assets_usd,
+  -- age in days of the oldest FX rate behind any converted figure (NULL = all reported in USD)
+  greatest(r.fx_staleness_days, i.fx_staleness_days, f.fx_staleness_days,
+           d.fx_staleness_days, c.fx_staleness_days, a.fx_staleness_days) as fx_staleness_days,
+  greatest(r.loaded_at, i.loaded_at, f.loaded_at, d.loaded_at, c.loaded_at, a.loaded_at) as loaded_at
+from r
+-- revenue from the canonical annual report of the fiscal year (one per cik, fy)
+join {{ ref('dim_filing') }} s on s.adsh = r.adsh
 left join {{ ref('t_i') }} i on r.cik = i.cik and r.ddate = i.ddate
 left join {{ ref('t_f') }} f on r.cik = f.cik and r.fy   = f.fy
 left join {{ ref('t_d') }} d on r.cik = d.cik and r.ddate = d.ddate
@@ -0,0 +1,30 @@
+-- One row per company: its most recent fiscal year in financials. Incremental by CIK, so a
+-- new quarter only re-ranks the companies it touched, plus those whose latest row left
+-- financials; the post_hook drops companies with no financials row left at all.
+{{ config(materialized='incremental', incremental_strategy='delete+insert', unique_key='cik',
+          indexes=[{'columns': ['cik'], 'unique': true}, {'columns': ['sic']}],
+          post_hook="delete from {{ this }} as t where not exists
+                     (select 1 from {{ ref('financials') }} f where f.cik = t.cik and f.fy = t.fy)") }}
+
+with ranked as (
+    select *,
+           -- latest year, then USD-reported figures; the metric columns only break exact ties
+           row_number() over (partition by cik
+                              order by fy desc, ddate desc, fx_staleness_days nulls first,
+                                       revenue_usd desc nulls last, income_usd desc nulls last,
+                                       assets_usd desc nulls last, market_cap_usd desc nulls last,
+                                       debt_usd desc nulls last, cash_usd desc nulls last) as rn
+    from {{ ref('financials') }}
+    {% if is_incremental() %}
+    where cik in (
+        select cik from {{ ref('financials') }} where loaded_at > {{ dera_watermark() }}
+        union
+        select t.cik from {{ this }} t
+        where not exists (select 1 from {{ ref('financials') }} f where f.cik = t.cik and f.fy = t.fy)
+    )
+    {% endif %}
+)
+select name, cik, fy, ddate, sic, revenue_usd, income_usd, market_cap_usd, debt_usd, cash_usd,
+       assets_usd, fx_staleness_days, loaded_at
+from ranked
+where rn = 1
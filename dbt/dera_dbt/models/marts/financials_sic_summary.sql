@@ -0,0 +1,24 @@
+-- Industry roll-up per (SIC, fiscal year) for the common dashboard aggregates. A table rebuilt
+-- every run: a company that leaves a group (new SIC, a fiscal year dropped from financials)
+-- leaves no row behind to find that group by, and SIC x fy groups are cheap to recompute.
+{{ config(materialized='table',
+          indexes=[{'columns': ['sic', 'fy'], 'unique': true}, {'columns': ['fy']}]) }}
+
+select
+  sic,
+  fy,
+  count(distinct cik)                                          as companies,
+  sum(revenue_usd)                                             as revenue_usd,
+  percentile_cont(0.5) within group (order by revenue_usd)     as median_revenue_usd,
+  sum(income_usd)                                              as income_usd,
+  percentile_cont(0.5) within group (order by income_usd)      as median_income_usd,
+  sum(market_cap_usd)                                          as market_cap_usd,
+  sum(debt_usd)                                                as debt_usd,
+  sum(cash_usd)                                                as cash_usd,
+  sum(assets_usd)                                              as assets_usd,
+  sum(income_usd) / nullif(sum(revenue_usd), 0)                as profit_margin,
+  sum(debt_usd) / nullif(sum(assets_usd), 0)                   as debt_to_assets_ratio,
+  max(loaded_at)                                               as loaded_at
+from {{ ref('financials') }}
+where sic is not null
+group by sic, fy
@@ -1,4 +1,4 @@
-{{ config(materialized='table') }}
+{{ config(materialized='table', indexes=[{'columns': ['cik'], 'unique': true}]) }}
 with base as (
   select n.adsh, n.ddate, n.value as float_value, s.cik, s.name
   from {{ ref('int_float_inferred') }} n
@@ -1,16 +1,38 @@
-{{ config(materialized='view') }}
+{{ config(
+    materialized='incremental',
+    incremental_strategy='delete+insert',
+    unique_key='srcdir',
+    indexes=[
+      {'columns': ['tag', 'adsh']},
+      {'columns': ['adsh']},
+      {'columns': ['srcdir']},
+      {'columns': ['loaded_at']}
+    ]
+) }}
+-- Incremental by quarter: only srcdirs (re)loaded since the last run are rebuilt
 with base as (
+{% if var('dera_num_typed', false) %}
+  -- loader --typed: casts and ddate fixes already applied at load time
+  select
+    adsh, tag, version, coreg, ddate, qtrs, uom, value, footnote, srcdir
+  from {{ source('dera','num_typed') }}
+{% else %}
   select
     adsh, tag, version, nullif(coreg,'') as coreg,
-    to_date({{ fix_dera_ddate('ddate') }}, 'YYYYMMDD') as ddate,
+    {{ dera_to_date(fix_dera_ddate('ddate'), 'YYYYMMDD') }} as ddate,
     qtrs::int as qtrs, uom,
-    case when nullif(value,'') is null then null else value::numeric end as value,
+    case when nullif(value,'') is null then null else value::{{ dera_numeric() }} end as value,
     nullif(footnote,'') as footnote, srcdir
   from {{ source('dera','num') }}
+{% endif %}
+  {% if is_incremental() %}
+  where srcdir in ({{ dera_new_srcdirs() }})
+  {% endif %}
 ),
 annual as (
-  select n.*, s.fy, s.fp
+  select n.*, s.fy, s.fp, l.loaded_at
   from base n
   left join {{ ref('stg_dera_sub') }} s using (adsh)
+  left join ({{ dera_srcdir_loads() }}) l on l.srcdir = n.srcdir
 )
-select * from annual where fp = 'FY'
\ No newline at end of file
+select * from annual where fp = 'FY'
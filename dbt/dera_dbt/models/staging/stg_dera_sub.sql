@@ -1,4 +1,11 @@
-{{ config(materialized='view') }}
+-- Materialized so the adsh join from every fact model and the (cik, fy) lookups can use indexes
+{{ config(
+    materialized='table',
+    indexes=[
+      {'columns': ['adsh']},
+      {'columns': ['cik', 'fy']}
+    ]
+) }}
 
 select
     adsh,
@@ -8,9 +15,9 @@ select
     nullif(ein, '')::bigint as ein,
     form,
     fp,
-    to_date(period, 'YYYYMMDD') as period,
-    to_date(fy, 'YYYY') as fy,
-    to_date(filed, 'YYYYMMDD') as filed,
+    {{ dera_to_date('period', 'YYYYMMDD') }} as period,
+    {{ dera_to_date('fy', 'YYYY') }} as fy,
+    {{ dera_to_date('filed', 'YYYYMMDD') }} as filed,
     -- accepted has variable formats; keep as text or cast safely if needed
     nullif(accepted, '') as accepted_raw,
     (wksi = 'true')    as wksi,
@@ -1,16 +1,14 @@
 -- models/staging/stg_esg_risk_factors.sql
-{{ config(materialized='view') }}
+-- Materialized and indexed on cik so the ESG aggregates join it to the fact models by index
+{{ config(materialized='table', indexes=[{'columns': ['cik']}, {'columns': ['isin']}]) }}
 
 with rf as (
     select *
     from {{ ref('esg_risk_factors') }}
 ),
--- NOTE: confirm the seed file name below:
--- if your seed is "isin_cik.csv", use ref('isin_cik')
--- if it's "ising_cik.csv", use ref('ising_cik')
 map as (
-    select distinct isin, cik
-    from {{ ref('isin_cik') }}   -- <-- change to ref('ising_cik') if needed
+    select isin, cik
+    from {{ ref('stg_isin_cik') }}
 )
 select
     rf.isin,
@@ -0,0 +1,17 @@
+-- Deduplicated ISIN -> CIK map from the isin_cik seed, with cik as bigint like stg_dera_sub.
+-- Materialized once per run instead of a select distinct on every ESG query.
+{{ config(
+    materialized='table',
+    indexes=[
+      {'columns': ['isin', 'cik'], 'unique': True},
+      {'columns': ['cik']}
+    ]
+) }}
+
+-- ::text: the seed types cik as char(10) in dbt_project.yml, but an inferred integer works too
+select distinct
+    trim(isin::text) as isin,
+    nullif(trim(cik::text), '')::bigint as cik
+from {{ ref('isin_cik') }}
+where nullif(trim(isin::text), '') is not null
+  and nullif(trim(cik::text), '') is not null
@@ -9,29 +9,108 @@ Design:
 - Robustness:
   * Auto-add any missing columns (e.g., 'segments') to RAW tables before insert.
   * Normalize each data row to match the header width (pad or fold extras).
+- Partitioning:
+  * RAW tables are LIST-partitioned by srcdir, one partition per quarter (e.g. num_2019q4).
+  * --migrate-partitions converts pre-existing unpartitioned RAW tables in place.
 - Idempotency:
-  * --mode append   : default; always append rows.
-  * --mode skip     : if rows exist for srcdir+table, skip loading that file/table.
-  * --mode replace  : if rows exist for srcdir+table, delete them and reload.
+  * --mode append   : default; always append rows (into the srcdir partition).
+  * --mode skip     : if the srcdir partition exists, skip loading that file/table.
+  * --mode replace  : load into a staging table, then swap it in for the srcdir partition.
+  * --mode incremental : skip ZIPs whose last load completed with the same SHA-256;
+                      (re)load changed or previously failed ZIPs with replace semantics.
+  skip/replace never expose half-loaded quarters: the partition is attached only once complete.
+- Load manifest:
+  * Every ZIP load is recorded in RAW_SCHEMA._load_manifest (size, SHA-256, per-member
+    row counts, start/end timestamps, status running|complete|failed).
+  * A complete load sends NOTIFY dera_load with its srcdir as payload (channel set by
+    DERA_LOAD_CHANNEL), e.g. so financials_api.py drops its cache.
+- Transactions & resume:
+  * Each ZIP member is loaded in its own transaction.
+  * --checkpoint-rows N : also commit every N rows, recording progress in
+                          RAW_SCHEMA._load_checkpoint in the same transaction.
+  * --resume            : continue a member from its last checkpoint. ZIP members are
+                          deflate streams (not seekable), so resuming re-reads and skips
+                          the committed lines rather than seeking to a byte offset.
+  * --retries N         : retry a member after a database error, resuming from its last
+                          checkpoint (on a new connection if the server dropped the old
+                          one); the summary reports productive vs. lost load time.
+- Filtered loads (opt-in, num.txt only):
+  * --tag-filter dbt    : keep only num rows whose tag is referenced by the dbt project
+                          (the metric_tags seed and tag lists in models).
+  * --tag-filter FILE   : keep only tags listed in FILE (one per line, '#' comments).
+  * --prune-columns     : leave num columns unused downstream (footnote, segments) NULL.
+  The filter used is recorded per ZIP/srcdir in _load_manifest.load_filter (NULL = full load);
+  --mode incremental reloads a ZIP when the requested filter differs from its last load.
+- Typed num (opt-in):
+  * --typed also|only : additionally (or instead) write num rows into RAW_SCHEMA.num_typed
+                        with DATE/INT/NUMERIC columns and the fix_dera_ddate() fixes applied,
+                        so stg_dera_num can skip the casts (dbt var dera_num_typed).
+                        Rows failing the casts go to RAW_SCHEMA.num_reject with a reason.
+- Write path:
+  * --method copy   : default; stream rows through COPY ... FROM STDIN in chunks.
+  * --method insert : fallback; execute_batch INSERTs (slower, but works everywhere).
+  * --parser bytes  : default for plain COPY loads; rows are cut from raw byte chunks and
+                      only short/long rows are split into fields (see copy_block).
+                      Filtered, pruned and typed loads always use --parser text.
+  * --workers N     : load ZIP members in N processes, one connection per worker.
+- Instrumentation:
+  * Every member is timed per phase (decompress, decode, split, normalize, batch, send,
+    commit) and counts padded/folded rows (see normalize_row); the summary prints totals.
+  * --metrics-out FILE : write those per member; JSON lines (appended) or, for *.prom /
+                         --metrics-format prometheus, a node_exporter textfile. Also turns
+                         on the per-line decode/split/normalize/batch timers.
+- Parquet sink (opt-in, no Postgres needed):
+  * --sink parquet      : write each quarter's sub/num/tag as Parquet files under
+                          --parquet-dir/<table>/srcdir=<YYYYqN>/ (hive partitions), sorted
+                          by adsh (sub), tag/adsh (num) and tag/version (tag), for the dbt
+                          `duckdb` target. Loads go through the text parser; the load
+                          manifest is kept as Parquet in --parquet-dir/_load_manifest/.
+                          A member is written to a staging directory and renamed into
+                          place, so --mode skip/replace/incremental keep their semantics.
 
 Usage:
   python elt/pg_load_dera.py --zips-dir /absolute/path/to/dera_zips --mode replace
+  python elt/pg_load_dera.py --zips-dir /absolute/path/to/dera_zips --method insert
+  python elt/pg_load_dera.py --zips-dir /absolute/path/to/dera_zips --mode replace --workers 4
+  python elt/pg_load_dera.py --zips-dir /absolute/path/to/dera_zips --migrate-partitions
+  python elt/pg_load_dera.py --zips-dir /absolute/path/to/dera_zips --mode incremental
+  python elt/pg_load_dera.py --zips-dir /absolute/path/to/dera_zips --checkpoint-rows 1000000 --resume
+  python elt/pg_load_dera.py --zips-dir /absolute/path/to/dera_zips --mode replace --tag-filter dbt --prune-columns
+  python elt/pg_load_dera.py --zips-dir /absolute/path/to/dera_zips --mode replace --typed also
+  python elt/pg_load_dera.py --zips-dir /absolute/path/to/dera_zips --metrics-out load_metrics.jsonl
+  python elt/pg_load_dera.py --zips-dir /absolute/path/to/dera_zips --mode incremental --sink parquet
 
 Environment variables (optional):
-  PGHOST, PGPORT, PGDATABASE, PGUSER, PGPASSWORD, DERA_RAW_SCHEMA
+  PGHOST, PGPORT, PGDATABASE, PGUSER, PGPASSWORD, DERA_RAW_SCHEMA, DERA_PARQUET_DIR, DERA_LOAD_CHANNEL
 Defaults:
   PGHOST=localhost PGPORT=5432 PGDATABASE=dera PGUSER=dbt PGPASSWORD=dbt DERA_RAW_SCHEMA=raw_dera
+  DERA_PARQUET_DIR=<repo>/dera_parquet DERA_LOAD_CHANNEL=dera_load
 """
 
 import os
 import io
+import csv
+import json
+import hashlib
+import re
+import shutil
 import zipfile
+import time
 import argparse
+from datetime import date, datetime, timezone
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from typing import Optional
 
 import psycopg2
 from psycopg2.extras import execute_batch
 
+try:  # optional: only --sink parquet needs it
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = pq = None
+
 
 # ---- DB config from env (override via env vars as needed)
 PG_HOST = os.getenv("PGHOST", "localhost")
@@ -40,6 +119,24 @@ PG_DB   = os.getenv("PGDATABASE", "dera")
 PG_USER = os.getenv("PGUSER", "dbt")
 PG_PASS = os.getenv("PGPASSWORD", "dbt")
 RAW_SCHEMA = os.getenv("DERA_RAW_SCHEMA", "raw_dera")
+# NOTIFY channel announcing each srcdir whose load completed
+LOAD_CHANNEL = os.getenv("DERA_LOAD_CHANNEL", "dera_load")
+
+# Rows buffered per round-trip for each write method
+BATCH_ROWS = {"insert": 5000, "copy": 50000, "parquet": 100000}
+# Bytes parser (--parser bytes): ZIP read size and COPY payload per round-trip
+READ_CHUNK_BYTES = 1 << 20
+COPY_BUFFER_BYTES = 8 << 20
+
+# dbt project scanned by --tag-filter dbt
+DBT_PROJECT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "dbt", "dera_dbt")
+
+# --sink parquet output; the dbt duckdb target reads the same DERA_PARQUET_DIR
+PARQUET_DIR = os.getenv("DERA_PARQUET_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..",
+                                                         "dera_parquet"))
+
+# RAW columns no dbt model reads; --prune-columns leaves them NULL
+PRUNABLE_COLUMNS = {"num": ("footnote", "segments")}
 
 
 # Base DDL for first-time setup (kept minimal; auto-extend will add any new cols)
@@ -52,20 +149,68 @@ DDL = {
       countryinc TEXT, stprinc TEXT, ein TEXT, former TEXT, changed TEXT, afs TEXT, wksi TEXT,
       fye TEXT, form TEXT, period TEXT, fy TEXT, fp TEXT, filed TEXT, accepted TEXT,
       prevrpt TEXT, detail TEXT, instance TEXT, nciks TEXT, aciks TEXT, srcdir TEXT
-    )""",
+    ) PARTITION BY LIST (srcdir)""",
     # include 'segments' (present in some num.txt); auto-extend still enabled for other columns
     "num": f"""
     CREATE TABLE IF NOT EXISTS "{RAW_SCHEMA}"."num"(
       adsh TEXT, tag TEXT, version TEXT, coreg TEXT, ddate TEXT,
       qtrs TEXT, uom TEXT, segments TEXT, value TEXT, footnote TEXT, srcdir TEXT
-    )""",
+    ) PARTITION BY LIST (srcdir)""",
     "tag": f"""
     CREATE TABLE IF NOT EXISTS "{RAW_SCHEMA}"."tag"(
       tag TEXT, version TEXT, custom TEXT, abstract TEXT, datatype TEXT,
       iord TEXT, crdr TEXT, tlabel TEXT, doc TEXT, srcdir TEXT
-    )""",
+    ) PARTITION BY LIST (srcdir)""",
+    # Optional typed copy of num (--typed); same casts/fixes as stg_dera_num, applied at load time
+    "num_typed": f"""
+    CREATE TABLE IF NOT EXISTS "{RAW_SCHEMA}"."num_typed"(
+      adsh TEXT, tag TEXT, version TEXT, coreg TEXT, ddate DATE,
+      qtrs INT, uom TEXT, segments TEXT, value NUMERIC, footnote TEXT, srcdir TEXT
+    ) PARTITION BY LIST (srcdir)""",
 }
 
+# num rows that could not be typed (bad ddate/qtrs/value), kept verbatim for inspection
+REJECT_DDL = f"""
+CREATE TABLE IF NOT EXISTS "{RAW_SCHEMA}"."num_reject"(
+  srcdir TEXT NOT NULL, line_no BIGINT, reason TEXT, raw_line TEXT,
+  rejected_at TIMESTAMPTZ NOT NULL DEFAULT now()
+)"""
+
+# One row per ZIP load attempt; the latest row per zip_name drives --mode incremental
+MANIFEST_DDL = [
+    f"""
+    CREATE TABLE IF NOT EXISTS "{RAW_SCHEMA}"."_load_manifest"(
+      load_id BIGSERIAL PRIMARY KEY,
+      zip_name TEXT NOT NULL,
+      srcdir TEXT NOT NULL,
+      zip_size BIGINT NOT NULL,
+      zip_mtime DOUBLE PRECISION NOT NULL,
+      zip_sha256 TEXT NOT NULL,
+      mode TEXT NOT NULL,
+      member_rows JSONB,
+      started_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+      finished_at TIMESTAMPTZ,
+      status TEXT NOT NULL DEFAULT 'running'
+    )""",
+    f"""
+    ALTER TABLE "{RAW_SCHEMA}"."_load_manifest" ADD COLUMN IF NOT EXISTS load_filter JSONB""",
+    f"""
+    CREATE INDEX IF NOT EXISTS "_load_manifest_zip_idx"
+      ON "{RAW_SCHEMA}"."_load_manifest" (zip_name, load_id DESC)""",
+    # Intra-member progress, committed with the data; cleared when a member completes
+    f"""
+    CREATE TABLE IF NOT EXISTS "{RAW_SCHEMA}"."_load_checkpoint"(
+      srcdir TEXT NOT NULL,
+      tbl TEXT NOT NULL,
+      zip_sha256 TEXT NOT NULL,
+      target TEXT NOT NULL,
+      lines_read BIGINT NOT NULL,
+      rows_loaded BIGINT NOT NULL,
+      updated_at TIMESTAMPTZ NOT NULL,
+      PRIMARY KEY (srcdir, tbl)
+    )""",
+]
+
 
 # -------------------------- DB helpers --------------------------
 
@@ -85,11 +230,35 @@ def connect():
     return psycopg2.connect(dsn)
 
 
-def ensure_schema(conn):
+def relkind(conn, table: str) -> Optional[str]:
+    """'p' for a partitioned table, 'r' for a plain table, None if missing."""
+    sql = """
+      select c.relkind
+      from pg_class c join pg_namespace n on n.oid = c.relnamespace
+      where n.nspname = %s and c.relname = %s
+    """
+    with conn.cursor() as cur:
+        cur.execute(sql, (RAW_SCHEMA, table))
+        row = cur.fetchone()
+        return row[0] if row else None
+
+
+def ensure_schema(conn, migrate: bool = False):
     with conn.cursor() as cur:
         cur.execute(f'CREATE SCHEMA IF NOT EXISTS "{RAW_SCHEMA}"')
-        for ddl in DDL.values():
+    for table, ddl in DDL.items():
+        if relkind(conn, table) == "r":
+            if not migrate:
+                raise SystemExit(
+                    f"ERROR: {RAW_SCHEMA}.{table} is not partitioned by srcdir; "
+                    f"re-run with --migrate-partitions to convert it")
+            migrate_to_partitioned(conn, table)
+        with conn.cursor() as cur:
+            cur.execute(ddl)
+    with conn.cursor() as cur:
+        for ddl in MANIFEST_DDL:
             cur.execute(ddl)
+        cur.execute(REJECT_DDL)
     conn.commit()
 
 
@@ -120,18 +289,341 @@ def add_missing_columns(conn, schema: str, table: str, header_cols: list):
     conn.commit()
 
 
-def srcdir_has_rows(conn, table: str, srcdir: str) -> bool:
-    sql = f'SELECT 1 FROM "{RAW_SCHEMA}"."{table}" WHERE srcdir = %s LIMIT 1'
+# ------------------------- Partitions --------------------------
+
+def partition_name(table: str, srcdir: str) -> str:
+    return f"{table}_" + re.sub(r"[^a-z0-9_]", "_", srcdir.lower())  # e.g., num_2019q4
+
+
+def staging_name(table: str, srcdir: str) -> str:
+    return partition_name(table, srcdir) + "_stage"
+
+
+def partition_exists(conn, table: str, srcdir: str) -> bool:
+    # Catalog lookup only; never touches the data
+    sql = """
+      select 1
+      from pg_inherits i
+      join pg_class c on c.oid = i.inhrelid
+      join pg_class p on p.oid = i.inhparent
+      join pg_namespace n on n.oid = p.relnamespace
+      where n.nspname = %s and p.relname = %s and c.relname = %s
+    """
     with conn.cursor() as cur:
-        cur.execute(sql, (srcdir,))
+        cur.execute(sql, (RAW_SCHEMA, table, partition_name(table, srcdir)))
         return cur.fetchone() is not None
 
 
-def delete_srcdir(conn, table: str, srcdir: str) -> None:
-    sql = f'DELETE FROM "{RAW_SCHEMA}"."{table}" WHERE srcdir = %s'
+def ensure_partition(conn, table: str, srcdir: str) -> str:
+    part = partition_name(table, srcdir)
+    with conn.cursor() as cur:
+        cur.execute(f'CREATE TABLE IF NOT EXISTS "{RAW_SCHEMA}"."{part}" '
+                    f'PARTITION OF "{RAW_SCHEMA}"."{table}" FOR VALUES IN (%s)', (srcdir,))
+    conn.commit()
+    return part
+
+
+def create_staging(conn, table: str, srcdir: str) -> str:
+    """
+    Fresh, detached table shaped like the parent. The CHECK constraint lets
+    ATTACH PARTITION skip its validation scan.
+    """
+    stage = staging_name(table, srcdir)
     with conn.cursor() as cur:
-        cur.execute(sql, (srcdir,))
+        cur.execute(f'DROP TABLE IF EXISTS "{RAW_SCHEMA}"."{stage}"')
+        cur.execute(f'CREATE TABLE "{RAW_SCHEMA}"."{stage}" '
+                    f'(LIKE "{RAW_SCHEMA}"."{table}" INCLUDING DEFAULTS)')
+        cur.execute(f'ALTER TABLE "{RAW_SCHEMA}"."{stage}" ADD CONSTRAINT "{stage}_srcdir_chk" '
+                    f'CHECK (srcdir IS NOT NULL AND srcdir = %s)', (srcdir,))
     conn.commit()
+    return stage
+
+
+def swap_in_staging(conn, table: str, srcdir: str) -> None:
+    """
+    Replace the srcdir partition with the loaded staging table. Does not commit:
+    the caller commits once all of a member's tables are swapped in.
+    """
+    part = partition_name(table, srcdir)
+    stage = staging_name(table, srcdir)
+    with conn.cursor() as cur:
+        cur.execute(f'DROP TABLE IF EXISTS "{RAW_SCHEMA}"."{part}"')
+        cur.execute(f'ALTER TABLE "{RAW_SCHEMA}"."{stage}" RENAME TO "{part}"')
+        cur.execute(f'ALTER TABLE "{RAW_SCHEMA}"."{table}" '
+                    f'ATTACH PARTITION "{RAW_SCHEMA}"."{part}" FOR VALUES IN (%s)', (srcdir,))
+        cur.execute(f'ALTER TABLE "{RAW_SCHEMA}"."{part}" DROP CONSTRAINT "{stage}_srcdir_chk"')
+
+
+def migrate_to_partitioned(conn, table: str) -> None:
+    """
+    One-off conversion of a legacy unpartitioned RAW table: rename it aside,
+    create the partitioned parent with the same columns, copy each srcdir into
+    its own partition, then drop the legacy table. Runs as one transaction.
+    Rows with a NULL srcdir cannot be placed; if any exist the legacy table is
+    kept (as <table>_unpartitioned) for manual cleanup.
+    """
+    legacy = f"{table}_unpartitioned"
+    print(f"   migrate: converting {RAW_SCHEMA}.{table} to LIST partitions by srcdir")
+    with conn.cursor() as cur:
+        cur.execute(f'ALTER TABLE "{RAW_SCHEMA}"."{table}" RENAME TO "{legacy}"')
+        cur.execute(f'CREATE TABLE "{RAW_SCHEMA}"."{table}" '
+                    f'(LIKE "{RAW_SCHEMA}"."{legacy}" INCLUDING DEFAULTS) PARTITION BY LIST (srcdir)')
+        cur.execute(f'SELECT DISTINCT srcdir FROM "{RAW_SCHEMA}"."{legacy}" WHERE srcdir IS NOT NULL ORDER BY 1')
+        srcdirs = [row[0] for row in cur.fetchall()]
+        for srcdir in srcdirs:
+            part = partition_name(table, srcdir)
+            cur.execute(f'CREATE TABLE "{RAW_SCHEMA}"."{part}" '
+                        f'PARTITION OF "{RAW_SCHEMA}"."{table}" FOR VALUES IN (%s)', (srcdir,))
+            cur.execute(f'INSERT INTO "{RAW_SCHEMA}"."{part}" '
+                        f'SELECT * FROM "{RAW_SCHEMA}"."{legacy}" WHERE srcdir = %s', (srcdir,))
+            print(f"   migrate: {table} srcdir={srcdir} -> {part} ({cur.rowcount:,} rows)")
+        cur.execute(f'SELECT count(*) FROM "{RAW_SCHEMA}"."{legacy}" WHERE srcdir IS NULL')
+        orphans = cur.fetchone()[0]
+        if orphans:
+            print(f"   WARN: kept {RAW_SCHEMA}.{legacy}: {orphans:,} rows have no srcdir")
+        else:
+            # CASCADE drops views still bound to the legacy table; `make dbt-run` recreates them
+            cur.execute(f'DROP TABLE "{RAW_SCHEMA}"."{legacy}" CASCADE')
+    conn.commit()
+
+
+# ------------------------ Load manifest ------------------------
+
+def file_sha256(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def zip_fingerprint(zip_path: str, sha256: Optional[str] = None) -> dict:
+    st = os.stat(zip_path)
+    return {
+        "zip_name": os.path.basename(zip_path),
+        "srcdir": srcdir_of(zip_path),
+        "size": st.st_size,
+        "mtime": st.st_mtime,
+        "sha256": sha256 or file_sha256(zip_path),
+    }
+
+
+def last_load(conn, zip_name: str) -> Optional[dict]:
+    sql = f"""
+      select load_id, zip_size, zip_mtime, zip_sha256, status, load_filter
+      from "{RAW_SCHEMA}"."_load_manifest"
+      where zip_name = %s
+      order by load_id desc
+      limit 1
+    """
+    with conn.cursor() as cur:
+        cur.execute(sql, (zip_name,))
+        row = cur.fetchone()
+    if not row:
+        return None
+    return dict(zip(("load_id", "size", "mtime", "sha256", "status", "load_filter"), row))
+
+
+def manifest_start(conn, fp: dict, mode: str, load_filter: Optional[dict] = None) -> int:
+    sql = f"""
+      insert into "{RAW_SCHEMA}"."_load_manifest"
+        (zip_name, srcdir, zip_size, zip_mtime, zip_sha256, mode, load_filter)
+      values (%s, %s, %s, %s, %s, %s, %s)
+      returning load_id
+    """
+    filter_json = json.dumps(load_filter) if load_filter else None
+    with conn.cursor() as cur:
+        cur.execute(sql, (fp["zip_name"], fp["srcdir"], fp["size"], fp["mtime"], fp["sha256"], mode,
+                          filter_json))
+        load_id = cur.fetchone()[0]
+    conn.commit()
+    return load_id
+
+
+def manifest_finish(conn, load_id: int, status: str, member_rows: dict) -> None:
+    sql = f"""
+      update "{RAW_SCHEMA}"."_load_manifest"
+      set status = %s, member_rows = %s, finished_at = now()
+      where load_id = %s
+    """
+    with conn.cursor() as cur:
+        cur.execute(sql, (status, json.dumps(member_rows), load_id))
+        if status == "complete":
+            # Delivered to listeners on commit, together with the manifest row
+            cur.execute(f'SELECT pg_notify(%s, srcdir) FROM "{RAW_SCHEMA}"."_load_manifest" WHERE load_id = %s',
+                        (LOAD_CHANNEL, load_id))
+    conn.commit()
+
+
+def plan_loads(conn, zip_paths: list, mode: str, load_filter: Optional[dict] = None,
+               sink: Optional["ParquetSink"] = None) -> list:
+    """
+    Decide which ZIPs to load; returns [(zip_path, fingerprint)].
+    Outside --mode incremental every ZIP is loaded. In incremental mode a ZIP is
+    skipped when its last load completed with the same load filter and either
+    size+mtime match (no hashing needed) or the SHA-256 matches. Only the
+    manifest is consulted: the Parquet sink's own manifest when `sink` is given.
+    """
+    planned = []
+    for zip_path in zip_paths:
+        if mode != "incremental":
+            planned.append((zip_path, zip_fingerprint(zip_path)))
+            continue
+        zip_name = os.path.basename(zip_path)
+        last = sink.last_load(zip_name) if sink else last_load(conn, zip_name)
+        st = os.stat(zip_path)
+        if last and last["status"] == "complete" and last["load_filter"] != load_filter:
+            print(f"   incremental: {zip_name} was loaded with a different tag filter; reloading")
+            planned.append((zip_path, zip_fingerprint(zip_path)))
+        elif last and last["status"] == "complete":
+            if last["size"] == st.st_size and last["mtime"] == st.st_mtime:
+                print(f"   incremental: {zip_name} unchanged since load #{last['load_id']}")
+                continue
+            sha256 = file_sha256(zip_path)
+            if last["sha256"] == sha256:
+                # Same bytes, new mtime (e.g. re-downloaded): remember the mtime so
+                # the next run can skip without hashing again
+                if sink:
+                    sink.remember_mtime(zip_name, st.st_mtime)
+                else:
+                    with conn.cursor() as cur:
+                        cur.execute(f'UPDATE "{RAW_SCHEMA}"."_load_manifest" SET zip_mtime = %s '
+                                    f'WHERE load_id = %s', (st.st_mtime, last["load_id"]))
+                    conn.commit()
+                print(f"   incremental: {zip_name} checksum unchanged since load #{last['load_id']}")
+                continue
+            print(f"   incremental: {zip_name} changed; reloading")
+            planned.append((zip_path, zip_fingerprint(zip_path, sha256)))
+        else:
+            reason = f"last load {last['status']}" if last else "never loaded"
+            print(f"   incremental: {zip_name} {reason}; loading")
+            planned.append((zip_path, zip_fingerprint(zip_path)))
+    return planned
+
+
+def member_mode(mode: str) -> str:
+    # incremental reloads whole quarters, i.e. replace semantics per member
+    return "replace" if mode == "incremental" else mode
+
+
+# ------------------------- Tag filter --------------------------
+
+def dbt_referenced_tags(project_dir: str = DBT_PROJECT_DIR) -> set:
+    """
+    Tags the dbt project actually reads: the tag column of the metric_tags seed that
+    int_num_metrics classifies num by, plus quoted names in any remaining
+    `tag in (...)` / `tag = '...'` predicates of models.
+    """
+    in_list = re.compile(r"\btag\s+in\s*\(([^)]*)\)", re.IGNORECASE)
+    equals = re.compile(r"\btag\s*=\s*'([^']+)'", re.IGNORECASE)
+    quoted = re.compile(r"'([^']+)'")
+    tags = set()
+    seed = os.path.join(project_dir, "seeds", "metric_tags.csv")
+    if os.path.isfile(seed):
+        with open(seed, "r", encoding="utf-8", newline="") as f:
+            tags.update(row["tag"].strip() for row in csv.DictReader(f) if row.get("tag"))
+    for root, _dirs, files in os.walk(os.path.join(project_dir, "models")):
+        for fname in files:
+            if not fname.endswith(".sql"):
+                continue
+            with open(os.path.join(root, fname), "r", encoding="utf-8") as f:
+                sql = f.read()
+            for group in in_list.findall(sql):
+                tags.update(quoted.findall(group))
+            tags.update(equals.findall(sql))
+    return tags
+
+
+def load_tag_filter(source: str, project_dir: str = DBT_PROJECT_DIR) -> set:
+    """--tag-filter value: 'dbt' (derive from the dbt project) or a file with one tag per line."""
+    if source == "dbt":
+        tags = dbt_referenced_tags(project_dir)
+    else:
+        path = os.path.abspath(os.path.expanduser(source))
+        if not os.path.isfile(path):
+            raise SystemExit(f"ERROR: tag filter file not found: {path}")
+        with open(path, "r", encoding="utf-8") as f:
+            tags = {line.split("#", 1)[0].strip() for line in f}
+        tags.discard("")
+    if not tags:
+        raise SystemExit(f"ERROR: tag filter '{source}' yielded no tags")
+    return tags
+
+
+def describe_filter(source: Optional[str], tags: Optional[set], prune: bool,
+                    typed: str = "off") -> Optional[dict]:
+    """Manifest record of a filtered (or typed) load; None means a plain full load."""
+    if not tags and not prune and typed == "off":
+        return None
+    digest = hashlib.sha256("\n".join(sorted(tags)).encode("utf-8")).hexdigest() if tags else None
+    record = {
+        "tag_source": source,
+        "tag_count": len(tags) if tags else None,
+        "tags_sha256": digest,
+        "pruned_columns": list(PRUNABLE_COLUMNS["num"]) if prune else [],
+    }
+    if typed != "off":
+        record["typed"] = typed  # a change of --typed also makes incremental reload the ZIP
+    return record
+
+
+# ------------------------- Typed num ---------------------------
+
+# Mirrors the fix_dera_ddate() dbt macro (known bad ddate values in DERA num.txt)
+DDATE_FIXES = {
+    "29231231": "20231231",
+    "21061130": "20161130",
+    "21051130": "20151130",
+    "21080430": "20180430",
+}
+
+TYPED_NUM_COLUMNS = ["adsh", "tag", "version", "coreg", "ddate", "qtrs", "uom", "segments", "value", "footnote"]
+TYPED_NUM_HEADER = TYPED_NUM_COLUMNS + ["srcdir"]
+REJECT_HEADER = ["srcdir", "line_no", "reason", "raw_line"]
+
+# What Postgres' numeric input accepts (Decimal() would also take e.g. '1_000')
+NUMERIC_RE = re.compile(r"^\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?\s*$|^\s*NaN\s*$", re.IGNORECASE | re.ASCII)
+# ASCII digits only: str.isdigit() and \d also take e.g. '²' or Arabic-Indic digits.
+# qtrs goes to an INT column, so it must also fit int4
+DDATE_RE = re.compile(r"[0-9]{8}")
+QTRS_RE = re.compile(r"[+-]?[0-9]+")
+INT4_MIN, INT4_MAX = -2**31, 2**31 - 1
+
+
+def type_num_row(parts: list, col_idx: dict):
+    """
+    Convert one normalized num.txt row to num_typed values, applying the same
+    rules as stg_dera_num (ddate fixes, nullif on coreg/value/footnote).
+    Returns (row, None) or (None, reason) for rows that would fail the casts.
+    """
+    def get(col):
+        i = col_idx.get(col)
+        return parts[i] if i is not None else ""
+
+    ddate = DDATE_FIXES.get(get("ddate"), get("ddate"))
+    if not DDATE_RE.fullmatch(ddate):
+        return None, f"bad ddate {ddate!r}"
+    try:
+        ddate = date(int(ddate[:4]), int(ddate[4:6]), int(ddate[6:])).isoformat()
+    except ValueError:
+        return None, f"bad ddate {ddate!r}"
+    qtrs = get("qtrs").strip()
+    if not QTRS_RE.fullmatch(qtrs) or not INT4_MIN <= int(qtrs) <= INT4_MAX:
+        return None, f"bad qtrs {qtrs!r}"
+    value = get("value")
+    if value and not NUMERIC_RE.match(value):
+        return None, f"bad value {value!r}"
+    return [
+        get("adsh"), get("tag"), get("version"), get("coreg") or None,
+        ddate, str(int(qtrs)), get("uom"), get("segments") or None,
+        value or None, get("footnote") or None,
+    ], None
+
+
+def clear_rejects(conn, srcdir: str) -> None:
+    # A fresh (non-resumed) load of a quarter replaces its earlier rejects
+    with conn.cursor() as cur:
+        cur.execute(f'DELETE FROM "{RAW_SCHEMA}"."num_reject" WHERE srcdir = %s', (srcdir,))
 
 
 # ------------------------ Row handling -------------------------
@@ -154,74 +646,1041 @@ def normalize_row(parts, expected_no_srcdir):
     return head + [tail_merged]
 
 
+# COPY text format treats these as control characters; folded footnotes can carry tabs
+COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+
 def insert_rows(conn, table: str, header: list, rows: list):
     cols = ",".join(f'"{c}"' for c in header)
     placeholders = ",".join(["%s"] * len(header))
     sql = f'INSERT INTO "{RAW_SCHEMA}"."{table}" ({cols}) VALUES ({placeholders})'
     with conn.cursor() as cur:
-        execute_batch(cur, sql, rows, page_size=5000)
+        execute_batch(cur, sql, rows, page_size=BATCH_ROWS["insert"])
 
 
-def load_txt_streaming(conn, table: str, srcdir: str, zip_member_file):
-    # Stream lines to avoid loading the entire file into memory
-    text = io.TextIOWrapper(zip_member_file, encoding="utf-8", errors="replace", newline="")
+def copy_rows(conn, table: str, header: list, rows: list):
+    """
+    Send one chunk of rows via COPY ... FROM STDIN (text format).
+    Empty strings stay empty strings and None becomes NULL, matching the INSERT path.
+    """
+    buf = io.StringIO()
+    for parts in rows:
+        buf.write("\t".join("\\N" if p is None else p.translate(COPY_ESCAPES) for p in parts))
+        buf.write("\n")
+    buf.seek(0)
+    cols = ",".join(f'"{c}"' for c in header)
+    sql = f'COPY "{RAW_SCHEMA}"."{table}" ({cols}) FROM STDIN'
+    with conn.cursor() as cur:
+        cur.copy_expert(sql, buf)
+
+
+def parquet_rows(sink, table: str, header: list, rows: list):
+    # --sink parquet: `sink` is a ParquetSink standing in for the connection
+    sink.write(table, header, rows)
+
+
+WRITERS = {"insert": insert_rows, "copy": copy_rows, "parquet": parquet_rows}
+
+
+# ------------------------ Instrumentation ----------------------
+
+# Where a member's load time goes. decompress (ZIP inflate), send and commit are always
+# timed. The text parser needs a clock read per line for decode, split, normalize and
+# batch (tag filter, typing, batching), so it only times those with --metrics-out; the
+# bytes parser times them per block.
+PHASES = ("decompress", "decode", "split", "normalize", "batch", "send", "commit")
+COUNTERS = ("lines", "rows", "padded", "folded", "filtered", "typed", "rejected", "batches", "bytes")
+
+
+def new_member_stats(zip_path: str, member: str, timed: bool) -> dict:
+    """Per-member timers and counters, filled in by load_txt_streaming()/load_member_once()."""
+    return {"zip": os.path.basename(zip_path), "member": member, "srcdir": srcdir_of(zip_path),
+            "timed": timed, "seconds": dict.fromkeys(PHASES, 0.0), **dict.fromkeys(COUNTERS, 0)}
+
+
+class TimedReader(io.BufferedIOBase):
+    """Binary stream wrapper that adds time spent reading (inflating) and bytes read to stats."""
+
+    def __init__(self, raw, stats: dict):
+        super().__init__()
+        self._raw = raw
+        self._stats = stats
+
+    def readable(self) -> bool:
+        return True
+
+    def _timed(self, read, size):
+        started = time.perf_counter()
+        data = read(size)
+        self._stats["seconds"]["decompress"] += time.perf_counter() - started
+        self._stats["bytes"] += len(data)
+        return data
+
+    def read(self, size=-1):
+        return self._timed(self._raw.read, size)
+
+    def read1(self, size=-1):
+        return self._timed(self._raw.read1, size)
+
+
+def read_header(text) -> Optional[list]:
+    """Read the tab-separated header line (BOM stripped); None for an empty member."""
     header_line = text.readline()
     if not header_line:
-        return  # empty file
+        return None
     header_line = header_line.lstrip("\ufeff")          # strip possible BOM
-    header = header_line.rstrip("\r\n").split("\t")
+    return header_line.rstrip("\r\n").split("\t")
+
+
+def member_header(z: zipfile.ZipFile, member: str) -> Optional[list]:
+    with z.open(member) as fh:
+        return read_header(io.TextIOWrapper(fh, encoding="utf-8", errors="replace", newline=""))
+
+
+def load_txt_streaming(conn, table: Optional[str], srcdir: str, zip_member_file, method: str = "copy",
+                       ckpt: Optional[dict] = None, tags: Optional[set] = None,
+                       prune: tuple = (), typed: Optional[str] = None, stats: Optional[dict] = None) -> int:
+    """
+    Stream one member into `table` (a partition or staging table in RAW_SCHEMA).
+
+    With a checkpoint dict, progress is committed every ckpt["every"] rows together
+    with a _load_checkpoint row, and the first ckpt["lines"] data lines (already
+    committed by an earlier attempt) are skipped. Rows whose tag is not in `tags`
+    are dropped, and `prune` columns are left out of the write (NULL).
+
+    For num.txt, `typed` names a num_typed partition/staging table that receives
+    the same rows converted by type_num_row(); rows that fail conversion go to
+    num_reject. `table` may be None to write the typed table only. Returns total
+    rows read for this member (after filtering), including resumed ones.
+
+    Phase timers and row counters (see new_member_stats) are accumulated into `stats`.
+    """
+    if stats is None:
+        stats = new_member_stats("", "", timed=False)
+    seconds = stats["seconds"]
+    timed = stats["timed"]
+    clock = time.perf_counter
+    # Stream lines to avoid loading the entire file into memory
+    text = io.TextIOWrapper(TimedReader(zip_member_file, stats), encoding="utf-8", errors="replace", newline="")
+    header = read_header(text)
+    if header is None:
+        return 0  # empty file
+    expected_no_srcdir = len(header)
+    col_idx = {c: i for i, c in enumerate(header)}
+    tag_idx = col_idx.get("tag") if tags is not None else None
+    keep = [i for i, c in enumerate(header) if c not in prune] if prune else None
+    if keep is not None:
+        header = [header[i] for i in keep]
     header.append("srcdir")
 
-    # Ensure RAW table has every incoming column (robust to schema changes)
-    add_missing_columns(conn, RAW_SCHEMA, table, header)
+    write_rows = WRITERS[method]
+    batch_rows = BATCH_ROWS[method]
+    every = ckpt["every"] if ckpt else 0
+    skip_lines = ckpt["lines"] if ckpt else 0
+    resumed = ckpt["rows"] if ckpt else 0
+    if skip_lines:
+        print(f"   resume: skipping {skip_lines:,} committed lines of {table or typed} ({resumed:,} rows)")
+    if typed is not None and not skip_lines:
+        clear_rejects(conn, srcdir)
+
+    batch, typed_batch, rejects = [], [], []
+    counts = {"typed": 0, "rejected": 0}
 
-    expected_no_srcdir = len(header) - 1
-    batch, total = [], 0
+    def flush():
+        sent = clock()
+        if table is not None and batch:
+            write_rows(conn, table, header, batch)
+        if typed_batch:
+            write_rows(conn, typed, TYPED_NUM_HEADER, typed_batch)
+        if rejects:
+            write_rows(conn, "num_reject", REJECT_HEADER, rejects)
+        counts["typed"] += len(typed_batch)
+        counts["rejected"] += len(rejects)
+        stats["batches"] += 1
+        seconds["send"] += clock() - sent
+        batch.clear()
+        typed_batch.clear()
+        rejects.clear()
+
+    started = time.perf_counter()
+    pending, total, lines, ckpt_rows, filtered = 0, resumed, 0, resumed, 0
+    padded = folded = 0
+    read = row_end = 0.0
+    if timed:
+        row_end = clock()
     for line in text:
+        if timed:
+            t_read = clock()
+            read += t_read - row_end
+        lines += 1
+        if lines <= skip_lines:
+            continue
         line = line.rstrip("\r\n")
         if not line:
             continue
         parts = line.split("\t")
-        parts = normalize_row(parts, expected_no_srcdir)
-        parts.append(srcdir)  # now total length equals len(header)
-        batch.append(parts)
-        if len(batch) >= 5000:
-            insert_rows(conn, table, header, batch)
-            total += len(batch)
-            batch.clear()
-    if batch:
-        insert_rows(conn, table, header, batch)
-        total += len(batch)
-    print(f"   inserted {total:,} rows into {RAW_SCHEMA}.{table}")
+        if timed:
+            t_split = clock()
+            seconds["split"] += t_split - t_read
+        if len(parts) != expected_no_srcdir:
+            if len(parts) < expected_no_srcdir:
+                padded += 1
+            else:
+                folded += 1
+            parts = normalize_row(parts, expected_no_srcdir)
+        if timed:
+            row_end = clock()
+            seconds["normalize"] += row_end - t_split
+        if tag_idx is not None and parts[tag_idx] not in tags:
+            filtered += 1
+            continue
+        if typed is not None:
+            row, reason = type_num_row(parts, col_idx)
+            if reason is None:
+                row.append(srcdir)
+                typed_batch.append(row)
+            else:
+                rejects.append([srcdir, str(lines), reason, line])
+        if table is not None:
+            if keep is not None:
+                parts = [parts[i] for i in keep]
+            parts.append(srcdir)  # now total length equals len(header)
+            batch.append(parts)
+        pending += 1
+        due = every and total + pending - ckpt_rows >= every
+        if pending >= batch_rows or due:
+            flush()
+            total += pending
+            pending = 0
+            if due:
+                committed = clock()
+                save_checkpoint(conn, ckpt, lines, total)
+                seconds["commit"] += clock() - committed
+                ckpt_rows = total
+        if timed:
+            t_batch = row_end
+            row_end = clock()
+            seconds["batch"] += row_end - t_batch
+    if timed:
+        # in-loop flush() and checkpoint commits ran inside the batch phase; reads include inflating
+        seconds["batch"] = max(0.0, seconds["batch"] - seconds["send"] - seconds["commit"])
+        seconds["decode"] = max(0.0, read - seconds["decompress"])
+    if pending:
+        flush()
+        total += pending
+    elapsed = time.perf_counter() - started
+    stats.update(lines=stats["lines"] + max(0, lines - skip_lines), rows=stats["rows"] + total - resumed,
+                 padded=stats["padded"] + padded, folded=stats["folded"] + folded,
+                 filtered=stats["filtered"] + filtered, typed=stats["typed"] + counts["typed"],
+                 rejected=stats["rejected"] + counts["rejected"])
+    rate = (total - resumed) / elapsed if elapsed > 0 else 0.0
+    targets = " + ".join(f"{RAW_SCHEMA}.{t}" for t in (table, typed) if t is not None)
+    if method == "parquet":
+        targets = conn.partition_dir(table, srcdir)
+    print(f"   inserted {total - resumed:,} rows into {targets} (srcdir={srcdir}) "
+          f"via {method} in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+    if padded or folded:
+        print(f"   normalized {padded:,} short rows (padded) and {folded:,} long rows (folded into the last column)")
+    if tag_idx is not None:
+        print(f"   tag filter dropped {filtered:,} rows")
+    if typed is not None:
+        print(f"   typed: {counts['typed']:,} rows, {counts['rejected']:,} diverted to {RAW_SCHEMA}.num_reject")
+    return total
+
+
+def copy_block(block: bytes, expected_no_srcdir: int, suffix: bytes, skip: int, stats: dict) -> tuple:
+    """
+    Turn a run of complete lines into COPY text rows, each ending in `suffix`
+    (tab, srcdir, newline). Returns (payload, lines, rows).
+
+    Produces exactly what load_txt_streaming() sends: undecodable bytes become U+FFFD,
+    backslashes and folded tabs are escaped, lines end at \n, \r or \r\n (universal
+    newlines), empty lines are counted but not loaded, and short/long rows are padded or
+    folded like normalize_row(). The first `skip` lines are dropped (resume).
+    """
+    clock = time.perf_counter
+    seconds = stats["seconds"]
+    started = clock()
+    if not block.isascii():
+        try:
+            block.decode("utf-8")
+        except UnicodeDecodeError:
+            block = block.decode("utf-8", errors="replace").encode("utf-8")
+    if b"\\" in block:
+        block = block.replace(b"\\", b"\\\\")
+    decoded = clock()
+    seconds["decode"] += decoded - started
+
+    plain = b"\r" not in block
+    lines = block.split(b"\n") if plain else block.splitlines()
+    if plain and not lines[-1]:
+        lines.pop()  # the split after the final newline
+    n = len(lines)
+    if skip >= n:
+        seconds["split"] += clock() - decoded
+        return b"", n, 0
+    if skip:
+        lines = lines[skip:]
+    tabs = expected_no_srcdir - 1
+    counts = list(map(bytes.count, lines, repeat(b"\t")))
+    uniform = min(counts) == tabs == max(counts) and (tabs or b"" not in lines)
+    split = clock()
+    seconds["split"] += split - decoded
+
+    if uniform:
+        # Every row already has the header width: append srcdir without touching fields
+        if plain and not skip and block.endswith(b"\n"):
+            payload = block.replace(b"\n", suffix)
+        else:
+            payload = suffix.join(lines) + suffix
+        seconds["batch"] += clock() - split
+        return payload, n, len(lines)
+
+    rows = []
+    for line, count in zip(lines, counts):
+        if not line:
+            continue
+        if count < tabs:
+            line += b"\t" * (tabs - count)
+            stats["padded"] += 1
+        elif count > tabs:
+            fields = line.split(b"\t", tabs)
+            fields[-1] = fields[-1].replace(b"\t", b"\\t")
+            line = b"\t".join(fields)
+            stats["folded"] += 1
+        rows.append(line)
+    seconds["normalize"] += clock() - split
+    return (suffix.join(rows) + suffix if rows else b""), n, len(rows)
+
+
+def copy_bytes(conn, table: str, header: list, payload: bytes) -> None:
+    """Send pre-built COPY text rows (see copy_block) in one COPY ... FROM STDIN."""
+    cols = ",".join(f'"{c}"' for c in header)
+    sql = f'COPY "{RAW_SCHEMA}"."{table}" ({cols}) FROM STDIN'
+    with conn.cursor() as cur:
+        cur.copy_expert(sql, io.BytesIO(payload), size=COPY_BUFFER_BYTES)
+
+
+def load_bytes_streaming(conn, table: str, srcdir: str, zip_member_file, ckpt: Optional[dict] = None,
+                         stats: Optional[dict] = None, chunk_size: int = READ_CHUNK_BYTES) -> int:
+    """
+    Fast path of load_txt_streaming() for plain COPY loads (no tag filter, pruning or
+    typing). Reads the member in large byte chunks and cuts them at the last newline;
+    each block of complete lines becomes COPY rows via copy_block(), so rows that
+    already have the header width are never decoded to str or split into fields.
+
+    Sends the same bytes as load_txt_streaming() and honours the same checkpoints
+    (taken at block boundaries), so the two can resume each other's loads.
+    """
+    if stats is None:
+        stats = new_member_stats("", "", timed=False)
+    seconds = stats["seconds"]
+    reader = TimedReader(zip_member_file, stats)
+
+    buf = b""
+    while b"\n" not in buf:
+        chunk = reader.read(chunk_size)
+        if not chunk:
+            break
+        buf += chunk
+    if not buf:
+        return 0  # empty file
+    # The header line ends like a universal-newline readline(): \n, \r or \r\n
+    end = min(i for i in (buf.find(b"\n"), buf.find(b"\r"), len(buf) - 1) if i >= 0) + 1
+    if buf[end - 1:end + 1] == b"\r\n":
+        end += 1
+    header = buf[:end].decode("utf-8", errors="replace").lstrip("\ufeff").rstrip("\r\n").split("\t")
+    buf = buf[end:]
+    expected_no_srcdir = len(header)
+    header.append("srcdir")
+    suffix = b"\t" + srcdir.encode("utf-8") + b"\n"
+
+    every = ckpt["every"] if ckpt else 0
+    skip_lines = ckpt["lines"] if ckpt else 0
+    resumed = ckpt["rows"] if ckpt else 0
+    if skip_lines:
+        print(f"   resume: skipping {skip_lines:,} committed lines of {table} ({resumed:,} rows)")
+
+    payloads = []
+
+    def flush():
+        sent = time.perf_counter()
+        copy_bytes(conn, table, header, b"".join(payloads))
+        payloads.clear()
+        stats["batches"] += 1
+        seconds["send"] += time.perf_counter() - sent
+
+    started = time.perf_counter()
+    pending, pending_bytes, total, lines, ckpt_rows = 0, 0, resumed, 0, resumed
+    eof = False
+    while True:
+        cut = len(buf) if eof else buf.rfind(b"\n") + 1
+        if cut:
+            block, buf = buf[:cut], buf[cut:]
+            payload, n, rows = copy_block(block, expected_no_srcdir, suffix, max(0, skip_lines - lines), stats)
+            lines += n
+            if lines > skip_lines:
+                pending += rows
+                if payload:
+                    payloads.append(payload)
+                    pending_bytes += len(payload)
+            due = every and total + pending - ckpt_rows >= every
+            if pending_bytes >= COPY_BUFFER_BYTES or due:
+                if payloads:
+                    flush()
+                total += pending
+                pending, pending_bytes = 0, 0
+                if due:
+                    committed = time.perf_counter()
+                    save_checkpoint(conn, ckpt, lines, total)
+                    seconds["commit"] += time.perf_counter() - committed
+                    ckpt_rows = total
+        if eof:
+            break
+        chunk = reader.read(chunk_size)
+        if chunk:
+            buf += chunk
+        else:
+            eof = True
+    if payloads:
+        flush()
+    total += pending
+    elapsed = time.perf_counter() - started
+    stats.update(lines=stats["lines"] + max(0, lines - skip_lines), rows=stats["rows"] + total - resumed)
+    rate = (total - resumed) / elapsed if elapsed > 0 else 0.0
+    print(f"   inserted {total - resumed:,} rows into {RAW_SCHEMA}.{table} (srcdir={srcdir}) "
+          f"via copy (bytes) in {elapsed:.1f}s ({rate:,.0f} rows/s)")
+    if stats["padded"] or stats["folded"]:
+        print(f"   normalized {stats['padded']:,} short rows (padded) and {stats['folded']:,} long rows "
+              f"(folded into the last column)")
+    return total
+
+
+# ------------------------- Checkpoints -------------------------
+
+def get_checkpoint(conn, table: str, srcdir: str, sha256: str) -> Optional[dict]:
+    """Last committed checkpoint for this member of this exact ZIP, if any."""
+    sql = f"""
+      select target, lines_read, rows_loaded
+      from "{RAW_SCHEMA}"."_load_checkpoint"
+      where srcdir = %s and tbl = %s and zip_sha256 = %s
+    """
+    with conn.cursor() as cur:
+        cur.execute(sql, (srcdir, table, sha256))
+        row = cur.fetchone()
+    if not row:
+        return None
+    return dict(zip(("target", "lines", "rows"), row))
+
+
+def save_checkpoint(conn, ckpt: dict, lines: int, rows: int) -> None:
+    """Record progress and commit it atomically with the rows sent so far."""
+    sql = f"""
+      insert into "{RAW_SCHEMA}"."_load_checkpoint"
+        (srcdir, tbl, zip_sha256, target, lines_read, rows_loaded, updated_at)
+      values (%s, %s, %s, %s, %s, %s, now())
+      on conflict (srcdir, tbl) do update
+      set zip_sha256 = excluded.zip_sha256, target = excluded.target,
+          lines_read = excluded.lines_read, rows_loaded = excluded.rows_loaded,
+          updated_at = excluded.updated_at
+    """
+    with conn.cursor() as cur:
+        cur.execute(sql, (ckpt["srcdir"], ckpt["table"], ckpt["sha256"], ckpt["target"], lines, rows))
+    conn.commit()
+    ckpt["committed_at"] = time.perf_counter()
+
+
+def clear_checkpoint(conn, table: str, srcdir: str) -> None:
+    # No commit: runs inside the member's final transaction
+    with conn.cursor() as cur:
+        cur.execute(f'DELETE FROM "{RAW_SCHEMA}"."_load_checkpoint" WHERE srcdir = %s AND tbl = %s',
+                    (srcdir, table))
+
+
+def table_exists(conn, name: str) -> bool:
+    with conn.cursor() as cur:
+        cur.execute("SELECT to_regclass(%s)", (f'"{RAW_SCHEMA}"."{name}"',))
+        return cur.fetchone()[0] is not None
 
 
 # ------------------------ ZIP processing -----------------------
 
-def process_zip_file(conn, zip_path: str, mode: str):
-    if not zip_path.lower().endswith(".zip"):
-        return
-    srcdir = os.path.basename(zip_path).split(".")[0]  # e.g., 2019q4
+MEMBERS = ("sub.txt", "num.txt", "tag.txt")
+
+
+def srcdir_of(zip_path: str) -> str:
+    return os.path.basename(zip_path).split(".")[0]  # e.g., 2019q4
+
+
+def load_options(args: argparse.Namespace) -> dict:
+    """Per-member load settings, passed as one picklable dict to sequential and worker paths."""
+    tags = load_tag_filter(args.tag_filter, args.dbt_project_dir) if args.tag_filter else None
+    return {
+        "method": args.method,
+        "checkpoint_rows": args.checkpoint_rows,
+        "resume": args.resume,
+        "retries": args.retries,
+        "tags": tags,
+        "prune": args.prune_columns,
+        "typed": args.typed,
+        "filter": describe_filter(args.tag_filter, tags, args.prune_columns, args.typed),
+        "timed": bool(args.metrics_out),
+        "parser": args.parser,
+    }
+
+
+def member_tables(table: str, typed: str) -> list:
+    """RAW tables written from one member: num may also (or only) feed num_typed."""
+    if table != "num" or typed == "off":
+        return [table]
+    return ["num", "num_typed"] if typed == "also" else ["num_typed"]
+
+
+def load_member_once(conn, zip_path: str, member: str, mode: str, opts: dict, sha256: str,
+                     extend_columns: bool, resume: bool, ckpt: dict, stats: dict) -> int:
+    """
+    One attempt at loading a ZIP member into its srcdir partition(s), ending in a
+    single commit (plus intermediate checkpoint commits, if enabled).
+    """
+    srcdir = srcdir_of(zip_path)
+    table = member.split(".")[0]
+    tables = member_tables(table, opts["typed"])
+
+    # Idempotency handling (catalog lookups only)
+    if mode == "skip" and all(partition_exists(conn, t, srcdir) for t in tables):
+        print(f"   skip: {'/'.join(tables)} ({srcdir}) already loaded")
+        return 0
+
     with zipfile.ZipFile(zip_path, mode="r") as z:
-        # Load in a stable order
-        for member in ("sub.txt", "num.txt", "tag.txt"):
-            if member not in z.namelist():
+        header = member_header(z, member)
+        if header is None:
+            return 0  # empty file
+
+        # Ensure RAW table has every incoming column (robust to schema changes).
+        # Parallel workers skip this: columns are added up front by prepare_columns().
+        # Must run before create_staging() so the staging table inherits new columns.
+        # num_typed has a fixed schema and never grows.
+        if extend_columns and table in tables:
+            add_missing_columns(conn, RAW_SCHEMA, table, header)
+
+        # append writes straight into the live partition; skip/replace build a
+        # staging table and attach it only once the member is fully loaded
+        staged = mode != "append"
+        targets = [staging_name(t, srcdir) if staged else partition_name(t, srcdir) for t in tables]
+        previous = get_checkpoint(conn, table, srcdir, sha256) if resume else None
+        if previous and previous["target"] == targets[0] and all(table_exists(conn, t) for t in targets):
+            ckpt.update(previous)
+        else:
+            ckpt.update(lines=0, rows=0)
+            for t in tables:
+                if staged:
+                    create_staging(conn, t, srcdir)
+                else:
+                    ensure_partition(conn, t, srcdir)
+        # One checkpoint row covers every target of the member
+        ckpt.update(srcdir=srcdir, table=table, sha256=sha256, target=targets[0],
+                    every=opts["checkpoint_rows"])
+
+        print(f"→ {os.path.basename(zip_path)} :: loading {member} (srcdir={srcdir}) into {', '.join(targets)}")
+        # Filtering and pruning only apply to num.txt
+        tags = opts["tags"] if table == "num" else None
+        prune = PRUNABLE_COLUMNS.get(table, ()) if opts["prune"] else ()
+        text_target = targets[0] if table in tables else None
+        typed_target = targets[-1] if "num_typed" in tables else None
+        # Plain COPY loads take the bytes parser; filtering, pruning and typing need fields as str
+        fast = (opts["parser"] == "bytes" and opts["method"] == "copy" and text_target is not None
+                and typed_target is None and tags is None and not prune and conn.encoding == "UTF8")
+        with z.open(member) as fh:
+            if fast:
+                rows = load_bytes_streaming(conn, text_target, srcdir, fh,
+                                            ckpt if (ckpt["every"] or ckpt["lines"]) else None, stats)
+            else:
+                rows = load_txt_streaming(conn, text_target, srcdir, fh, opts["method"],
+                                          ckpt if (ckpt["every"] or ckpt["lines"]) else None, tags, prune,
+                                          typed_target, stats)
+
+    committed = time.perf_counter()
+    clear_checkpoint(conn, table, srcdir)
+    if staged:
+        for t in tables:
+            if mode == "replace" and partition_exists(conn, t, srcdir):
+                print(f"   replace: swapping in new {t} partition for srcdir={srcdir}")
+            swap_in_staging(conn, t, srcdir)
+    conn.commit()
+    stats["seconds"]["commit"] += time.perf_counter() - committed
+    return rows
+
+
+def recover_connection(conn):
+    """
+    Roll back a failed transaction and return a usable connection: the same one, or a
+    new one when the server connection is gone (rollback() itself then raises).
+    """
+    if not conn.closed:
+        try:
+            conn.rollback()
+            return conn
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            pass
+    try:
+        conn.close()
+    except psycopg2.Error:
+        pass
+    return connect()
+
+
+def load_member(conn, zip_path: str, member: str, mode: str, opts: dict, sha256: str,
+                extend_columns: bool = True):
+    """
+    Load one ZIP member in its own transaction, retrying up to opts["retries"] times.
+    Retries resume from the last committed checkpoint, on a new connection if the old
+    one was dropped; only database errors are retried. Returns
+    (rows, productive_seconds, lost_seconds, stats, conn) where lost time is work that was
+    rolled back (everything after the last checkpoint of a failed attempt), stats
+    holds the phase timers and counters of the successful attempt and conn is the
+    connection to keep using.
+    """
+    lost = 0.0
+    started = time.perf_counter()
+    for attempt in range(opts["retries"] + 1):
+        ckpt = {"committed_at": time.perf_counter()}
+        stats = new_member_stats(zip_path, member, opts["timed"])
+        try:
+            rows = load_member_once(conn, zip_path, member, mode, opts, sha256, extend_columns,
+                                    resume=opts["resume"] or attempt > 0, ckpt=ckpt, stats=stats)
+            seconds = time.perf_counter() - started - lost
+            stats.update(attempts=attempt + 1, total_seconds=seconds, lost_seconds=lost)
+            return rows, seconds, lost, stats, conn
+        except Exception as e:
+            # Only database errors are worth retrying; a bad file or a bug fails the same way.
+            # On the final failure the caller rolls back (recover_connection) and decides
+            if attempt == opts["retries"] or not isinstance(e, psycopg2.Error):
+                raise
+            lost += time.perf_counter() - ckpt["committed_at"]
+            print(f"   retry {attempt + 1}/{opts['retries']}: {member} ({srcdir_of(zip_path)}) failed: {e}")
+            conn = recover_connection(conn)
+
+
+def zip_members(zip_path: str) -> list:
+    """(member, uncompressed size) for the DERA members present in a ZIP, in load order."""
+    with zipfile.ZipFile(zip_path, mode="r") as z:
+        names = set(z.namelist())
+        found = []
+        for member in MEMBERS:
+            if member not in names:
                 print(f"   WARN: {member} not found in {zip_path}")
                 continue
+            found.append((member, z.getinfo(member).file_size))
+        return found
+
+
+def process_zip_file(conn, zip_path: str, mode: str, opts: dict,
+                     fingerprint: Optional[dict] = None) -> tuple:
+    """
+    Load every member of one ZIP sequentially, each in its own transaction, recording
+    the attempt in the load manifest; returns ([(table, rows, seconds, lost_seconds, stats)], conn)
+    where conn replaces the one passed in if a retry had to reconnect.
+    """
+    fp = fingerprint or zip_fingerprint(zip_path)
+    load_id = manifest_start(conn, fp, mode, opts["filter"])
+    results, member_rows = [], {}
+    try:
+        for member, _size in zip_members(zip_path):
             table = member.split(".")[0]
+            rows, seconds, lost, stats, conn = load_member(conn, zip_path, member, member_mode(mode), opts,
+                                                           fp["sha256"])
+            member_rows[table] = rows
+            results.append((table, rows, seconds, lost, stats))
+    except Exception:
+        conn = recover_connection(conn)
+        manifest_finish(conn, load_id, "failed", member_rows)
+        raise
+    manifest_finish(conn, load_id, "complete", member_rows)
+    return results, conn
 
-            # Idempotency handling
-            if mode == "skip":
-                if srcdir_has_rows(conn, table, srcdir):
-                    print(f"   skip: {table} ({srcdir}) already loaded")
+
+# ----------------------- Parallel loading ----------------------
+
+def prepare_columns(conn, zip_paths: list) -> None:
+    """
+    Read every member header up front and add missing columns once per table,
+    so parallel workers never race each other with concurrent ALTER TABLEs.
+    """
+    wanted = {}
+    for zip_path in zip_paths:
+        with zipfile.ZipFile(zip_path, mode="r") as z:
+            names = set(z.namelist())
+            for member in MEMBERS:
+                if member not in names:
                     continue
-            elif mode == "replace":
-                if srcdir_has_rows(conn, table, srcdir):
-                    print(f"   replace: deleting {table} rows for srcdir={srcdir}")
-                    delete_srcdir(conn, table, srcdir)
+                header = member_header(z, member) or []
+                cols = wanted.setdefault(member.split(".")[0], [])
+                cols.extend(c for c in header if c not in cols)
+    for table, cols in wanted.items():
+        add_missing_columns(conn, RAW_SCHEMA, table, cols)
 
-            print(f"→ {os.path.basename(zip_path)} :: loading {member} (srcdir={srcdir})")
-            with z.open(member) as fh:
-                load_txt_streaming(conn, table, srcdir, fh)
+
+_worker_conn = None
+
+
+def _init_worker():
+    # One connection per worker process, reused for every member it loads
+    global _worker_conn
+    _worker_conn = connect()
+
+
+def _load_member_task(zip_path: str, member: str, mode: str, opts: dict, sha256: str):
+    global _worker_conn
+    try:
+        rows, seconds, lost, stats, _worker_conn = load_member(_worker_conn, zip_path, member, member_mode(mode),
+                                                               opts, sha256, extend_columns=False)
+    except Exception:
+        # Leave the worker a usable connection for its next member
+        _worker_conn = recover_connection(_worker_conn)
+        raise
+    return member.split(".")[0], rows, seconds, lost, stats
+
+
+def run_parallel(conn, planned: list, mode: str, opts: dict, workers: int) -> list:
+    """
+    Fan ZIP members out over a process pool. Members (not whole ZIPs) are the unit
+    of work, largest first, so one quarter's num.txt loads alongside other quarters'
+    sub.txt/tag.txt. Each member commits on its own in the worker; the parent
+    closes a ZIP's manifest entry once all of its members have finished.
+    """
+    tasks, pending, load_ids, member_rows, zip_failed = [], {}, {}, {}, set()
+    for zip_path, fp in planned:
+        members = zip_members(zip_path)
+        load_ids[zip_path] = manifest_start(conn, fp, mode, opts["filter"])
+        pending[zip_path] = len(members)
+        member_rows[zip_path] = {}
+        tasks.extend((size, zip_path, member, fp["sha256"]) for member, size in members)
+        if not members:
+            manifest_finish(conn, load_ids[zip_path], "complete", {})
+    tasks.sort(key=lambda t: t[0], reverse=True)
+
+    results, failures = [], []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = {pool.submit(_load_member_task, zip_path, member, mode, opts, sha256): (zip_path, member)
+                   for _size, zip_path, member, sha256 in tasks}
+        for fut in as_completed(futures):
+            zip_path, member = futures[fut]
+            try:
+                result = fut.result()
+                results.append(result)
+                member_rows[zip_path][result[0]] = result[1]
+            except Exception as e:
+                print(f"   ERROR: {os.path.basename(zip_path)} :: {member} failed: {e}")
+                failures.append((zip_path, member))
+                zip_failed.add(zip_path)
+            pending[zip_path] -= 1
+            if pending[zip_path] == 0:
+                status = "failed" if zip_path in zip_failed else "complete"
+                manifest_finish(conn, load_ids[zip_path], status, member_rows[zip_path])
+    if failures:
+        failed = ", ".join(f"{os.path.basename(z)}:{m}" for z, m in failures)
+        raise SystemExit(f"ERROR: {len(failures)} member load(s) failed: {failed}")
+    return results
+
+
+# ------------------------- Parquet sink ------------------------
+
+# Row order within a srcdir partition: per-row-group min/max statistics then let DuckDB
+# skip most of num for a tag or adsh lookup
+PARQUET_SORT = {"sub": ("adsh",), "num": ("tag", "adsh"), "tag": ("tag", "version")}
+PARQUET_ROW_GROUP_ROWS = 122880  # DuckDB's own row group size
+
+
+class ParquetSink:
+    """
+    Stands in for the Postgres connection with --sink parquet. load_txt_streaming() hands
+    it row batches through WRITERS["parquet"]; commit() sorts a member and writes it as
+    <root>/<table>/srcdir=<srcdir>/part-*.parquet, all columns TEXT like the RAW tables.
+    srcdir lives in the directory name only (hive partitioning). A member is buffered
+    in memory until commit, which for a full num.txt quarter is a few hundred MB.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+        self.batches = {}
+        self.manifest_dir = os.path.join(root, "_load_manifest")
+        self.recover()
+
+    def recover(self) -> None:
+        """
+        Finish partition swaps cut short by a crash (see commit()): a retired partition
+        whose replacement never landed moves back, one that was replaced is deleted.
+        """
+        staging_root = os.path.join(self.root, "_staging")
+        if not os.path.isdir(staging_root):
+            return
+        for table in os.listdir(staging_root):
+            for name in os.listdir(os.path.join(staging_root, table)):
+                path = os.path.join(staging_root, table, name)
+                if not name.endswith(".old"):
+                    continue
+                final = self.partition_dir(table, name[len("srcdir="):-len(".old")])
+                if os.path.isdir(final):
+                    shutil.rmtree(path)
+                else:
+                    print(f"   recover: restoring {final} from {path}")
+                    os.makedirs(os.path.dirname(final), exist_ok=True)
+                    os.rename(path, final)
+
+    def partition_dir(self, table: str, srcdir: str) -> str:
+        return os.path.join(self.root, table, f"srcdir={srcdir}")
+
+    def partition_exists(self, table: str, srcdir: str) -> bool:
+        path = self.partition_dir(table, srcdir)
+        return os.path.isdir(path) and any(f.endswith(".parquet") for f in os.listdir(path))
+
+    def write(self, table: str, header: list, rows: list) -> None:
+        # rows end with srcdir, which the partition path already carries
+        columns = list(zip(*rows))[:-1]
+        arrays = [pa.array(col, type=pa.string()) for col in columns]
+        self.batches.setdefault(table, []).append(pa.RecordBatch.from_arrays(arrays, names=header[:-1]))
+
+    def commit(self, table: str, srcdir: str, append: bool, pruned: tuple = ()) -> int:
+        """
+        Write the buffered member. replace/skip build the partition in <root>/_staging,
+        then move the old one aside and rename the new one into place, so readers never
+        see a partially written quarter. Between the two renames the quarter is briefly
+        absent; a crash there leaves it in _staging/<table>/srcdir=<srcdir>.old, which
+        recover() moves back on the next run (the ZIP's manifest entry is not complete,
+        so it is loaded again). append adds a file to the live partition. Returns rows written.
+        """
+        batches = self.batches.pop(table, [])
+        final = self.partition_dir(table, srcdir)
+        if not batches:
+            if not append:
+                shutil.rmtree(final, ignore_errors=True)  # the quarter is now empty
+            return 0
+        data = pa.Table.from_batches(batches)
+        for col in pruned:  # keep the file schema of a full load
+            data = data.append_column(col, pa.nulls(data.num_rows, pa.string()))
+        keys = [(c, "ascending") for c in PARQUET_SORT.get(table, ()) if c in data.column_names]
+        if keys:
+            data = data.sort_by(keys)
+        if append:
+            os.makedirs(final, exist_ok=True)
+            path = os.path.join(final, f"part-{time.time_ns()}.parquet")
+            self._write_file(data, path)
+            return data.num_rows
+        staging = os.path.join(self.root, "_staging", table, f"srcdir={srcdir}")
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+        self._write_file(data, os.path.join(staging, "part-0.parquet"))
+        retired = f"{staging}.old"
+        os.makedirs(os.path.dirname(final), exist_ok=True)
+        if os.path.isdir(final):
+            shutil.rmtree(retired, ignore_errors=True)
+            os.rename(final, retired)
+        os.rename(staging, final)
+        shutil.rmtree(retired, ignore_errors=True)
+        return data.num_rows
+
+    def discard(self) -> None:
+        self.batches.clear()
+
+    @staticmethod
+    def _write_file(data, path: str) -> None:
+        tmp = f"{path}.tmp"
+        pq.write_table(data, tmp, row_group_size=PARQUET_ROW_GROUP_ROWS, compression="zstd")
+        os.replace(tmp, path)
+
+    # Load manifest: the latest attempt per ZIP, one single-row file each, same columns
+    # as RAW_SCHEMA._load_manifest (dera_srcdir_loads() reads either)
+
+    def _manifest_path(self, zip_name: str) -> str:
+        return os.path.join(self.manifest_dir, os.path.splitext(zip_name)[0] + ".parquet")
+
+    def _manifest_record(self, zip_name: str) -> Optional[dict]:
+        path = self._manifest_path(zip_name)
+        return pq.read_table(path).to_pylist()[0] if os.path.exists(path) else None
+
+    def _write_manifest(self, record: dict) -> None:
+        os.makedirs(self.manifest_dir, exist_ok=True)
+        schema = pa.schema([
+            ("load_id", pa.int64()), ("zip_name", pa.string()), ("srcdir", pa.string()),
+            ("zip_size", pa.int64()), ("zip_mtime", pa.float64()), ("zip_sha256", pa.string()),
+            ("mode", pa.string()), ("load_filter", pa.string()), ("member_rows", pa.string()),
+            ("started_at", pa.timestamp("us", tz="UTC")), ("finished_at", pa.timestamp("us", tz="UTC")),
+            ("status", pa.string())])
+        self._write_file(pa.Table.from_pylist([record], schema=schema), self._manifest_path(record["zip_name"]))
+
+    def last_load(self, zip_name: str) -> Optional[dict]:
+        rec = self._manifest_record(zip_name)
+        if not rec:
+            return None
+        return {"load_id": rec["load_id"], "size": rec["zip_size"], "mtime": rec["zip_mtime"],
+                "sha256": rec["zip_sha256"], "status": rec["status"],
+                "load_filter": json.loads(rec["load_filter"]) if rec["load_filter"] else None}
+
+    def remember_mtime(self, zip_name: str, mtime: float) -> None:
+        rec = self._manifest_record(zip_name)
+        rec["zip_mtime"] = mtime
+        self._write_manifest(rec)
+
+    def manifest_start(self, fp: dict, mode: str, load_filter: Optional[dict] = None) -> dict:
+        rec = {"load_id": time.time_ns() // 1000, "zip_name": fp["zip_name"], "srcdir": fp["srcdir"],
+               "zip_size": fp["size"], "zip_mtime": fp["mtime"], "zip_sha256": fp["sha256"], "mode": mode,
+               "load_filter": json.dumps(load_filter) if load_filter else None, "member_rows": None,
+               "started_at": datetime.now(timezone.utc), "finished_at": None, "status": "running"}
+        self._write_manifest(rec)
+        return rec
+
+    def manifest_finish(self, rec: dict, status: str, member_rows: dict) -> None:
+        rec.update(status=status, member_rows=json.dumps(member_rows), finished_at=datetime.now(timezone.utc))
+        self._write_manifest(rec)
+
+
+def load_member_parquet(sink: ParquetSink, zip_path: str, member: str, mode: str, opts: dict,
+                        stats: dict) -> int:
+    """Parquet counterpart of load_member_once(): one member into its srcdir partition."""
+    srcdir = srcdir_of(zip_path)
+    table = member.split(".")[0]
+    if mode == "skip" and sink.partition_exists(table, srcdir):
+        print(f"   skip: {table} ({srcdir}) already written")
+        return 0
+    print(f"→ {os.path.basename(zip_path)} :: loading {member} (srcdir={srcdir}) "
+          f"into {sink.partition_dir(table, srcdir)}")
+    tags = opts["tags"] if table == "num" else None
+    prune = PRUNABLE_COLUMNS.get(table, ()) if opts["prune"] else ()
+    try:
+        with zipfile.ZipFile(zip_path, mode="r") as z, z.open(member) as fh:
+            rows = load_txt_streaming(sink, table, srcdir, fh, "parquet", None, tags, prune, None, stats)
+    except Exception:
+        sink.discard()
+        raise
+    committed = time.perf_counter()
+    sink.commit(table, srcdir, append=mode == "append", pruned=prune)
+    stats["seconds"]["commit"] += time.perf_counter() - committed
+    return rows
+
+
+def process_zip_parquet(sink: ParquetSink, zip_path: str, mode: str, opts: dict, fp: dict) -> list:
+    """process_zip_file() for --sink parquet; same result tuples and manifest statuses."""
+    rec = sink.manifest_start(fp, mode, opts["filter"])
+    results, member_rows = [], {}
+    try:
+        for member, _size in zip_members(zip_path):
+            table = member.split(".")[0]
+            stats = new_member_stats(zip_path, member, opts["timed"])
+            started = time.perf_counter()
+            rows = load_member_parquet(sink, zip_path, member, member_mode(mode), opts, stats)
+            seconds = time.perf_counter() - started
+            stats.update(attempts=1, total_seconds=seconds, lost_seconds=0.0)
+            member_rows[table] = rows
+            results.append((table, rows, seconds, 0.0, stats))
+    except Exception:
+        sink.manifest_finish(rec, "failed", member_rows)
+        raise
+    sink.manifest_finish(rec, "complete", member_rows)
+    return results
+
+
+def print_summary(results: list, wall_seconds: float, workers: int) -> None:
+    per_table = {}
+    for table, rows, seconds, _lost, _stats in results:
+        agg = per_table.setdefault(table, [0, 0.0])
+        agg[0] += rows
+        agg[1] += seconds
+    print(f"\nThroughput summary ({workers} worker(s), {wall_seconds:.1f}s wall):")
+    for table, (rows, seconds) in sorted(per_table.items()):
+        rate = rows / seconds if seconds > 0 else 0.0
+        label = f"{RAW_SCHEMA}.{table}"
+        print(f"   {label:<16} {rows:>14,} rows  {seconds:8.1f}s busy  {rate:>12,.0f} rows/s")
+    total = sum(rows for rows, _ in per_table.values())
+    rate = total / wall_seconds if wall_seconds > 0 else 0.0
+    print(f"   {'total':<16} {total:>14,} rows  {wall_seconds:8.1f}s wall  {rate:>12,.0f} rows/s")
+    productive = sum(r[2] for r in results)
+    lost = sum(r[3] for r in results)
+    print(f"   load time: {productive:.1f}s productive, {lost:.1f}s lost to failed attempts")
+    phases = {p: sum(r[4]["seconds"][p] for r in results) for p in PHASES}
+    timed = any(r[4]["timed"] for r in results)
+    shown = [p for p in PHASES if timed or p in ("decompress", "send", "commit")]
+    if productive > 0:
+        print("   phases: " + ", ".join(f"{p} {phases[p]:.1f}s ({phases[p] / productive:.0%})" for p in shown))
+    padded = sum(r[4]["padded"] for r in results)
+    folded = sum(r[4]["folded"] for r in results)
+    print(f"   normalized rows: {padded:,} padded, {folded:,} folded")
+
+
+# --------------------------- Metrics ---------------------------
+
+def metric_records(results: list, run: dict) -> list:
+    """One flat record per loaded member, for --metrics-out."""
+    records = []
+    for table, rows, seconds, lost, stats in results:
+        record = {"event": "member", **run, "zip": stats["zip"], "srcdir": stats["srcdir"], "table": table,
+                  "attempts": stats["attempts"], "seconds": round(seconds, 6), "lost_seconds": round(lost, 6)}
+        record.update({c: stats[c] for c in COUNTERS})
+        record["rows"] = rows
+        record.update({f"{p}_seconds": round(stats["seconds"][p], 6) for p in PHASES})
+        records.append(record)
+    return records
+
+
+def write_metrics_jsonl(path: str, records: list, summary: dict) -> None:
+    # Appended, so one file accumulates a history of loads
+    with open(path, "a", encoding="utf-8") as f:
+        for record in records + [summary]:
+            f.write(json.dumps(record, sort_keys=True) + "\n")
+
+
+def write_metrics_prometheus(path: str, records: list, summary: dict) -> None:
+    """
+    Prometheus text format for node_exporter's textfile collector: gauges for the
+    latest run, written to a temp file and renamed so a scrape never sees half a file.
+    """
+    lines = []
+
+    def gauge(name: str, help_text: str, samples: list) -> None:
+        lines.append(f"# HELP dera_load_{name} {help_text}")
+        lines.append(f"# TYPE dera_load_{name} gauge")
+        for labels, value in samples:
+            label_text = ",".join(f'{k}="{v}"' for k, v in labels.items())
+            lines.append(f"dera_load_{name}{{{label_text}}} {value}" if labels else f"dera_load_{name} {value}")
+
+    def member(r: dict) -> dict:
+        return {"srcdir": r["srcdir"], "table": r["table"]}
+
+    gauge("rows", "Rows written per RAW table and srcdir.", [(member(r), r["rows"]) for r in records])
+    gauge("seconds", "Productive load seconds per member.", [(member(r), r["seconds"]) for r in records])
+    gauge("phase_seconds", "Load seconds per member and phase.",
+          [(dict(member(r), phase=p), r[f"{p}_seconds"]) for r in records for p in PHASES])
+    for name, key, help_text in (
+            ("padded_rows", "padded", "Short rows padded to the header width."),
+            ("folded_rows", "folded", "Long rows whose extra fields were folded into the last column."),
+            ("filtered_rows", "filtered", "Rows dropped by --tag-filter."),
+            ("rejected_rows", "rejected", "num rows diverted to num_reject by --typed."),
+            ("bytes", "bytes", "Uncompressed member bytes read."),
+            ("attempts", "attempts", "Attempts needed to load the member.")):
+        gauge(name, help_text, [(member(r), r[key]) for r in records])
+    gauge("wall_seconds", "Wall time of the last load run.", [({}, summary["wall_seconds"])])
+    gauge("last_run_timestamp_seconds", "Unix time the last load run finished.", [({}, summary["finished_at_unix"])])
+
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+    os.replace(tmp, path)
+
+
+def write_metrics(path: str, fmt: Optional[str], results: list, wall_seconds: float, args: argparse.Namespace) -> None:
+    fmt = fmt or ("prometheus" if path.endswith(".prom") else "jsonl")
+    finished = time.time()
+    run = {"run_started_at": round(finished - wall_seconds, 3), "mode": args.mode, "method": args.method,
+           "workers": args.workers}
+    records = metric_records(results, run)
+    summary = {"event": "run", **run, "wall_seconds": round(wall_seconds, 6), "finished_at_unix": round(finished, 3),
+               "members": len(records), "rows": sum(r["rows"] for r in records)}
+    summary.update({f"{p}_seconds": round(sum(r[f"{p}_seconds"] for r in records), 6) for p in PHASES})
+    summary.update({c: sum(r[c] for r in records) for c in ("padded", "folded", "filtered", "rejected", "bytes")})
+    if fmt == "prometheus":
+        write_metrics_prometheus(path, records, summary)
+    else:
+        write_metrics_jsonl(path, records, summary)
+    print(f"   metrics: {len(records)} member record(s) written to {path} ({fmt})")
 
 
 # ----------------------------- main ----------------------------
@@ -229,32 +1688,118 @@ def process_zip_file(conn, zip_path: str, mode: str):
 def main():
     ap = argparse.ArgumentParser(description="Load local SEC DERA zip files into Postgres RAW tables")
     ap.add_argument("--zips-dir", required=True, help="Local directory containing DERA .zip files (e.g., ~/dera_zips)")
-    ap.add_argument("--mode", choices=["append", "skip", "replace"], default="append",
-                    help="append=default; skip=do nothing if srcdir exists; replace=delete rows for srcdir then load")
+    ap.add_argument("--mode", choices=["append", "skip", "replace", "incremental"], default="append",
+                    help="append=default; skip=do nothing if srcdir partition exists; "
+                         "replace=load into staging then swap the srcdir partition; "
+                         "incremental=reload only ZIPs that changed or did not finish last time")
+    ap.add_argument("--method", choices=["copy", "insert"], default="copy",
+                    help="copy=default; COPY FROM STDIN in chunks; insert=execute_batch INSERT fallback")
+    ap.add_argument("--parser", choices=["bytes", "text"], default="bytes",
+                    help="bytes=default; build COPY rows from raw byte chunks (copy loads without "
+                         "--tag-filter/--prune-columns/--typed); text=decode and split every row")
+    ap.add_argument("--workers", type=int, default=1,
+                    help="parallel worker processes (one connection each); 1=sequential on a single connection")
+    ap.add_argument("--migrate-partitions", action="store_true",
+                    help="convert existing unpartitioned RAW tables to srcdir partitions before loading")
+    ap.add_argument("--checkpoint-rows", type=int, default=0,
+                    help="commit and record a checkpoint every N rows within a member (0=off)")
+    ap.add_argument("--resume", action="store_true",
+                    help="continue members from their last committed checkpoint instead of starting over")
+    ap.add_argument("--retries", type=int, default=0,
+                    help="retry a failed member N times, resuming from its last checkpoint")
+    ap.add_argument("--tag-filter", metavar="dbt|FILE",
+                    help="only load num rows whose tag is used by the dbt project ('dbt') or listed in FILE")
+    ap.add_argument("--dbt-project-dir", default=DBT_PROJECT_DIR,
+                    help="dbt project scanned by --tag-filter dbt")
+    ap.add_argument("--prune-columns", action="store_true",
+                    help="leave num columns unused by dbt (footnote, segments) NULL")
+    ap.add_argument("--typed", choices=["off", "also", "only"], default="off",
+                    help="also/only: write num rows typed (date/int/numeric) into num_typed; "
+                         "rows failing the casts go to num_reject")
+    ap.add_argument("--metrics-out", metavar="FILE",
+                    help="write per-member phase timers and row counters to FILE (also enables the "
+                         "per-line decode/split/normalize timers, which cost a few percent)")
+    ap.add_argument("--metrics-format", choices=["jsonl", "prometheus"],
+                    help="jsonl appends one record per member plus a run record; prometheus writes a "
+                         "node_exporter textfile (default: prometheus for *.prom, else jsonl)")
+    ap.add_argument("--sink", choices=["postgres", "parquet"], default="postgres",
+                    help="postgres=default; RAW tables in Postgres. parquet=hive-partitioned Parquet files "
+                         "under --parquet-dir for the dbt duckdb target")
+    ap.add_argument("--parquet-dir", default=PARQUET_DIR,
+                    help="root directory of the Parquet sink (default: $DERA_PARQUET_DIR or <repo>/dera_parquet)")
     args = ap.parse_args()
+    if args.sink == "parquet":
+        if pa is None:
+            raise SystemExit("ERROR: --sink parquet requires pyarrow (pip install pyarrow)")
+        unsupported = [flag for flag, used in (
+            ("--method insert", args.method != "copy"), ("--workers", args.workers != 1),
+            ("--migrate-partitions", args.migrate_partitions), ("--checkpoint-rows", args.checkpoint_rows),
+            ("--resume", args.resume), ("--retries", args.retries), ("--typed", args.typed != "off")) if used]
+        if unsupported:
+            raise SystemExit(f"ERROR: {', '.join(unsupported)} cannot be used with --sink parquet")
+    if args.workers < 1:
+        raise SystemExit("ERROR: --workers must be >= 1")
+    if args.checkpoint_rows < 0 or args.retries < 0:
+        raise SystemExit("ERROR: --checkpoint-rows and --retries must be >= 0")
 
     # Normalize path (handles '~' and relative paths)
     zips_dir = os.path.abspath(os.path.expanduser(args.zips_dir))
     if not os.path.isdir(zips_dir):
         raise SystemExit(f"ERROR: directory not found: {zips_dir}")
 
-    # ✅ Ensure DB exists before connecting
-    ensure_database()
-
-    conn = connect()
-    ensure_schema(conn)
-
     zip_files = sorted(f for f in os.listdir(zips_dir) if f.lower().endswith(".zip"))
     if not zip_files:
         raise SystemExit(f"No .zip files found in: {zips_dir}")
+    zip_paths = [os.path.join(zips_dir, fname) for fname in zip_files]
 
-    for fname in zip_files:
-        process_zip_file(conn, os.path.join(zips_dir, fname), args.mode)
+    opts = load_options(args)
+    if opts["tags"]:
+        print(f"   tag filter: {len(opts['tags'])} tags from {args.tag_filter}")
 
-    conn.commit()
+    if args.sink == "parquet":
+        sink = ParquetSink(os.path.abspath(os.path.expanduser(args.parquet_dir)))
+        started = time.perf_counter()
+        planned = plan_loads(None, zip_paths, args.mode, opts["filter"], sink=sink)
+        if not planned:
+            print("   nothing to load: every ZIP is unchanged since its last complete load")
+        results = []
+        for zip_path, fp in planned:
+            results.extend(process_zip_parquet(sink, zip_path, args.mode, opts, fp))
+        wall_seconds = time.perf_counter() - started
+        print_summary(results, wall_seconds, args.workers)
+        if args.metrics_out:
+            write_metrics(args.metrics_out, args.metrics_format, results, wall_seconds, args)
+        print(f"✅ Completed RAW load into Parquet ({sink.root}).")
+        return
+
+    # ✅ Ensure DB exists before connecting
+    ensure_database()
+
+    conn = connect()
+    ensure_schema(conn, migrate=args.migrate_partitions)
+
+    started = time.perf_counter()
+    planned = plan_loads(conn, zip_paths, args.mode, opts["filter"])
+    if not planned:
+        print("   nothing to load: every ZIP is unchanged since its last complete load")
+    if args.workers == 1:
+        results = []
+        for zip_path, fp in planned:
+            zip_results, conn = process_zip_file(conn, zip_path, args.mode, opts, fp)
+            results.extend(zip_results)
+        conn.commit()
+    else:
+        # Schema changes happen once, serially, before any worker starts writing
+        prepare_columns(conn, [zip_path for zip_path, _fp in planned])
+        results = run_parallel(conn, planned, args.mode, opts, args.workers)
     conn.close()
+
+    wall_seconds = time.perf_counter() - started
+    print_summary(results, wall_seconds, args.workers)
+    if args.metrics_out:
+        write_metrics(args.metrics_out, args.metrics_format, results, wall_seconds, args)
     print("✅ Completed RAW load into Postgres.")
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
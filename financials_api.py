@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Read API over the financials marts: per-CIK, per-SIC and per-fiscal-year lookups served
+from a local HTTP endpoint (or the FinancialsReader class, for Python callers).
+
+- Queries run on a pooled set of read-only Postgres connections; every lookup is a
+  statement PREPAREd once per connection, so a request costs one EXECUTE round-trip.
+- Results are kept in an in-process LRU cache whose entries also expire after --ttl.
+  The cache is dropped whenever something is announced on the NOTIFY channel dera_load:
+  pg_load_dera.py sends the srcdir of every completed load, and dbt's on-run-end hook
+  (notify_marts_changed) sends 'dbt' once the marts are rebuilt.
+
+Endpoints (GET, JSON; fy is the fiscal year, e.g. 2023):
+  /financials/cik/<cik>            every fiscal year of a company (financials)
+  /financials/cik/<cik>/latest     its most recent fiscal year (financials_latest)
+  /financials/sic/<sic>            industry roll-up per fiscal year (financials_sic_summary)
+  /financials/sic/<sic>/<fy>       companies of an industry in one year, plus the roll-up
+  /financials/fy/<fy>?after=<cik>&limit=<n>
+                                   one page of a fiscal year, ordered by cik
+  /float/cik/<cik>                 latest market float (float)
+  /health                          cache counters and listener state
+
+Usage:
+  python financials_api.py --port 8600
+  python financials_api.py --port 8600 --cache-size 0        # no cache
+
+Environment variables (optional):
+  PGHOST, PGPORT, PGDATABASE, PGUSER, PGPASSWORD, DERA_MARTS_SCHEMA, DERA_LOAD_CHANNEL
+"""
+
+import os
+import re
+import json
+import time
+import select
+import argparse
+import threading
+from collections import OrderedDict
+from datetime import date
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+from urllib.parse import urlsplit, parse_qs
+
+import psycopg2
+import psycopg2.extensions
+from psycopg2.pool import ThreadedConnectionPool
+
+PG_HOST = os.getenv("PGHOST", "localhost")
+PG_PORT = int(os.getenv("PGPORT", "5432"))
+PG_DB   = os.getenv("PGDATABASE", "dera")
+PG_USER = os.getenv("PGUSER", "dbt")
+PG_PASS = os.getenv("PGPASSWORD", "dbt")
+MARTS_SCHEMA = os.getenv("DERA_MARTS_SCHEMA", "analytics_marts")
+LOAD_CHANNEL = os.getenv("DERA_LOAD_CHANNEL", "dera_load")
+
+FINANCIALS_COLUMNS = ("name, cik, fy, ddate, sic, revenue_usd, income_usd, market_cap_usd, debt_usd, "
+                      "cash_usd, assets_usd, fx_staleness_days")
+MAX_PAGE_ROWS = 5000
+
+# name -> (parameter types, query); {schema} is the marts schema. fy parameters are years.
+STATEMENTS = {
+    "fin_cik": ("bigint", f"""
+        select {FINANCIALS_COLUMNS} from "{{schema}}"."financials"
+        where cik = $1 order by fy, ddate"""),
+    "fin_latest": ("bigint", f"""
+        select {FINANCIALS_COLUMNS} from "{{schema}}"."financials_latest" where cik = $1"""),
+    "sic_summary": ("int", """
+        select sic, fy, companies, revenue_usd, median_revenue_usd, income_usd, median_income_usd,
+               market_cap_usd, debt_usd, cash_usd, assets_usd, profit_margin, debt_to_assets_ratio
+        from "{schema}"."financials_sic_summary" where sic = $1 order by fy"""),
+    "sic_fy": ("int, int", f"""
+        select {FINANCIALS_COLUMNS} from "{{schema}}"."financials"
+        where sic = $1 and fy = make_date($2, 1, 1) order by cik, ddate"""),
+    "fy_page": ("int, bigint, int", f"""
+        select {FINANCIALS_COLUMNS} from "{{schema}}"."financials"
+        where fy = make_date($1, 1, 1) and cik > $2 order by cik, ddate limit $3"""),
+    "float_cik": ("bigint", """
+        select cik, company_name, latest_float_value_usd, last_ddate from "{schema}"."float" where cik = $1"""),
+}
+
+
+def dsn() -> str:
+    return f"host={PG_HOST} port={PG_PORT} dbname={PG_DB} user={PG_USER} password={PG_PASS}"
+
+
+def jsonable(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+# ---------------------------- Cache ----------------------------
+
+class TTLCache:
+    """
+    Thread-safe LRU cache whose entries also expire after `ttl` seconds. invalidate()
+    empties it and bumps `generation`; put() ignores results computed under an older
+    generation, so a query racing an invalidation cannot re-cache stale rows.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = 0
+        self.hits = self.misses = self.invalidations = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key) -> tuple:
+        """(True, value) on a fresh hit, else (False, generation to pass to put())."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                return True, entry[1]
+            if entry:
+                del self._data[key]
+            self.misses += 1
+            return False, self.generation
+
+    def put(self, key, value, generation: int) -> None:
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.generation += 1
+            self.invalidations += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._data), "maxsize": self.maxsize, "ttl_seconds": self.ttl,
+                    "hits": self.hits, "misses": self.misses, "invalidations": self.invalidations,
+                    "generation": self.generation}
+
+
+# ---------------------------- Reader ---------------------------
+
+class PreparedConnection(psycopg2.extensions.connection):
+    """Pooled connection that remembers whether STATEMENTS are prepared on it."""
+    prepared = False
+
+
+class FinancialsReader:
+    """
+    Cached lookups on the financials marts. Returned rows are dicts shared with the cache;
+    callers must not modify them. Call start_listener() to drop the cache on load events.
+    """
+
+    def __init__(self, pool_size: int = 8, cache_size: int = 10000, ttl: float = 300.0,
+                 schema: str = MARTS_SCHEMA, channel: str = LOAD_CHANNEL):
+        self.schema = schema
+        self.channel = channel
+        self.cache = TTLCache(cache_size, ttl)
+        # minconn = maxconn: the pool closes connections returned above minconn, and with
+        # them their prepared statements
+        self.pool = ThreadedConnectionPool(pool_size, pool_size, dsn(), connection_factory=PreparedConnection)
+        # ThreadedConnectionPool raises when exhausted; make callers wait for a connection instead
+        self._slots = threading.BoundedSemaphore(pool_size)
+        self._stop = threading.Event()
+        self._listener = None
+        self.events = 0
+
+    # -- queries --
+
+    def _execute(self, name: str, params: tuple) -> list:
+        with self._slots:
+            for attempt in (1, 2):
+                conn = self.pool.getconn()
+                try:
+                    if not conn.prepared:
+                        conn.set_session(readonly=True, autocommit=True)
+                        with conn.cursor() as cur:
+                            cur.execute("DEALLOCATE ALL")  # after a failed attempt
+                            for stmt, (types, sql) in STATEMENTS.items():
+                                cur.execute(f"PREPARE {stmt} ({types}) AS {sql.format(schema=self.schema)}")
+                        conn.prepared = True
+                    with conn.cursor() as cur:
+                        cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+                        cols = [d[0] for d in cur.description]
+                        rows = [dict(zip(cols, map(jsonable, row))) for row in cur.fetchall()]
+                except psycopg2.OperationalError:
+                    # Server restarted or connection dropped: retry once on a fresh connection
+                    self.pool.putconn(conn, close=True)
+                    if attempt == 2:
+                        raise
+                    continue
+                except psycopg2.DataError:
+                    # Bad parameter value: the statements are fine
+                    self.pool.putconn(conn)
+                    raise
+                except psycopg2.Error:
+                    # e.g. "cached plan must not change result type" after dbt rebuilt a mart:
+                    # prepare again (DEALLOCATE ALL first) and retry once
+                    conn.prepared = False
+                    self.pool.putconn(conn)
+                    if attempt == 2:
+                        raise
+                    continue
+                except Exception:
+                    self.pool.putconn(conn)
+                    raise
+                self.pool.putconn(conn)
+                return rows
+
+    def _cached(self, name: str, params: tuple, first: bool = False):
+        """Rows of a prepared statement (or the first row / None), through the cache."""
+        key = (name, params)
+        found, value = self.cache.get(key)
+        if found:
+            return value
+        generation = value
+        rows = self._execute(name, params)
+        value = (rows[0] if rows else None) if first else rows
+        self.cache.put(key, value, generation)
+        return value
+
+    def company(self, cik: int) -> list:
+        return self._cached("fin_cik", (cik,))
+
+    def latest(self, cik: int) -> Optional[dict]:
+        return self._cached("fin_latest", (cik,), first=True)
+
+    def industry(self, sic: int) -> list:
+        return self._cached("sic_summary", (sic,))
+
+    def industry_year(self, sic: int, fy: int) -> dict:
+        summary = [r for r in self.industry(sic) if r["fy"] == date(fy, 1, 1).isoformat()]
+        return {"companies": self._cached("sic_fy", (sic, fy)), "summary": summary[0] if summary else None}
+
+    def fiscal_year(self, fy: int, after: int = 0, limit: int = 500) -> list:
+        return self._cached("fy_page", (fy, after, max(1, min(limit, MAX_PAGE_ROWS))))
+
+    def market_float(self, cik: int) -> Optional[dict]:
+        return self._cached("float_cik", (cik,), first=True)
+
+    # -- invalidation --
+
+    def start_listener(self, reconnect_seconds: float = 5.0) -> None:
+        """LISTEN on the load channel in a daemon thread; every notification drops the cache."""
+        self._listener = threading.Thread(target=self._listen, args=(reconnect_seconds,), daemon=True)
+        self._listener.start()
+
+    def _listen(self, reconnect_seconds: float) -> None:
+        while not self._stop.is_set():
+            try:
+                conn = psycopg2.connect(dsn())
+                conn.autocommit = True
+                with conn.cursor() as cur:
+                    cur.execute(f'LISTEN "{self.channel}"')
+                # Loads may have finished while no listener was connected
+                self.cache.invalidate()
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 1.0)[0]:
+                        conn.poll()
+                        if conn.notifies:
+                            payloads = sorted({n.payload for n in conn.notifies})
+                            conn.notifies.clear()
+                            self.events += len(payloads)
+                            self.cache.invalidate()
+                            print(f"   cache: dropped after {self.channel} event(s): {', '.join(payloads)}")
+                conn.close()
+            except psycopg2.Error as e:
+                print(f"   WARN: {self.channel} listener: {e}; reconnecting in {reconnect_seconds:.0f}s")
+                self._stop.wait(reconnect_seconds)
+
+    def close(self) -> None:
+        self._stop.set()
+        if self._listener:
+            self._listener.join(timeout=5)
+        self.pool.closeall()
+
+    def stats(self) -> dict:
+        return {"cache": self.cache.stats(), "load_events": self.events,
+                "listening": bool(self._listener and self._listener.is_alive())}
+
+
+# ----------------------------- HTTP ----------------------------
+
+INT4_MAX, INT8_MAX = 2**31 - 1, 2**63 - 1
+
+
+def int_arg(value: str, max_value: int = INT8_MAX) -> int:
+    if not re.fullmatch(r"\d{1,19}", value or "") or int(value) > max_value:
+        raise ValueError(f"expected an integer from 0 to {max_value}, got {value!r}")
+    return int(value)
+
+
+def year_arg(value: str) -> int:
+    if not re.fullmatch(r"[1-9]\d{3}", value or ""):
+        raise ValueError(f"expected a year from 1000 to 9999, got {value!r}")
+    return int(value)
+
+
+def cik_arg(value: str) -> int:
+    return int_arg(value)  # bigint
+
+
+def sic_arg(value: str) -> int:
+    return int_arg(value, INT4_MAX)
+
+
+# (path pattern, handler(reader, match groups, query) -> body)
+ROUTES = [
+    (re.compile(r"/financials/cik/(\d+)"),
+     lambda r, g, q: {"cik": cik_arg(g[0]), "rows": r.company(cik_arg(g[0]))}),
+    (re.compile(r"/financials/cik/(\d+)/latest"),
+     lambda r, g, q: {"cik": cik_arg(g[0]), "row": r.latest(cik_arg(g[0]))}),
+    (re.compile(r"/financials/sic/(\d+)"),
+     lambda r, g, q: {"sic": sic_arg(g[0]), "years": r.industry(sic_arg(g[0]))}),
+    (re.compile(r"/financials/sic/(\d+)/(\d+)"),
+     lambda r, g, q: {"sic": sic_arg(g[0]), "fy": year_arg(g[1]),
+                      **r.industry_year(sic_arg(g[0]), year_arg(g[1]))}),
+    (re.compile(r"/financials/fy/(\d+)"),
+     lambda r, g, q: {"fy": year_arg(g[0]), "rows": r.fiscal_year(year_arg(g[0]), int_arg(q.get("after", "0")),
+                                                                 int_arg(q.get("limit", "500")))}),
+    (re.compile(r"/float/cik/(\d+)"), lambda r, g, q: {"cik": cik_arg(g[0]), "row": r.market_float(cik_arg(g[0]))}),
+    (re.compile(r"/health"), lambda r, g, q: r.stats()),
+]
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive: load generators reuse their connection
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+    reader: FinancialsReader = None
+    verbose = False
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        for pattern, handler in ROUTES:
+            m = pattern.fullmatch(url.path.rstrip("/"))
+            if m:
+                try:
+                    self.reply(200, handler(self.reader, m.groups(), query))
+                except (ValueError, psycopg2.DataError) as e:
+                    # bad client input, not a database outage
+                    self.reply(400, {"error": str(e).strip()})
+                except psycopg2.Error as e:
+                    self.reply(503, {"error": str(e).strip()})
+                return
+        self.reply(404, {"error": f"no route for {url.path}"})
+
+    def reply(self, status: int, body) -> None:
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, fmt, *args):
+        if self.verbose:
+            super().log_message(fmt, *args)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Cached read API over the financials marts")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8600)
+    ap.add_argument("--pool-size", type=int, default=8, help="pooled Postgres connections")
+    ap.add_argument("--cache-size", type=int, default=10000, help="cached lookups (0=no cache)")
+    ap.add_argument("--ttl", type=float, default=300.0, help="seconds a cached lookup stays valid")
+    ap.add_argument("--schema", default=MARTS_SCHEMA, help="schema of the financials marts")
+    ap.add_argument("--verbose", action="store_true", help="log every request")
+    args = ap.parse_args()
+    if args.pool_size < 1:
+        raise SystemExit("ERROR: --pool-size must be >= 1")
+
+    reader = FinancialsReader(args.pool_size, args.cache_size, args.ttl, args.schema)
+    reader.start_listener()
+    Handler.reader = reader
+    Handler.verbose = args.verbose
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    server.daemon_threads = True
+    print(f"▶ Serving financials on http://{args.host}:{server.server_address[1]} "
+          f"(pool {args.pool_size}, cache {args.cache_size} x {args.ttl:.0f}s, LISTEN {LOAD_CHANNEL})", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        reader.close()
+
+
+if __name__ == "__main__":
+    main()
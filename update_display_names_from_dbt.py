@@ -7,6 +7,17 @@ Supports:
 - seeds
 - sources
 
+Existing tables are read with one paged listing of the service (/v1/tables?service=...)
+instead of a GET per node, and every node is compared against it, so display names changed
+in OpenMetadata (manual renames, re-ingestion) are repaired on the next run. Only tables
+that differ get a PATCH. Each node's desired display names are also hashed into a local
+state file: if the listing fails, nodes whose hash matches the previous successful run are
+skipped instead of looked up one by one (--full-sync looks up every node then).
+
+Requests go through one pooled HTTP session (keep-alive) that retries 429/5xx with
+exponential backoff, honouring Retry-After. --concurrency N syncs N tables in parallel.
+The run ends with a summary of request latency percentiles.
+
 Requirements:
   - Python 3.9+
   - pip install requests
@@ -15,16 +26,25 @@ Requirements:
 import json
 import os
 import sys
+import time
+import hashlib
+import functools
 import argparse
+import threading
 from urllib.parse import quote
-from typing import Dict, Any, Optional, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Optional, List, Tuple
 
 try:
     import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
 except ImportError:
     print("This script requires the 'requests' package. Install with: pip install requests", file=sys.stderr)
     sys.exit(1)
 
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
 def parse_args() -> argparse.Namespace:
     p = argparse.ArgumentParser(description="Patch OpenMetadata displayName from dbt manifest.json")
     p.add_argument("--host", default=os.getenv("OM_HOST", "http://localhost:8585/api"))
@@ -32,6 +52,16 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--service", default=os.getenv("OM_SERVICE_NAME", ""))
     p.add_argument("--manifest", default=os.getenv("DBT_MANIFEST_PATH", "./target/manifest.json"))
     p.add_argument("--dry-run", action="store_true")
+    p.add_argument("--state-file", default=os.getenv("OM_DISPLAY_STATE", ""),
+                   help="hashes of the display names synced last run (default: next to the manifest)")
+    p.add_argument("--full-sync", action="store_true",
+                   help="ignore the state file: if the service listing fails, look up every node")
+    p.add_argument("--page-size", type=int, default=500, help="tables per page when listing the service")
+    p.add_argument("--concurrency", type=int, default=int(os.getenv("OM_CONCURRENCY", "1")),
+                   help="tables synced in parallel (default: 1, serial)")
+    p.add_argument("--retries", type=int, default=5, help="retries per request on 429/5xx and connection errors")
+    p.add_argument("--backoff", type=float, default=0.5,
+                   help="exponential backoff factor in seconds between retries")
     return p.parse_args()
 
 def headers(token: str, content_type: Optional[str] = None) -> Dict[str, str]:
@@ -42,25 +72,88 @@ def headers(token: str, content_type: Optional[str] = None) -> Dict[str, str]:
         h["Content-Type"] = content_type
     return h
 
+def make_session(concurrency: int, retries: int, backoff: float) -> requests.Session:
+    """One keep-alive connection pool, sized for the worker threads, with retry/backoff."""
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "PATCH"}),  # our patches only set values, so they are safe to repeat
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(concurrency, 1), max_retries=retry)
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def percentile_ms(ordered: List[float], q: float) -> float:
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000
+
+class Latencies:
+    """Thread-safe collector of request latencies (seconds), including retries."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._samples: Dict[str, List[float]] = {}
+
+    def add(self, method: str, seconds: float) -> None:
+        with self._lock:
+            self._samples.setdefault(method, []).append(seconds)
+
+    def summary(self) -> List[str]:
+        lines = []
+        for method, samples in sorted(self._samples.items()):
+            s = sorted(samples)
+            pct = functools.partial(percentile_ms, s)
+            lines.append(f"  {method:<5} n={len(s):<5} p50={pct(0.50):.1f}ms p90={pct(0.90):.1f}ms "
+                         f"p99={pct(0.99):.1f}ms max={s[-1] * 1000:.1f}ms")
+        return lines
+
+def timed(latencies: Latencies, session: requests.Session, method: str, url: str, **kwargs) -> requests.Response:
+    started = time.perf_counter()
+    try:
+        return session.request(method, url, **kwargs)
+    finally:
+        latencies.add(method, time.perf_counter() - started)
+
 def load_manifest(path: str) -> Dict[str, Any]:
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
-def get_table_by_fqn(base: str, token: str, fqn: str) -> Optional[Dict[str, Any]]:
+def get_table_by_fqn(http, base: str, token: str, fqn: str) -> Optional[Dict[str, Any]]:
     url = f"{base}/v1/tables/name/{quote(fqn, safe='')}"
     params = {"fields": "columns,displayName"}
-    resp = requests.get(url, headers=headers(token), params=params, timeout=20)
+    resp = http("GET", url, headers=headers(token), params=params, timeout=20)
     if resp.status_code == 200:
         return resp.json()
     else:
         print(f"[WARN] Table not found or error {resp.status_code} for FQN={fqn} -> {resp.text}", file=sys.stderr)
         return None
 
-def patch_table(base: str, token: str, table_id: str, patch_ops: List[Dict[str, Any]]) -> bool:
+def list_tables(http, base: str, token: str, service: str, page_size: int) -> Dict[str, Dict[str, Any]]:
+    """FQN -> table for every table of the service, paging through /v1/tables once."""
+    url = f"{base}/v1/tables"
+    params = {"service": service, "fields": "columns,displayName", "limit": page_size}
+    tables: Dict[str, Dict[str, Any]] = {}
+    while True:
+        resp = http("GET", url, headers=headers(token), params=params, timeout=60)
+        resp.raise_for_status()
+        body = resp.json()
+        for table in body.get("data") or []:
+            tables[table.get("fullyQualifiedName")] = table
+        after = (body.get("paging") or {}).get("after")
+        if not after:
+            return tables
+        params["after"] = after
+
+def patch_table(http, base: str, token: str, table_id: str, patch_ops: List[Dict[str, Any]]) -> bool:
     if not patch_ops:
         return True
     url = f"{base}/v1/tables/{table_id}"
-    resp = requests.patch(
+    resp = http(
+        "PATCH",
         url,
         headers=headers(token, "application/json-patch+json"),
         data=json.dumps(patch_ops),
@@ -79,27 +172,65 @@ def safe_get(d: Dict[str, Any], path: List[str], default=None):
         cur = cur[key]
     return cur
 
-def process_node(node: Dict[str, Any], resource_type: str, args: argparse.Namespace) -> int:
+def desired_names(node: Dict[str, Any], service: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """(FQN, {"table": displayName, "columns": {column: displayName}}) from a manifest node."""
     database = node.get("database")
     schema = node.get("schema")
     name = node.get("alias") or node.get("name")
 
     if not (database and schema and name):
-        print(f"[SKIP] Missing database/schema/name for {resource_type} node")
-        return 0
+        print(f"[SKIP] Missing database/schema/name for {node.get('resource_type')} node")
+        return None
 
-    fqn = f"{args.service}.{database}.{schema}.{name}"
+    columns = {}
+    for col_name, col_obj in (node.get("columns", {}) or {}).items():
+        col_display = safe_get(col_obj, ["config", "meta", "openmetadata", "displayName"])
+        if col_display is None:
+            col_display = safe_get(col_obj, ["meta", "openmetadata", "displayName"])
+        if col_display:
+            columns[col_name] = col_display
 
-    model_display = safe_get(node, ["config", "meta", "openmetadata", "displayName"])
-    columns_meta = node.get("columns", {}) or {}
+    return f"{service}.{database}.{schema}.{name}", {
+        "table": safe_get(node, ["config", "meta", "openmetadata", "displayName"]),
+        "columns": columns,
+    }
 
-    table = get_table_by_fqn(args.host, args.token, fqn)
-    if not table:
-        return 0
+def names_hash(desired: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(desired, sort_keys=True).encode("utf-8")).hexdigest()
+
+def load_state(path: str, host: str) -> Dict[str, str]:
+    """FQN -> desired-names hash synced by the last run against the same host."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            state = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return {}
+    return state.get("nodes", {}) if state.get("host") == host else {}
+
+def save_state(path: str, host: str, nodes: Dict[str, str]) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump({"host": host, "nodes": nodes}, f, indent=1, sort_keys=True)
+    os.replace(tmp, path)
+
+def process_node(fqn: str, desired: Dict[str, Any], table: Optional[Dict[str, Any]],
+                 args: argparse.Namespace, http) -> Tuple[int, bool]:
+    """Patch one table towards `desired`; returns (changes applied, OM now matches desired)."""
+    if table is None:
+        # Not in the service listing (e.g. created since): fall back to a lookup by FQN
+        try:
+            table = get_table_by_fqn(http, args.host, args.token, fqn)
+        except requests.RequestException as e:
+            print(f"[ERROR] Lookup failed for FQN={fqn}: {e}", file=sys.stderr)
+            return 0, False
+        if not table:
+            return 0, False
 
     table_id = table.get("id")
     table_display_current = table.get("displayName")
     table_columns = table.get("columns") or []
+    model_display = desired["table"]
+    complete = True
 
     patch_ops: List[Dict[str, Any]] = []
 
@@ -108,16 +239,11 @@ def process_node(node: Dict[str, Any], resource_type: str, args: argparse.Namesp
 
     name_to_index = { (c.get("name") or ""): idx for idx, c in enumerate(table_columns) }
 
-    for col_name, col_obj in columns_meta.items():
-        col_display = safe_get(col_obj, ["config", "meta", "openmetadata", "displayName"])
-        if col_display is None:
-            col_display = safe_get(col_obj, ["meta", "openmetadata", "displayName"])
-        if not col_display:
-            continue
-
+    for col_name, col_display in desired["columns"].items():
         idx = name_to_index.get(col_name)
         if idx is None:
             print(f"[WARN] Column '{col_name}' not found on OM table {fqn}; skipping column displayName", file=sys.stderr)
+            complete = False  # check again next run, the column may get ingested
             continue
 
         current_display = table_columns[idx].get("displayName")
@@ -129,18 +255,23 @@ def process_node(node: Dict[str, Any], resource_type: str, args: argparse.Namesp
             })
 
     if not patch_ops:
-        return 0
+        return 0, complete
 
     if args.dry_run:
         print(f"[DRY-RUN] Would PATCH {fqn} with ops:\n{json.dumps(patch_ops, indent=2)}")
-        return len(patch_ops)
+        return len(patch_ops), False
 
-    if patch_table(args.host, args.token, table_id, patch_ops):
+    try:
+        patched = patch_table(http, args.host, args.token, table_id, patch_ops)
+    except requests.RequestException as e:
+        print(f"[ERROR] Patch failed for {fqn}: {e}", file=sys.stderr)
+        patched = False
+    if patched:
         print(f"[OK] Patched {fqn}: {len(patch_ops)} change(s)")
-        return len(patch_ops)
+        return len(patch_ops), complete
     else:
         print(f"[FAIL] Patch failed for {fqn}", file=sys.stderr)
-        return 0
+        return 0, False
 
 def main():
     args = parse_args()
@@ -158,14 +289,50 @@ def main():
     all_nodes.update(manifest.get("nodes", {}))
     all_nodes.update(manifest.get("sources", {}))
 
-    total_ops = 0
-    for key, node in all_nodes.items():
-        resource_type = node.get("resource_type")
-        if resource_type not in ("model", "seed", "source"):
-            continue
-        total_ops += process_node(node, resource_type, args)
+    desired = {}
+    for node in all_nodes.values():
+        if node.get("resource_type") in ("model", "seed", "source"):
+            found = desired_names(node, args.service)
+            if found:
+                desired[found[0]] = found[1]
+
+    state_path = args.state_file or os.path.join(os.path.dirname(os.path.abspath(args.manifest)),
+                                                 "om_display_names.state.json")
+    previous = {} if args.full_sync else load_state(state_path, args.host)
+    hashes = {fqn: names_hash(want) for fqn, want in desired.items()}
+
+    session = make_session(args.concurrency, args.retries, args.backoff)
+    latencies = Latencies()
+    http = functools.partial(timed, latencies, session)
+
+    started = time.perf_counter()
+    tables: Dict[str, Dict[str, Any]] = {}
+    try:
+        tables = list_tables(http, args.host, args.token, args.service, args.page_size)
+        pending, synced = list(desired), {}
+    except (requests.RequestException, ValueError) as e:
+        # Without the listing, OM-side drift can't be seen cheaply: trust the state file
+        pending = [fqn for fqn in desired if previous.get(fqn) != hashes[fqn]]
+        synced = {fqn: h for fqn, h in hashes.items() if previous.get(fqn) == h}
+        print(f"[WARN] Listing tables of service {args.service} failed ({e}); looking up {len(pending)} "
+              f"table(s) by FQN, skipping {len(synced)} unchanged since the last run", file=sys.stderr)
+    with ThreadPoolExecutor(max_workers=max(args.concurrency, 1)) as pool:
+        results = list(pool.map(lambda fqn: process_node(fqn, desired[fqn], tables.get(fqn), args, http), pending))
+    elapsed = time.perf_counter() - started
+    session.close()
+
+    total_ops = sum(ops for ops, _ in results)
+    synced.update({fqn: hashes[fqn] for fqn, (_, ok) in zip(pending, results) if ok})
+    if not args.dry_run:
+        save_state(state_path, args.host, synced)
 
     print(f"\nDone. Total displayName updates applied: {total_ops}")
+    print(f"Checked {len(pending)} of {len(desired)} table(s) against OpenMetadata in {elapsed:.2f}s "
+          f"with concurrency {max(args.concurrency, 1)}")
+    if latencies.summary():
+        print("Request latency (incl. retries):")
+    for line in latencies.summary():
+        print(line)
 
 if __name__ == "__main__":
     main()
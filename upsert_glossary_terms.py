@@ -4,10 +4,14 @@ import re
 import sys
 import json
 import html
+import time
+import hashlib
 import argparse
 import logging
+import threading
 import traceback
-from typing import Dict, Any, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List, Optional, Tuple, Iterable, Iterator, TextIO
 from dotenv import load_dotenv
 from metadata.ingestion.ometa.ometa_api import OpenMetadata, OpenMetadataConnection
 from metadata.generated.schema.entity.data.glossary import Glossary
@@ -57,16 +61,113 @@ def clean(s: Optional[str]) -> str:
 def expand_path(p: str) -> str:
     return os.path.abspath(os.path.expanduser(p))
 
-def load_terms(source: str) -> List[Dict[str, Any]]:
+# -----------------------
+# Term sources (streamed)
+# -----------------------
+def iter_json_array(f: TextIO, chunk_size: int = 1 << 16) -> Iterator[Dict[str, Any]]:
+    """Yield the elements of a top-level JSON array one at a time, reading `chunk_size` chars at a time."""
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def more() -> bool:
+        nonlocal buf, pos, eof
+        chunk = f.read(chunk_size)
+        buf, pos, eof = buf[pos:] + chunk, 0, not chunk
+        return bool(chunk)
+
+    def skip(chars: str) -> None:
+        nonlocal pos
+        while True:
+            while pos < len(buf) and buf[pos] in chars:
+                pos += 1
+            if pos < len(buf) or not more():
+                return
+
+    def expect(chars: str) -> str:
+        nonlocal pos
+        skip(" \t\r\n")
+        if pos >= len(buf) or buf[pos] not in chars:
+            found = repr(buf[pos]) if pos < len(buf) else "end of input"
+            raise ValueError(f"Invalid JSON array in input: expected one of {chars!r}, found {found}")
+        pos += 1
+        return buf[pos - 1]
+
+    expect("[")
+    skip(" \t\r\n")
+    if buf[pos:pos + 1] == "]":
+        return
+    while True:
+        skip(" \t\r\n")
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if more():
+                continue
+            raise
+        if end == len(buf) and not eof and more():
+            continue  # a scalar may continue in the next chunk: decode it again
+        pos = end
+        yield item
+        if expect(",]") == "]":
+            return
+
+def iter_ndjson(f: TextIO) -> Iterator[Dict[str, Any]]:
+    """One JSON term object per line; blank lines are skipped."""
+    for line_no, line in enumerate(f, 1):
+        if line.strip():
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"Invalid JSON on line {line_no}: {e}") from e
+
+def iter_raw_tags(glossary: str, include_custom: bool = False, batch_size: int = 2000) -> Iterator[Dict[str, Any]]:
+    """
+    Terms straight from the raw_dera.tag table loaded by elt/pg_load_dera.py (PG* env vars),
+    through a server-side cursor. One term per tag: the newest taxonomy version's label and doc.
+    """
+    import psycopg2  # only needed for this source
+
+    schema = os.getenv("DERA_RAW_SCHEMA", "raw_dera")
+    conn = psycopg2.connect(
+        host=os.getenv("PGHOST", "localhost"), port=int(os.getenv("PGPORT", "5432")),
+        dbname=os.getenv("PGDATABASE", "dera"), user=os.getenv("PGUSER", "dbt"),
+        password=os.getenv("PGPASSWORD", "dbt"),
+    )
+    try:
+        with conn.cursor(name="glossary_raw_tags") as cur:
+            cur.itersize = batch_size
+            cur.execute(f"""
+                SELECT DISTINCT ON (tag) tag, tlabel, coalesce(nullif(doc, ''), tlabel)
+                FROM "{schema}"."tag"
+                WHERE coalesce(tlabel, '') <> '' {"" if include_custom else "AND custom = '0'"}
+                ORDER BY tag, version DESC, srcdir DESC
+            """)
+            for tag, label, definition in cur:
+                yield {"tag": tag, "label": label, "definition": definition, "glossary": glossary}
+    finally:
+        conn.close()
+
+def iter_terms(source: str) -> Iterator[Dict[str, Any]]:
+    """
+    Term objects from a JSON array file, an NDJSON file (.ndjson/.jsonl, or any file whose
+    first character is '{'), or an inline JSON array string. Files are streamed.
+    """
     candidate = expand_path(source)
-    if os.path.exists(candidate):
-        with open(candidate, "r", encoding="utf-8") as f:
-            data = json.load(f)
-    else:
+    if not os.path.exists(candidate):
         data = json.loads(source)
-    if not isinstance(data, list):
-        raise ValueError("Input JSON must be an array of term objects.")
-    return data
+        if not isinstance(data, list):
+            raise ValueError("Input JSON must be an array of term objects.")
+        yield from data
+        return
+    with open(candidate, "r", encoding="utf-8") as f:
+        if candidate.endswith((".ndjson", ".jsonl")):
+            yield from iter_ndjson(f)
+            return
+        head = f.read(1)
+        while head and head.isspace():
+            head = f.read(1)
+        f.seek(0)
+        yield from (iter_ndjson(f) if head == "{" else iter_json_array(f))
 load_dotenv()
 # -----------------------
 # OpenMetadata client
@@ -114,17 +215,14 @@ def ensure_glossary(metadata: OpenMetadata, glossary_display_name: str, dry_run:
 # -----------------------
 # Term ensure (flat)
 # -----------------------
-def ensure_term(metadata: OpenMetadata, glossary: Glossary, term_obj: Dict[str, Any], dry_run=False):
+def term_payload(glossary: Glossary, term_obj: Dict[str, Any]) -> Tuple[str, CreateGlossaryTermRequest]:
+    """(term FQN, create-or-update request) for one term of the input file."""
     for k in ("tag", "label", "definition"):
         if k not in term_obj or not str(term_obj[k]).strip():
             raise ValueError(f"Term missing required field '{k}': {term_obj}")
 
     term_name = slugify(term_obj["tag"])
     glossary_fqn = fqn_str(getattr(glossary, "fullyQualifiedName", getattr(glossary, "name", "")))
-    term_fqn = f"{glossary_fqn}.{term_name}"
-
-    existing = metadata.get_by_name(entity=GlossaryTerm, fqn=term_fqn)
-
     payload = CreateGlossaryTermRequest(
         name=term_name,
         displayName=term_obj["label"],
@@ -132,6 +230,11 @@ def ensure_term(metadata: OpenMetadata, glossary: Glossary, term_obj: Dict[str,
         glossary=glossary_fqn,
         parent=None,
     )
+    return f"{glossary_fqn}.{term_name}", payload
+
+def ensure_term(metadata: OpenMetadata, glossary: Glossary, term_obj: Dict[str, Any], dry_run=False):
+    term_fqn, payload = term_payload(glossary, term_obj)
+    existing = metadata.get_by_name(entity=GlossaryTerm, fqn=term_fqn)
 
     if dry_run:
         action = "Update" if existing else "Create"
@@ -145,10 +248,105 @@ def ensure_term(metadata: OpenMetadata, glossary: Glossary, term_obj: Dict[str,
         LOG.info(f"[+] Created Term: {updated.displayName} (FQN={term_fqn})")
     return updated
 
+# -----------------------
+# Prefetch + diff
+# -----------------------
+def term_digest(display_name, description) -> bytes:
+    """Compact fingerprint of what the diff compares, so large taxonomies stay small in memory."""
+    text = clean(display_name) + "\x00" + clean(fqn_str(description or ""))
+    return hashlib.md5(text.encode("utf-8")).digest()
+
+def list_terms(metadata: OpenMetadata, glossary: Glossary) -> Dict[str, bytes]:
+    """Name -> term_digest of a glossary's existing terms, in one paged listing (none for a glossary not created yet)."""
+    glossary_id = getattr(glossary, "id", None)
+    if glossary_id is None:
+        return {}
+    terms = metadata.list_all_entities(entity=GlossaryTerm, limit=1000, params={"glossary": fqn_str(glossary_id)})
+    return {fqn_str(t.name): term_digest(t.displayName, t.description) for t in terms}
+
+def submit_term(metadata: OpenMetadata, action: str, term_fqn: str, payload: CreateGlossaryTermRequest):
+    updated = metadata.create_or_update(payload)
+    LOG.info(f"{'[+] Created' if action == 'create' else '[↻] Updated'} Term: {updated.displayName} (FQN={term_fqn})")
+    return updated
+
+def upsert_prefetched(terms: Iterable[Dict[str, Any]], dry_run=False, workers: int = 8):
+    """
+    List each glossary's terms once, diff locally and send only new or changed terms,
+    `workers` at a time. Unchanged terms cost no API call. `terms` is consumed as a stream:
+    at most a few requests per worker are queued, and only name -> digest is kept per term.
+    """
+    started = time.perf_counter()
+    metadata = get_om_client()
+
+    glossaries: Dict[str, Tuple[Glossary, Dict[str, bytes]]] = {}
+    counts = {"create": 0, "update": 0, "unchanged": 0, "failed": 0}
+    lock = threading.Lock()
+    slots = threading.BoundedSemaphore(max(workers, 1) * 4)
+    inflight: Dict[str, Any] = {}  # term FQN -> future, so repeats of a term are applied in order
+    processed = 0
+
+    def finished(action: str, term_fqn: str, future) -> None:
+        slots.release()
+        with lock:
+            if inflight.get(term_fqn) is future:
+                del inflight[term_fqn]
+            try:
+                future.result()
+                counts[action] += 1
+            except Exception as e:
+                counts["failed"] += 1
+                LOG.error(f"[✗] Failed to {action} Term {term_fqn}: {e}")
+
+    with ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        for raw in terms:
+            processed += 1
+            glossary_display = clean(raw.get("glossary", ""))
+            if not glossary_display:
+                raise ValueError(f"Missing 'glossary' in term: {raw}")
+            if glossary_display not in glossaries:
+                glossary = ensure_glossary(metadata, glossary_display, dry_run=dry_run)
+                glossaries[glossary_display] = (glossary, list_terms(metadata, glossary))
+                LOG.info(f"Glossary {glossary_display}: {len(glossaries[glossary_display][1])} existing term(s)")
+            glossary, existing = glossaries[glossary_display]
+
+            term_obj = {"tag": clean(raw.get("tag")), "label": clean(raw.get("label")),
+                        "definition": clean(raw.get("definition"))}
+            term_fqn, payload = term_payload(glossary, term_obj)
+            term_name = slugify(term_obj["tag"])
+            digest = term_digest(payload.displayName, payload.description)
+            current = existing.get(term_name)
+            if current == digest:
+                counts["unchanged"] += 1
+                continue
+            action = "create" if current is None else "update"
+            existing[term_name] = digest
+
+            if dry_run:
+                LOG.info(f"[DRY RUN] Would {action.capitalize()} Term: {payload.displayName} (FQN={term_fqn})")
+                counts[action] += 1
+                continue
+
+            with lock:
+                previous = inflight.get(term_fqn)
+            if previous is not None:
+                previous.exception()  # wait: a later duplicate in the source wins
+            slots.acquire()
+            future = pool.submit(submit_term, metadata, action, term_fqn, payload)
+            with lock:
+                inflight[term_fqn] = future
+            future.add_done_callback(lambda f, a=action, t=term_fqn: finished(a, t, f))
+
+    LOG.info(f"✅ Completed upsert in {time.perf_counter() - started:.2f}s: {counts['create']} created, "
+             f"{counts['update']} updated, {counts['unchanged']} unchanged, {counts['failed']} failed "
+             f"({processed} records).")
+    if counts["failed"]:
+        raise RuntimeError(f"{counts['failed']} term(s) failed to upsert")
+    return counts
+
 # -----------------------
 # Executor
 # -----------------------
-def upsert_from_terms_json(terms: List[Dict[str, Any]], dry_run=False):
+def upsert_from_terms_json(terms: Iterable[Dict[str, Any]], dry_run=False):
     metadata = get_om_client()
     glossaries_cache = {}
     count = 0
@@ -177,20 +375,37 @@ def upsert_from_terms_json(terms: List[Dict[str, Any]], dry_run=False):
 # -----------------------
 def main():
     parser = argparse.ArgumentParser(description="Upsert glossary terms into OpenMetadata (flat structure).")
-    parser.add_argument("source", help="Path to JSON file or JSON string")
+    parser.add_argument("source", nargs="?",
+                        help="Path to a JSON array or NDJSON file, or a JSON string (streamed)")
+    parser.add_argument("--from-raw-tag", action="store_true",
+                        help="Stream terms from the raw_dera.tag table (PG* env vars) instead of a file")
+    parser.add_argument("--tag-glossary", default="US-GAAP Taxonomy",
+                        help="Glossary for terms streamed with --from-raw-tag")
+    parser.add_argument("--include-custom", action="store_true",
+                        help="With --from-raw-tag, also include filer-specific (custom) tags")
     parser.add_argument("--dry-run", action="store_true", help="Preview changes without applying them")
     parser.add_argument("--verbose", "-v", action="store_true", help="Verbose logs")
+    parser.add_argument("--prefetch", action="store_true",
+                        help="List existing terms once per glossary and send only new/changed terms in parallel")
+    parser.add_argument("--workers", type=int, default=8, help="Parallel requests with --prefetch")
     args = parser.parse_args()
+    if bool(args.source) == args.from_raw_tag:
+        parser.error("give either a source file/string or --from-raw-tag")
 
     setup_logging(args.verbose)
     LOG.info("——— OpenMetadata Glossary Upsert (Flat) ———")
-    LOG.info(f"Source: {args.source}")
+    LOG.info(f"Source: {'raw_dera.tag -> ' + args.tag_glossary if args.from_raw_tag else args.source}")
     LOG.info(f"Dry-run: {args.dry_run}")
 
-    terms_list = load_terms(args.source)
-    LOG.info(f"Loaded {len(terms_list)} term records.")
+    if args.from_raw_tag:
+        terms = iter_raw_tags(args.tag_glossary, include_custom=args.include_custom)
+    else:
+        terms = iter_terms(args.source)
 
-    upsert_from_terms_json(terms_list, dry_run=args.dry_run)
+    if args.prefetch:
+        upsert_prefetched(terms, dry_run=args.dry_run, workers=args.workers)
+    else:
+        upsert_from_terms_json(terms, dry_run=args.dry_run)
     LOG.info("——— Done ———")
 
 if __name__ == "__main__":